@@ -4,30 +4,95 @@ By: Ludang Prasetyo Nugroho (nugra.online)
 -----------------------------------------
 - Enhanced UI/UX with more immersive hacker-style elements: dynamic matrix rain, glitch effects, neon gradients, animated borders.
 - Added sound effects simulation (text-based beeps for alerts).
-- More scan modes: Quick, Full, Custom, Network, Deep AI (simulated).
-- Comprehensive system info with additional details: Network speed, Firewall status, Antivirus status, etc.
+- More scan modes: Quick, Full, Custom, Network (asyncio port sweep), Deep AI (entropy heuristics), Processes,
+  Hot Spots.
+- clamd daemon engine (pooled persistent connections, MULTISCAN/INSTREAM) preferred over clamscan.
+- Sharded clamscan/clamdscan fan-out across CPU cores (--jobs).
+- Persistent on-disk verdict cache: unchanged files are skipped until the signature DB changes.
+- Content-hash (SHA-256/BLAKE2b) dedup: identical files are scanned once, digests land in logs.
+- Hash-blocklist engine: mmap'd sorted SHA-256 index with a prefix-bucket table (--blocklist).
+- Byte-signature engine: Aho-Corasick automaton streamed over file chunks (--signatures).
+- Entropy heuristics (Deep AI / --heuristics): per-block byte histograms (NumPy when present) score packed
+  executables and in-place encrypted files.
+- Archive unpacking stage: zip/jar/wheel/tar members streamed through the native inspectors with zip-bomb limits.
+- Network scan: asyncio TCP connect sweep of the local subnets (or --net-targets), thousands of connects in flight.
+- Hot Spots mode: crontabs, services, autostart, shell rc files, temp dirs and recent downloads scanned in
+  priority order for first verdicts in seconds, optionally followed by the home or full tree.
+- Process scan: executables and loaded modules of every running process, deduped by inode and scanned once.
+- Real-time --watch mode: inotify events, debounced and scanned with back-pressure (Linux).
+- Scan profiles (--profile): include/exclude globs, size/extension filters and filesystem limits prune the walk.
+- File-type sniffing (--sniff): magic-byte routing keeps inert content away from the engines, with per-type stats.
+- Real progress: metadata pre-pass for totals, true files/s, moving-average MB/s and ETA.
+- Differential terminal renderer: only changed cells are redrawn, adaptive frame rate within a 1% CPU budget.
+- Headless --batch mode: no animation or prompts, flag-driven action policy, JSON Lines output.
+- Native multithreaded scan engine (parallel os.scandir walker + worker pool) when no external AV is present.
+- Comprehensive system info (parallel, TTL-cached probes) with additional details: Network speed, Firewall status, Antivirus status, etc.
+- Bulk parallel quarantine into content-addressed per-filesystem vaults (atomic rename) with a SQLite manifest.
+- Vault management: quarantine list / restore / purge --older-than, optional lzma/zstd payload compression.
+- Streaming detection reports (--report): buffered, appended text/JSONL/CSV or SARIF, rotated by size.
 - Interactive menu with more options: Quarantine, Recycle, Delete, Ignore, Scan Again, Export Log, View Details.
 - Improved table rendering with borders, colors, and wrapping.
 - New: Cyber threat level indicator, mission log with timestamps, customizable themes.
+- bench subcommand: reproducible synthetic corpus, files/s, MB/s, peak RSS and wall time per engine to JSON.
 - Auto-launches in a new terminal window via batch script.
 
 Requirements:
-    pip install colorama tqdm send2trash psutil playsound (optional for sound)
+    pip install colorama tqdm send2trash psutil playsound (optional for sound) numpy (optional, faster heuristics)
 """
 import argparse
+import asyncio
+import contextlib
+import ctypes
+import ctypes.util
+import errno
 import os
+import select
 import subprocess
 import sys
 import time
 import random
 import shutil
+import stat
+import heapq
+from collections import deque, OrderedDict, Counter
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import zipfile
+import tarfile
+import gzip
+import bz2
+import lzma
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+import zlib
+import mmap
+import sqlite3
+import tempfile
 import socket
+import ipaddress
+import struct
+import bisect
+from array import array
+try:
+    import numpy as np  # Optional: vectorized byte histograms for the entropy heuristics
+except ImportError:
+    np = None
+import math
 import platform
+import queue
 import psutil
 from datetime import datetime
-from threading import Thread, Event
+from threading import Thread, Event, Lock, Semaphore, Condition
 from itertools import cycle
 import textwrap
+import re
+import json
+import csv
+import urllib.parse
 
 # Initialize colorama for Windows compatibility
 try:
@@ -67,107 +132,209 @@ except ImportError:
 # ---------------------------
 # Helper Functions: System Info & Detection
 # ---------------------------
+def _probe_platform():
+    return {
+        "Hostname": socket.gethostname(),
+        "OS": f"{platform.system()} {platform.release()} ({platform.version()})",
+        "Architecture": platform.machine(),
+        "Python": platform.python_version(),
+        "CPU": platform.processor() or "Unknown",
+        "Cores (Physical)": psutil.cpu_count(logical=False),
+        "Cores (Logical)": psutil.cpu_count(logical=True),
+    }
+
+def _probe_cpu_freq():
+    try:
+        freq = psutil.cpu_freq()
+        return {"CPU Frequency": f"{freq.current:.2f} MHz (Max: {freq.max:.2f} MHz)"}
+    except Exception:
+        return {"CPU Frequency": "N/A"}
+
+def _probe_cpu_usage():
+    return {"CPU Usage": f"{psutil.cpu_percent(interval=0.5)}%"}
+
+def _probe_memory():
+    vm = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    return {
+        "RAM Total": f"{vm.total / (1024 ** 3):.2f} GB",
+        "RAM Available": f"{vm.available / (1024 ** 3):.2f} GB",
+        "RAM Used": f"{vm.used / (1024 ** 3):.2f} GB",
+        "Swap Total": f"{swap.total / (1024 ** 3):.2f} GB",
+        "Swap Used": f"{swap.used / (1024 ** 3):.2f} GB",
+    }
+
+def _probe_disks():
+    du = psutil.disk_usage("/")
+    return {
+        "Disk Total": f"{du.total / (1024 ** 3):.2f} GB",
+        "Disk Used": f"{du.used / (1024 ** 3):.2f} GB",
+        "Disk Partitions": ", ".join([p.device for p in psutil.disk_partitions()]),
+    }
+
+def _probe_session():
+    return {
+        "Uptime": f"{round(time.time() - psutil.boot_time()) // 3600} hours",
+        "Processes": len(psutil.pids()),
+        "Logged Users": ", ".join([u.name for u in psutil.users()]) or "N/A",
+    }
+
+def _probe_ip():
+    return {"IP Address": socket.gethostbyname(socket.gethostname())}
+
+def _probe_gpu():
+    try:
+        gpu_cmd = subprocess.run(["wmic", "path", "win32_VideoController", "get", "name"],
+                                 capture_output=True, text=True)
+        lines = [l.strip() for l in gpu_cmd.stdout.splitlines() if l.strip()]
+        return {"GPU": lines[1] if len(lines) > 1 else "N/A"}
+    except Exception:
+        return {"GPU": "N/A"}
+
+def _probe_network():
+    net_info = psutil.net_if_addrs()
+    net_stats = psutil.net_if_stats()
+    net_str = []
+    for iface, addrs in net_info.items():
+        st = net_stats.get(iface)
+        status = st.isup if st else "Unknown"
+        speeds = st.speed if st else "N/A"
+        net_str.append(f"{iface}: Status={status}, Speed={speeds}Mbps")
+    subnets = []
+    for iface, addrs in net_info.items():
+        st = net_stats.get(iface)
+        if st and not st.isup:
+            continue
+        for addr in addrs:
+            if addr.family != socket.AF_INET or not addr.netmask:
+                continue
+            iface_addr = ipaddress.ip_interface(f"{addr.address}/{addr.netmask}")
+            if not (iface_addr.is_loopback or iface_addr.is_link_local) and str(iface_addr) not in subnets:
+                subnets.append(str(iface_addr))  # Address/prefix, e.g. 192.168.1.23/24
+    return {"Network Interfaces": "; ".join(net_str) or "N/A", "Local Subnets": ", ".join(subnets) or "N/A"}
+
+def _probe_firewall():
+    if platform.system() != "Windows":
+        return {"Firewall Status": "N/A"}
+    try:
+        fw_cmd = subprocess.run(["netsh", "advfirewall", "show", "allprofiles", "state"], capture_output=True, text=True)
+        return {"Firewall Status": "Enabled" if "ON" in fw_cmd.stdout else "Disabled"}
+    except Exception:
+        return {"Firewall Status": "N/A"}
+
+def _probe_antivirus():
+    status = "ClamAV Available" if is_clamscan_available() else ("Defender Available" if find_mp_cmd() else "None Detected")
+    return {"Antivirus Status": status}
+
+def _probe_temperatures():
+    temps = psutil.sensors_temperatures() if hasattr(psutil, "sensors_temperatures") else {}
+    temp_str = [f"{name}: {entry.current}°C" for name, entries in temps.items() for entry in entries]
+    return {"Temperatures": ", ".join(temp_str) or "N/A"}
+
+def _probe_battery():
+    battery = psutil.sensors_battery()
+    if battery:
+        return {"Battery": f"{battery.percent}% ({'Plugged' if battery.power_plugged else 'Not Plugged'}, Time left: {battery.secsleft // 60} min)"}
+    return {"Battery": "N/A"}
+
+def _probe_bios():
+    # Windows-specific: BIOS, Motherboard
+    if platform.system() != "Windows":
+        return {}
+    try:
+        bios_cmd = subprocess.run(["wmic", "bios", "get", "smbiosbiosversion"], capture_output=True, text=True)
+        bios = bios_cmd.stdout.strip().splitlines()[-1].strip()
+        mb_cmd = subprocess.run(["wmic", "baseboard", "get", "product"], capture_output=True, text=True)
+        mb = mb_cmd.stdout.strip().splitlines()[-1].strip()
+        return {"BIOS Version": bios or "N/A", "Motherboard": mb or "N/A"}
+    except Exception:
+        return {"BIOS Version": "N/A", "Motherboard": "N/A"}
+
+class SystemInfoProvider(Mapping):
+    """Parallel, TTL-cached system information, usable as a read-only dict.
+
+    Every probe runs at the same time on a small thread pool, and its
+    result is reused for ``ttl`` seconds. Reading a key only waits for the
+    probe that produces it, so fast fields (hostname, RAM, ...) are there
+    immediately while slow ones (CPU usage sampling, GPU/BIOS via wmic,
+    temperatures) are still being collected. Iteration keeps the classic
+    field order.
+    """
+    PROBES = [
+        (_probe_platform, ["Hostname", "OS", "Architecture", "Python", "CPU", "Cores (Physical)", "Cores (Logical)"]),
+        (_probe_cpu_freq, ["CPU Frequency"]),
+        (_probe_cpu_usage, ["CPU Usage"]),
+        (_probe_memory, ["RAM Total", "RAM Available", "RAM Used", "Swap Total", "Swap Used"]),
+        (_probe_disks, ["Disk Total", "Disk Used", "Disk Partitions"]),
+        (_probe_session, ["Uptime", "Processes", "Logged Users"]),
+        (_probe_ip, ["IP Address"]),
+        (_probe_gpu, ["GPU"]),
+        (_probe_network, ["Network Interfaces", "Local Subnets"]),
+        (_probe_firewall, ["Firewall Status"]),
+        (_probe_antivirus, ["Antivirus Status"]),
+        (_probe_temperatures, ["Temperatures"]),
+        (_probe_battery, ["Battery"]),
+        (_probe_bios, ["BIOS Version", "Motherboard"]),
+    ]
+
+    def __init__(self, ttl=30.0, workers=8):
+        self.ttl = ttl
+        self.workers = workers
+        self._pool = None
+        self._lock = Lock()
+        self._futures = {}  # probe -> (started_at, Future)
+        self._owner = {key: probe for probe, keys in self.PROBES for key in keys}
+
+    def _run(self, probe, keys):
+        try:
+            return probe()
+        except Exception:
+            return {key: "N/A" for key in keys}
+
+    def refresh(self):
+        """Start (in the background) every probe whose cached result has expired."""
+        now = time.time()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sysinfo")
+            for probe, keys in self.PROBES:
+                entry = self._futures.get(probe)
+                if entry is None or (entry[1].done() and now - entry[0] > self.ttl):
+                    self._futures[probe] = (now, self._pool.submit(self._run, probe, keys))
+        return self
+
+    def _result(self, probe, timeout=None):
+        self.refresh()
+        return self._futures[probe][1].result(timeout=timeout)
+
+    def __getitem__(self, key):
+        probe = self._owner.get(key)
+        if probe is None:
+            raise KeyError(key)
+        return self._result(probe)[key]
+
+    def __iter__(self):
+        for probe, _ in self.PROBES:
+            yield from self._result(probe)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def available(self):
+        """Fields collected so far, without waiting for slow probes."""
+        self.refresh()
+        info = {}
+        for probe, _ in self.PROBES:
+            future = self._futures[probe][1]
+            if future.done():
+                info.update(future.result())
+        return info
+
+SYSTEM_INFO = SystemInfoProvider()
+
 def get_system_info():
     """Collect more comprehensive system and hardware information."""
-    info = {}
-    try:
-        info["Hostname"] = socket.gethostname()
-        info["OS"] = f"{platform.system()} {platform.release()} ({platform.version()})"
-        info["Architecture"] = platform.machine()
-        info["Python"] = platform.python_version()
-        info["CPU"] = platform.processor() or "Unknown"
-        info["Cores (Physical)"] = psutil.cpu_count(logical=False)
-        info["Cores (Logical)"] = psutil.cpu_count(logical=True)
-        try:
-            freq = psutil.cpu_freq()
-            info["CPU Frequency"] = f"{freq.current:.2f} MHz (Max: {freq.max:.2f} MHz)"
-        except:
-            info["CPU Frequency"] = "N/A"
-        info["CPU Usage"] = f"{psutil.cpu_percent(interval=0.5)}%"
-        info["RAM Total"] = f"{psutil.virtual_memory().total / (1024 ** 3):.2f} GB"
-        info["RAM Available"] = f"{psutil.virtual_memory().available / (1024 ** 3):.2f} GB"
-        info["RAM Used"] = f"{psutil.virtual_memory().used / (1024 ** 3):.2f} GB"
-        info["Swap Total"] = f"{psutil.swap_memory().total / (1024 ** 3):.2f} GB"
-        info["Swap Used"] = f"{psutil.swap_memory().used / (1024 ** 3):.2f} GB"
-        info["Disk Total"] = f"{psutil.disk_usage('/').total / (1024 ** 3):.2f} GB"
-        info["Disk Used"] = f"{psutil.disk_usage('/').used / (1024 ** 3):.2f} GB"
-        info["Disk Partitions"] = ", ".join([p.device for p in psutil.disk_partitions()])
-        info["Uptime"] = f"{round(time.time() - psutil.boot_time()) // 3600} hours"
-        info["Processes"] = len(psutil.pids())
-        info["Logged Users"] = ", ".join([u.name for u in psutil.users()]) or "N/A"
-        info["IP Address"] = socket.gethostbyname(socket.gethostname())
-        
-        # GPU Info
-        try:
-            gpu_cmd = subprocess.run(["wmic", "path", "win32_VideoController", "get", "name"],
-                                     capture_output=True, text=True)
-            lines = [l.strip() for l in gpu_cmd.stdout.splitlines() if l.strip()]
-            if len(lines) > 1:
-                info["GPU"] = lines[1]
-            else:
-                info["GPU"] = "N/A"
-        except:
-            info["GPU"] = "N/A"
-        
-        # Network Interfaces with more details
-        net_info = psutil.net_if_addrs()
-        net_stats = psutil.net_if_stats()
-        net_str = []
-        for iface, addrs in net_info.items():
-            status = net_stats.get(iface, {}).get("isup", "Unknown")
-            speeds = net_stats.get(iface, {}).get("speed", "N/A")
-            net_str.append(f"{iface}: Status={status}, Speed={speeds}Mbps")
-        info["Network Interfaces"] = "; ".join(net_str) or "N/A"
-        
-        # Firewall Status (Windows only)
-        if platform.system() == "Windows":
-            try:
-                fw_cmd = subprocess.run(["netsh", "advfirewall", "show", "allprofiles", "state"], capture_output=True, text=True)
-                fw_status = "Enabled" if "ON" in fw_cmd.stdout else "Disabled"
-                info["Firewall Status"] = fw_status
-            except:
-                info["Firewall Status"] = "N/A"
-        else:
-            info["Firewall Status"] = "N/A"
-        
-        # Antivirus Status (simulated check)
-        info["Antivirus Status"] = "ClamAV Available" if is_clamscan_available() else ("Defender Available" if find_mp_cmd() else "None Detected")
-        
-        # Temperatures
-        temps = psutil.sensors_temperatures()
-        if temps:
-            temp_str = []
-            for name, entries in temps.items():
-                for entry in entries:
-                    temp_str.append(f"{name}: {entry.current}°C")
-            info["Temperatures"] = ", ".join(temp_str)
-        else:
-            info["Temperatures"] = "N/A"
-        
-        # Battery
-        battery = psutil.sensors_battery()
-        if battery:
-            info["Battery"] = f"{battery.percent}% ({'Plugged' if battery.power_plugged else 'Not Plugged'}, Time left: {battery.secsleft // 60} min)"
-        else:
-            info["Battery"] = "N/A"
-        
-        # Windows-specific: BIOS, Motherboard
-        if platform.system() == "Windows":
-            try:
-                bios_cmd = subprocess.run(["wmic", "bios", "get", "smbiosbiosversion"], capture_output=True, text=True)
-                bios = bios_cmd.stdout.strip().splitlines()[-1].strip()
-                info["BIOS Version"] = bios if bios else "N/A"
-                
-                mb_cmd = subprocess.run(["wmic", "baseboard", "get", "product"], capture_output=True, text=True)
-                mb = mb_cmd.stdout.strip().splitlines()[-1].strip()
-                info["Motherboard"] = mb if mb else "N/A"
-            except:
-                info["BIOS Version"] = "N/A"
-                info["Motherboard"] = "N/A"
-        
-    except Exception as e:
-        info["Error"] = str(e)
-    return info
+    return dict(SYSTEM_INFO)
 
 def is_clamscan_available():
     """Check if ClamAV is available."""
@@ -190,34 +357,460 @@ def find_mp_cmd():
             return c
     return None
 
+def clamav_db_version(binary):
+    """Return "ClamAV x.y.z/daily" from ``clamscan --version`` (or clamdscan)."""
+    try:
+        out = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=30).stdout
+    except Exception:
+        return ""
+    return "/".join(out.strip().split("/")[:2])
+
+def defender_db_version():
+    """Return the Windows Defender signature version, if it can be queried."""
+    try:
+        out = subprocess.run(["powershell", "-Command", "(Get-MpComputerStatus).AntivirusSignatureVersion"],
+                             capture_output=True, text=True, timeout=30).stdout
+    except Exception:
+        return ""
+    return f"Defender {out.strip()}" if out.strip() else ""
+
+# ---------------------------
+# Scan Profiles (pruning filters applied during traversal)
+# ---------------------------
+# Pseudo, virtual and network filesystems a malware scan should not descend into.
+PSEUDO_FSTYPES = ["proc", "sysfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "securityfs", "debugfs",
+                  "tracefs", "configfs", "fusectl", "pstore", "bpf", "mqueue", "hugetlbfs", "autofs",
+                  "binfmt_misc", "efivarfs", "rpc_pipefs", "nsfs"]
+NETWORK_FSTYPES = ["nfs", "nfs4", "cifs", "smb3", "smbfs", "sshfs", "fuse.sshfs", "9p", "afs", "ceph",
+                   "glusterfs", "fuse.glusterfs", "fuse.gvfsd-fuse", "fuse.rclone", "davfs"]
+VM_IMAGE_GLOBS = ["*.qcow2", "*.vmdk", "*.vdi", "*.vhd", "*.vhdx", "*.iso"]
+BUILTIN_PROFILES = {
+    "full": {"exclude": ["/proc", "/sys", "/dev", "/run"] + VM_IMAGE_GLOBS,
+             "exclude_fstypes": PSEUDO_FSTYPES + NETWORK_FSTYPES, "max_size_mb": 512},
+    "quick": {"exclude": [".cache", "node_modules", "__pycache__", ".git"] + VM_IMAGE_GLOBS,
+              "exclude_fstypes": PSEUDO_FSTYPES + NETWORK_FSTYPES, "max_size_mb": 100, "one_filesystem": True},
+}
+
+def glob_to_regex(pattern):
+    """Translate a path glob into a regex valid both for Python and POSIX ERE (clamscan).
+
+    Patterns with a "/" match the whole path, others match the last path
+    component (".cache" prunes every .cache directory). "*" crosses "/".
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            out.append(".*")
+        elif c == "?":
+            out.append(".")
+        elif c == "[" and "]" in pattern[i + 1:]:
+            j = pattern.index("]", i + 1)
+            inner = pattern[i + 1:j]
+            out.append("[" + ("^" + inner[1:] if inner.startswith("!") else inner) + "]")
+            i = j
+        elif c in ".^$+(){}|\\[]":
+            out.append("\\" + c)
+        else:
+            out.append(c)
+        i += 1
+    body = "".join(out)
+    return f"^{body}$" if "/" in pattern else f"(^|/){body}$"
+
+class GlobSet:
+    """Fast matcher for a list of globs, with the same semantics as glob_to_regex().
+
+    Literal names and "*.ext"-style suffixes (the common cases) are set and
+    str.endswith lookups; only the remaining globs go through one regex,
+    matched against the entry name or the full path, never searched.
+    """
+    def __init__(self, patterns):
+        names, suffixes, paths, name_res, path_res = set(), [], set(), [], []
+        for pattern in patterns:
+            magic = any(c in pattern for c in "*?[")
+            if "/" in pattern:
+                (path_res.append(glob_to_regex(pattern)[1:-1]) if magic else paths.add(pattern.rstrip("/") or "/"))
+            elif not magic:
+                names.add(pattern)
+            elif pattern.startswith("*") and not any(c in pattern[1:] for c in "*?["):
+                suffixes.append(pattern[1:])
+            else:
+                name_res.append(glob_to_regex(pattern)[len("(^|/)"):-1])
+        self.names = names
+        self.suffixes = tuple(suffixes)
+        self.paths = paths
+        self._name_re = re.compile("|".join(name_res)).fullmatch if name_res else None
+        self._path_re = re.compile("|".join(path_res)).fullmatch if path_res else None
+
+    def __bool__(self):
+        return bool(self.names or self.suffixes or self.paths or self._name_re or self._path_re)
+
+    def match(self, path, name=None):
+        if name is None:
+            name = os.path.basename(path)
+        return (name in self.names or (self.suffixes and name.endswith(self.suffixes)) or path in self.paths
+                or bool(self._name_re and self._name_re(name)) or bool(self._path_re and self._path_re(path)))
+
+class ScanProfile:
+    """Traversal filters: include/exclude globs, max size, extensions, filesystem limits.
+
+    Walkers ask ``prune_dir`` before queueing a directory, so excluded
+    subtrees (and mount points of excluded filesystem types, or every other
+    filesystem with ``one_filesystem``) are never listed at all; files are
+    checked with ``accept_name`` before they are even stat'ed and with
+    ``accept_size`` afterwards. ``routes`` overrides DEFAULT_ROUTES for the
+    file-type router. ``clamscan_args`` expresses the same rules as
+    clamscan options for the external engines. Call ``bind(roots)`` first.
+    """
+    def __init__(self, name="custom", include=(), exclude=(), max_size_mb=None, extensions=(),
+                 one_filesystem=False, exclude_fstypes=(), routes=None):
+        self.name = name
+        self.routes = dict(routes or {})
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.max_size = int(max_size_mb * 1024 ** 2) if max_size_mb else None
+        self.extensions = {e.lower() if e.startswith(".") else "." + e.lower() for e in extensions}
+        self.one_filesystem = bool(one_filesystem)
+        self.exclude_fstypes = set(exclude_fstypes)
+        self._include = GlobSet(self.include)
+        self._exclude = GlobSet(self.exclude)
+        self.pruned_mounts = set()
+
+    @classmethod
+    def from_dict(cls, name, data):
+        known = {"include", "exclude", "max_size_mb", "extensions", "one_filesystem", "exclude_fstypes", "routes"}
+        unknown = set(data) - known - {"name", "description"}
+        if unknown:
+            raise ValueError(f"unknown profile keys: {', '.join(sorted(unknown))}")
+        return cls(name=data.get("name", name), **{k: v for k, v in data.items() if k in known})
+
+    @classmethod
+    def load(cls, ref):
+        """Load a profile by file path, by name from ~/.cyber_scanner/profiles, or a built-in."""
+        candidates = [ref, os.path.join(STATE_DIR, "profiles", ref + ".json")]
+        for path in candidates:
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    return cls.from_dict(os.path.splitext(os.path.basename(path))[0], json.load(f))
+        if ref in BUILTIN_PROFILES:
+            return cls.from_dict(ref, BUILTIN_PROFILES[ref])
+        raise ValueError(f"no such profile: {ref} (built-ins: {', '.join(BUILTIN_PROFILES)})")
+
+    def bind(self, roots):
+        """Resolve which mount points below ``roots`` are pruned for this scan."""
+        roots = {os.path.abspath(r) for r in roots}
+        pruned = set()
+        if self.exclude_fstypes or self.one_filesystem:
+            try:
+                partitions = psutil.disk_partitions(all=True)
+            except Exception:
+                partitions = []
+            for part in partitions:
+                if part.mountpoint in roots:
+                    continue
+                if self.one_filesystem or part.fstype in self.exclude_fstypes:
+                    pruned.add(part.mountpoint)
+        self.pruned_mounts = pruned
+        return self
+
+    def prune_dir(self, path, name=None):
+        """True when the subtree at ``path`` must not be walked."""
+        return path in self.pruned_mounts or bool(self._exclude and self._exclude.match(path, name))
+
+    def accept_name(self, path, name):
+        if self._exclude and self._exclude.match(path, name):
+            return False
+        if self.extensions and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        return not self._include or self._include.match(path, name)
+
+    def accept_size(self, st):
+        return not self.max_size or st.st_size <= self.max_size
+
+    def size_args(self):
+        if not self.max_size:
+            return []
+        mb = max(1, self.max_size // 1024 ** 2)
+        return [f"--max-filesize={mb}M", f"--max-scansize={mb}M"]
+
+    def clamscan_args(self):
+        """The profile as clamscan/clamdscan-compatible options."""
+        args = []
+        for pattern in self.exclude:
+            regex = glob_to_regex(pattern)
+            args += [f"--exclude-dir={regex}", f"--exclude={regex}"]
+        for mount in sorted(self.pruned_mounts):
+            args.append("--exclude-dir=^" + re.sub(r"([.^$*+?()\[\]{}|\\])", r"\\\1", mount) + "(/|$)")
+        for pattern in self.include:
+            args.append(f"--include={glob_to_regex(pattern)}")
+        if self.extensions:
+            exts = "|".join(re.escape(e[1:]) for e in sorted(self.extensions))
+            args.append(f"--include=\\.({exts})$")
+        args += self.size_args()
+        if self.one_filesystem:
+            args.append("--cross-fs=no")
+        return args
+
+    def expand_roots(self, paths):
+        """Split each root into its unpruned children (for engines that walk internally)."""
+        self.bind(paths)
+        out = []
+        for root in paths:
+            if not os.path.isdir(root):
+                out.append(root)
+                continue
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != QUARANTINE_VAULT_NAME and not self.prune_dir(entry.path, entry.name):
+                                out.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and self.accept_name(entry.path, entry.name):
+                            out.append(entry.path)
+            except OSError:
+                out.append(root)
+        return out
+
+# ---------------------------
+# File-Type Sniffing Stage (magic bytes -> engine routing)
+# ---------------------------
+SNIFF_SIZE = 512
+# (offset, magic, type); first match wins.
+FILE_MAGIC = [
+    (0, b"MZ", "pe"),
+    (0, b"\x7fELF", "elf"),
+    (0, b"\xfe\xed\xfa\xce", "macho"), (0, b"\xfe\xed\xfa\xcf", "macho"),
+    (0, b"\xce\xfa\xed\xfe", "macho"), (0, b"\xcf\xfa\xed\xfe", "macho"),
+    (0, b"\xca\xfe\xba\xbe", "macho"),  # Fat Mach-O, and Java classes
+    (0, b"#!", "script"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "office"),  # OLE2: doc/xls/ppt/msi
+    (0, b"{\\rtf", "office"),
+    (0, b"%PDF", "pdf"),
+    (0, b"PK\x03\x04", "archive"), (0, b"\x1f\x8b", "archive"), (0, b"BZh", "archive"),
+    (0, b"\xfd7zXZ\x00", "archive"), (0, b"7z\xbc\xaf\x27\x1c", "archive"), (0, b"Rar!\x1a\x07", "archive"),
+    (0, b"MSCF", "archive"), (257, b"ustar", "archive"),
+    (0, b"\x89PNG\r\n\x1a\n", "media"), (0, b"\xff\xd8\xff", "media"), (0, b"GIF87a", "media"),
+    (0, b"GIF89a", "media"), (0, b"ID3", "media"), (0, b"OggS", "media"), (0, b"fLaC", "media"),
+    (0, b"\x1a\x45\xdf\xa3", "media"), (4, b"ftyp", "media"), (8, b"WAVE", "media"), (8, b"AVI ", "media"),
+    (8, b"WEBP", "media"),
+]
+OFFICE_ZIP_EXTENSIONS = {".docx", ".docm", ".xlsx", ".xlsm", ".pptx", ".pptm", ".dotm", ".xltm", ".odt", ".ods"}
+SCRIPT_EXTENSIONS = {".ps1", ".psm1", ".vbs", ".vbe", ".js", ".jse", ".wsf", ".wsh", ".hta", ".bat", ".cmd",
+                     ".sh", ".py", ".pl", ".rb", ".php", ".html", ".htm", ".svg", ".lnk", ".scr"}
+# type -> "scan", "skip", or a size in bytes up to which the type is still scanned.
+DEFAULT_ROUTES = {
+    "pe": "scan", "elf": "scan", "macho": "scan", "script": "scan", "office": "scan", "pdf": "scan",
+    "archive": "scan", "data": "scan", "empty": "skip",
+    "media": 256 * 1024,  # Polyglots and droppers hide in small "images"; big media is inert
+    "text": 1024 * 1024,
+}
+
+def sniff_file_type(head, name):
+    """Classify a file from its first bytes (and extension for scripts and OOXML)."""
+    if not head:
+        return "empty"
+    for offset, magic, kind in FILE_MAGIC:
+        if head.startswith(magic, offset):
+            if kind == "archive" and os.path.splitext(name)[1].lower() in OFFICE_ZIP_EXTENSIONS:
+                return "office"
+            return kind
+    if os.path.splitext(name)[1].lower() in SCRIPT_EXTENSIONS:
+        return "script"
+    if b"\0" not in head:
+        try:
+            head[:-3].decode("utf-8")  # The sample may cut a multi-byte character
+            return "text"
+        except UnicodeDecodeError:
+            pass
+    return "data"
+
+class FileTypeRouter:
+    """Reads the first SNIFF_SIZE bytes of each file and decides whether engines see it.
+
+    ``routes`` maps each sniffed type to "scan", "skip" or a maximum size in
+    bytes (larger files of that type are skipped). Walkers call ``admit``
+    before handing a file to an engine; per-type counts, skipped bytes and
+    the time spent sniffing are kept for the summary.
+    """
+    def __init__(self, routes=None):
+        self.routes = dict(DEFAULT_ROUTES)
+        for kind, route in (routes or {}).items():
+            if route not in ("scan", "skip") and not (isinstance(route, int) and route >= 0):
+                raise ValueError(f"bad route for {kind!r}: {route!r} (use scan, skip or a byte size)")
+            self.routes[kind] = route
+        self.counts = {}
+        self.sniff_seconds = 0.0
+        self._lock = Lock()
+
+    def admit(self, path, st, name=None):
+        """True when the file should go to the engines."""
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                head = f.read(SNIFF_SIZE)
+        except OSError:
+            return True  # Let the engine report the error
+        kind = sniff_file_type(head, name or os.path.basename(path))
+        route = self.routes.get(kind, "scan")
+        scan = route == "scan" or (route != "skip" and st.st_size <= route)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.sniff_seconds += elapsed
+            entry = self.counts.setdefault(kind, [0, 0, 0])  # files, skipped, skipped bytes
+            entry[0] += 1
+            if not scan:
+                entry[1] += 1
+                entry[2] += st.st_size
+        return scan
+
+    def summary(self):
+        """{type: {"files", "skipped", "skipped_bytes"}} for every type seen."""
+        with self._lock:
+            return {kind: {"files": c[0], "skipped": c[1], "skipped_bytes": c[2]}
+                    for kind, c in sorted(self.counts.items(), key=lambda kv: -kv[1][0])}
+
+    def time_saved(self, stats):
+        """Engine seconds avoided (skipped bytes at the run's throughput) minus sniffing CPU time.
+
+        Throughput is only trusted once a megabyte has been scanned; tiny
+        runs report just the sniffing cost.
+        """
+        elapsed = time.time() - stats.started
+        rate = stats.bytes / elapsed if elapsed > 0 and stats.bytes >= 1024 ** 2 else 0
+        skipped = sum(c[2] for c in self.counts.values())
+        return (skipped / rate if rate else 0.0) - self.sniff_seconds
+
 # ---------------------------
 # Scanner Engines
 # ---------------------------
-def run_clamscan_collect(paths):
-    """Run ClamAV and collect infected files."""
-    clamscan = is_clamscan_available()
-    if not clamscan:
-        return []
-    cmd = [clamscan, "-r", "--infected", "--no-summary"] + list(paths)
+class Detection(tuple):
+    """A ``(file_path, sig)`` pair that may also carry the file's content digest."""
+    def __new__(cls, file_path, sig, digest=None):
+        self = super().__new__(cls, (file_path, sig))
+        self.digest = digest
+        return self
+
+def parse_clamscan_line(line):
+    """Split a clamscan/clamdscan result line into (file_path, status)."""
+    line = line.strip()
+    if ":" not in line:
+        return None
+    left, right = line.rsplit(":", 1)
+    return left.strip(), right.strip()
+
+def file_size(path):
+    """Size of a file reported by an external engine (0 if it vanished)."""
     try:
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        out_lines = proc.stdout.splitlines()
-    except Exception as e:
-        print(Fore.RED + "[ERROR] ClamAV failed:", e)
-        return []
-    infected = []
-    for line in out_lines:
-        line = line.strip()
-        if not line or not line.endswith(" FOUND"):
+        return os.lstat(path).st_size
+    except OSError:
+        return 0
+
+def iter_clamscan_detections(stream, on_file=None):
+    """Yield (file_path, sig) from clamscan output as each line arrives.
+
+    Only one line is held in memory at a time, so a full-disk scan with
+    millions of "OK" lines keeps memory flat. ``on_file`` is called for
+    every reported file so callers can count progress.
+    """
+    for line in stream:
+        parsed = parse_clamscan_line(line)
+        if not parsed:
             continue
+        file_path, status = parsed
+        if on_file:
+            on_file(file_path)
+        if status.endswith(" FOUND"):
+            yield file_path, status[:-len(" FOUND")].strip()
+
+class ClamscanEngine:
+    """Run clamscan and stream detections while it is still scanning.
+
+    Without a cache clamscan walks ``paths`` itself (``-r``). With one the
+    tree is walked here instead: files with a cached verdict are reported
+    straight away and only the rest are handed to clamscan as a file list,
+    whose verdicts are then recorded.
+    """
+    name = "ClamAV"
+
+    def __init__(self, clamscan=None):
+        self.clamscan = clamscan or is_clamscan_available()
+        self.stats = ScanStats()
+        self.cache = None
+        self.profile = None
+        self.router = None
+        self.proc = None
+        self._stop_event = Event()
+        self._lock = Lock()
+
+    def signature_version(self):
+        return clamav_db_version(self.clamscan)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+
+    def _report(self, file_path, sig, infected, on_detection):
+        self.stats.add_detection()
+        det = Detection(file_path, sig)
+        with self._lock:
+            infected.append(det)
+        if on_detection:
+            on_detection(det)
+
+    def _command(self, paths, file_list=None):
+        if file_list:
+            # The list is already filtered; only the size limits still apply inside clamscan.
+            limits = self.profile.size_args() if self.profile else []
+            return [self.clamscan, "--no-summary"] + limits + [f"--file-list={file_list}"]
+        # No --infected: the per-file "OK" lines give us real progress counts.
+        cmd = [self.clamscan, "-r", "--no-summary"]
+        if self.profile:
+            cmd += self.profile.bind(paths).clamscan_args()
+        return cmd + list(paths)
+
+    def scan(self, paths, on_detection=None):
+        """Scan ``paths`` and return a list of ``(file_path, sig)`` tuples."""
+        if not self.clamscan:
+            return []
+        self._stop_event.clear()
+        infected = []
+        workdir = file_list = None
         try:
-            left, right = line.rsplit(":", 1)
-            file_path = left.strip()
-            sig = right.replace(" FOUND", "").strip()
-            infected.append((file_path, sig))
-        except Exception:
-            pass
-    return infected
+            if self.cache:
+                workdir = tempfile.mkdtemp(prefix="cyber_list_")
+                on_cached = lambda p, verdict: self._report(p, verdict[0], infected, on_detection)
+                lists = plan_shards(paths, 1, workdir, stats=self.stats, stop_event=self._stop_event, cache=self.cache,
+                                    on_cached=on_cached, profile=self.profile, router=self.router)
+                if not lists or self._stop_event.is_set():
+                    return infected
+                file_list = lists[0]
+            try:
+                self.proc = subprocess.Popen(self._command(paths, file_list), stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, text=True, errors="replace", bufsize=1)
+            except Exception as e:
+                print(Fore.RED + "[ERROR] ClamAV activation failed:", e)
+                return infected
+            found = {}
+            on_file = lambda p: self.stats.add_file(p, file_size(p))
+            try:
+                for file_path, sig in iter_clamscan_detections(self.proc.stdout, on_file=on_file):
+                    found[file_path] = sig
+                    self._report(file_path, sig, infected, on_detection)
+            finally:
+                self.proc.stdout.close()
+                self.proc.wait()
+            if file_list and self.proc.returncode in (0, 1) and not self._stop_event.is_set():
+                record_list_verdicts(self.cache, file_list, found)
+        finally:
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+        return infected
+
+def run_clamscan_collect(paths):
+    """Run ClamAV and collect infected files."""
+    return ClamscanEngine().scan(paths)
 
 def run_mp_tasks_and_collect(paths, result_list):
     """Run Windows Defender and collect threats."""
@@ -265,9 +858,1632 @@ def run_mp_tasks_and_collect(paths, result_list):
     except:
         pass
 
+# ---------------------------
+# clamd Daemon Engine (persistent connection pool)
+# ---------------------------
+CLAMD_SOCKET_CANDIDATES = [
+    "/var/run/clamav/clamd.ctl",
+    "/run/clamav/clamd.ctl",
+    "/var/run/clamd.scan/clamd.sock",
+    "/run/clamd.scan/clamd.sock",
+    "/tmp/clamd.socket",
+]
+CLAMD_TCP_DEFAULT = "127.0.0.1:3310"
+CLAMD_CHUNK_SIZE = 256 * 1024
+
+def parse_clamd_address(address):
+    """Turn "unix:/path", "/path", "tcp:host:port" or "host:port" into (family, addr)."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    elif address.startswith("/") or os.path.exists(address):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port or 3310))
+
+def clamd_connect(address, timeout=30):
+    """Open a raw socket to clamd."""
+    family, addr = parse_clamd_address(address)
+    if family == socket.AF_INET:
+        return socket.create_connection(addr, timeout=timeout)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(addr)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def _recv_replies(sock):
+    """Yield NUL-terminated clamd replies until the server closes the socket."""
+    buf = b""
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        buf += data
+        while b"\0" in buf:
+            reply, buf = buf.split(b"\0", 1)
+            yield reply.decode("utf-8", "replace")
+    if buf.strip():
+        yield buf.decode("utf-8", "replace")
+
+def clamd_command(address, command, timeout=5):
+    """Send a one-shot command (PING, VERSION, ...) and return the reply."""
+    with clamd_connect(address, timeout=timeout) as sock:
+        sock.sendall(b"z" + command.encode() + b"\0")
+        return "".join(_recv_replies(sock)).strip()
+
+def find_clamd_address(explicit=None):
+    """Return the first clamd address that answers PING, or None."""
+    candidates = [explicit] if explicit else []
+    if not explicit:
+        if hasattr(socket, "AF_UNIX"):
+            candidates += [c for c in CLAMD_SOCKET_CANDIDATES if os.path.exists(c)]
+        candidates.append(CLAMD_TCP_DEFAULT)
+    for address in candidates:
+        try:
+            if clamd_command(address, "PING", timeout=0.5) == "PONG":
+                return address
+        except (OSError, ValueError):
+            continue
+    return None
+
+class ClamdConnection:
+    """A persistent clamd session (IDSESSION) reused for many commands."""
+    def __init__(self, address, timeout=30):
+        self.sock = clamd_connect(address, timeout=timeout)
+        self.sock.sendall(b"zIDSESSION\0")
+        self._next_id = 1
+        self._buf = b""
+
+    def _read_reply(self):
+        while b"\0" not in self._buf:
+            data = self.sock.recv(65536)
+            if not data:
+                raise ConnectionError("clamd closed the session")
+            self._buf += data
+        reply, self._buf = self._buf.split(b"\0", 1)
+        req_id, _, text = reply.decode("utf-8", "replace").partition(": ")
+        if req_id != str(self._next_id):
+            raise ConnectionError(f"clamd reply out of order: {reply!r}")
+        self._next_id += 1
+        return text
+
+    def instream(self, fileobj):
+        """Stream a file object to clamd in chunks and return the reply."""
+        self.sock.sendall(b"zINSTREAM\0")
+        while True:
+            chunk = fileobj.read(CLAMD_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.sock.sendall(struct.pack("!L", len(chunk)) + chunk)
+        self.sock.sendall(struct.pack("!L", 0))
+        return self._read_reply()
+
+    def close(self):
+        try:
+            self.sock.sendall(b"zEND\0")
+        except OSError:
+            pass
+        self.sock.close()
+
+class ClamdPool:
+    """Bounded pool of persistent clamd sessions shared by worker threads."""
+    def __init__(self, address, size=4, timeout=30):
+        self.address = address
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = Semaphore(size)
+
+    def instream(self, fileobj):
+        """Run INSTREAM on a pooled session, reconnecting once if it went stale."""
+        self._slots.acquire()
+        try:
+            for attempt in range(2):
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = ClamdConnection(self.address, timeout=self.timeout)
+                pos = fileobj.tell()
+                try:
+                    reply = conn.instream(fileobj)
+                except (ConnectionError, socket.timeout):
+                    conn.sock.close()
+                    if attempt:
+                        raise
+                    # clamd drops sessions after IdleTimeout; retry on a fresh one.
+                    fileobj.seek(pos)
+                    continue
+                self._idle.put(conn)
+                return reply
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class ClamdEngine:
+    """Scan through a running clamd so signatures are loaded only once.
+
+    ``instream`` (the default) walks locally and streams every file over
+    pooled sessions: it works even when clamd runs as another user, and
+    gets per-file progress, the verdict cache, profiles, type routing and
+    the vault exclusion from the native walker. ``multiscan`` asks clamd
+    to walk each root itself; clamd then only reports detections, so
+    there is no per-file progress or cache, and hits inside quarantine
+    stores are dropped here.
+    """
+    name = "clamd"
+
+    def __init__(self, address, mode="instream", workers=None, hash_algorithm="sha256"):
+        self.address = address
+        self.mode = mode
+        self.workers = workers or default_worker_count()
+        self.hash_algorithm = hash_algorithm
+        self.pool = ClamdPool(address, size=self.workers)
+        self.stats = ScanStats()
+        self.cache = None  # Only used in instream mode; MULTISCAN walks inside clamd
+        self.profile = None
+        self.router = None  # Likewise instream only
+        self._native = None
+        self._stop_event = Event()
+
+    def signature_version(self):
+        try:
+            return "/".join(clamd_command(self.address, "VERSION").split("/")[:2])
+        except OSError:
+            return ""
+
+    def stop(self):
+        self._stop_event.set()
+        if self._native:
+            self._native.stop()
+
+    def instream_inspector(self, path, st, digest=None):
+        """NativeScanEngine inspector that hands the file content to clamd."""
+        with open(path, "rb") as f:
+            reply = self.pool.instream(f)
+        if reply.endswith(" FOUND"):
+            return reply.rsplit(":", 1)[-1][:-len(" FOUND")].strip()
+        if reply.endswith("ERROR"):
+            raise OSError(reply)
+        return None
+
+    def _multiscan(self, root, infected, on_detection):
+        with clamd_connect(self.address, timeout=None) as sock:
+            sock.sendall(b"zMULTISCAN " + os.path.abspath(root).encode() + b"\0")
+            for reply in _recv_replies(sock):
+                if self._stop_event.is_set():
+                    return
+                parsed = parse_clamscan_line(reply)
+                if not parsed:
+                    continue
+                file_path, status = parsed
+                if QUARANTINE_VAULT_NAME in file_path.split(os.sep):
+                    continue  # Already isolated; clamd cannot be told to skip the stores
+                self.stats.add_file(file_path, file_size(file_path))
+                if status.endswith(" FOUND"):
+                    sig = status[:-len(" FOUND")].strip()
+                    self.stats.add_detection()
+                    det = Detection(file_path, sig)
+                    infected.append(det)
+                    if on_detection:
+                        on_detection(det)
+                elif status.endswith("ERROR"):
+                    self.stats.add_error()
+
+    def scan(self, paths, on_detection=None):
+        """Scan ``paths`` and return a list of ``(file_path, sig)`` tuples."""
+        self._stop_event.clear()
+        if self.mode == "instream":
+            self._native = NativeScanEngine(workers=self.workers, inspectors=[self.instream_inspector],
+                                            hash_algorithm=self.hash_algorithm)
+            self._native.stats = self.stats
+            self._native.cache = self.cache
+            self._native.profile = self.profile
+            self._native.router = self.router
+            try:
+                return self._native.scan(paths, on_detection)
+            finally:
+                self.pool.close()
+        infected = []
+        # clamd walks each root itself, so a profile can only prune at the first level.
+        roots = self.profile.expand_roots(paths) if self.profile else paths
+        for root in roots:
+            if self._stop_event.is_set():
+                break
+            try:
+                self._multiscan(root, infected, on_detection)
+            except OSError as e:
+                print(Fore.RED + "[ERROR] clamd scan failed:", e)
+        return infected
+
+# ---------------------------
+# Native Scan Engine (parallel walker + worker pool)
+# ---------------------------
+# Standard anti-malware test file (https://www.eicar.org). ClamAV reports it
+# as "Eicar-Test-Signature", so we use the same name for consistency.
+EICAR_SIGNATURE = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+EICAR_MAX_SIZE = 128
+# 1 MiB reads keep the kernel readahead window full without big allocations.
+HASH_READ_SIZE = 1024 * 1024
+MMAP_MIN_SIZE = 4 * HASH_READ_SIZE
+# Per-run in-memory digest -> verdict memo; beyond this only the cache is used.
+DIGEST_MEMO_MAX = 200000
+
+def default_worker_count():
+    """Default number of file-inspection workers (I/O bound, so oversubscribe)."""
+    return min(32, (os.cpu_count() or 1) * 2)
+
+def eicar_match(head, size):
+    """Return the EICAR signature name if ``head`` is the test file (trailing whitespace allowed)."""
+    if len(EICAR_SIGNATURE) <= size <= EICAR_MAX_SIZE and head.startswith(EICAR_SIGNATURE):
+        return "Eicar-Test-Signature"
+    return None
+
+class _EicarStream:
+    """Chunk-fed EICAR check for archive members."""
+    def __init__(self):
+        self.head = b""
+        self.size = 0
+
+    def update(self, chunk):
+        if len(self.head) < EICAR_MAX_SIZE:
+            self.head += chunk[:EICAR_MAX_SIZE - len(self.head)]
+        self.size += len(chunk)
+        return None
+
+    def finish(self):
+        return eicar_match(self.head, self.size)
+
+class EicarInspector:
+    """Detect the EICAR test string in files and streamed archive members."""
+    signature_version = "eicar_inspector"
+
+    def __call__(self, path, st, digest=None):
+        if st.st_size < len(EICAR_SIGNATURE) or st.st_size > EICAR_MAX_SIZE:
+            return None
+        with open(path, "rb") as f:
+            return eicar_match(f.read(EICAR_MAX_SIZE), st.st_size)
+
+    def stream_scanner(self):
+        return _EicarStream()
+
+eicar_inspector = EicarInspector()
+
+def hash_file(path, algorithm="sha256"):
+    """Hash a file with large sequential reads; returns ("algo:hexdigest", size).
+
+    Big files are mmap'd and fed to hashlib in HASH_READ_SIZE slices (hashlib
+    releases the GIL, so worker threads hash in parallel); small files use
+    plain buffered reads.
+    """
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mm) as view:
+                    for off in range(0, len(view), HASH_READ_SIZE):
+                        h.update(view[off:off + HASH_READ_SIZE])
+        else:
+            while True:
+                chunk = f.read(HASH_READ_SIZE)
+                if not chunk:
+                    break
+                h.update(chunk)
+    return f"{algorithm}:{h.hexdigest()}", size
+
+class ScanStats:
+    """Thread-safe counters shared between a scan engine and the UI."""
+    def __init__(self):
+        self._lock = Lock()
+        self.files = 0
+        self.bytes = 0
+        self.dirs = 0
+        self.errors = 0
+        self.detections = 0
+        self.hashed_bytes = 0
+        self.hash_seconds = 0.0
+        self.archive_members = 0
+        self.archive_limited = 0
+        self.skipped = 0  # Files the type router kept away from the engines
+        self.skipped_bytes = 0
+        self.total_files = 0  # Filled in by estimate_scan_totals()
+        self.total_bytes = 0
+        self.current = ""
+        self.started = time.time()
+
+    def add_file(self, path, size):
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.current = path
+
+    def add_dir(self):
+        with self._lock:
+            self.dirs += 1
+
+    def add_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def add_detection(self):
+        with self._lock:
+            self.detections += 1
+
+    def add_skipped(self, size):
+        with self._lock:
+            self.skipped += 1
+            self.skipped_bytes += size
+
+    def add_members(self, members, limited):
+        with self._lock:
+            self.archive_members += members
+            self.archive_limited += limited
+
+    def set_totals(self, files, size):
+        with self._lock:
+            self.total_files = files
+            self.total_bytes = size
+
+    def progress(self):
+        """Percent done from real counters, or None while totals are unknown."""
+        with self._lock:
+            if self.total_bytes:
+                done = (self.bytes + self.skipped_bytes) / self.total_bytes
+            elif self.total_files:
+                done = (self.files + self.skipped) / self.total_files
+            else:
+                return None
+        return min(done * 100.0, 99.9)
+
+    def add_hashed(self, size, seconds):
+        with self._lock:
+            self.hashed_bytes += size
+            self.hash_seconds += seconds
+
+    def hash_mb_per_sec(self):
+        """Aggregate hashing throughput across all worker threads."""
+        elapsed = time.time() - self.started
+        return self.hashed_bytes / (1024 ** 2) / elapsed if elapsed > 0 else 0.0
+
+    def files_per_sec(self):
+        elapsed = time.time() - self.started
+        return self.files / elapsed if elapsed > 0 else 0.0
+
+class ParallelWalker:
+    """Multithreaded os.scandir tree walker.
+
+    Directories are shared between walker threads through an unbounded queue;
+    every regular file found is handed to ``emit(path, stat_result)``. When
+    ``emit`` is a bounded ``queue.Queue.put`` the walkers block while the
+    inspection workers catch up, so memory stays flat on huge trees. A
+    ``profile`` prunes excluded subtrees before they are listed, and a
+    ``router`` (FileTypeRouter) drops files whose sniffed type is not worth
+    scanning.
+    """
+    def __init__(self, paths, threads=4, stats=None, stop_event=None, profile=None, router=None):
+        self.paths = list(paths)
+        self.threads = max(1, threads)
+        self.stats = stats or ScanStats()
+        self.profile = profile.bind(self.paths) if profile else None
+        self.router = router
+        self._stop_event = stop_event or Event()
+        self._dir_q = queue.Queue()
+
+    def _walk_dir(self, path, emit):
+        profile, router = self.profile, self.router
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if self._stop_event.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != QUARANTINE_VAULT_NAME and \
+                                    not (profile and profile.prune_dir(entry.path, entry.name)):
+                                self._dir_q.put(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            if profile and not profile.accept_name(entry.path, entry.name):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                            if profile and not profile.accept_size(st):
+                                continue
+                            if router and not router.admit(entry.path, st, entry.name):
+                                self.stats.add_skipped(st.st_size)
+                                continue
+                            emit((entry.path, st))
+                    except OSError:
+                        self.stats.add_error()
+            self.stats.add_dir()
+        except OSError:
+            self.stats.add_error()
+
+    def _worker(self, emit):
+        while True:
+            path = self._dir_q.get()
+            try:
+                if path is None:
+                    return
+                if not self._stop_event.is_set():
+                    self._walk_dir(path, emit)
+            finally:
+                self._dir_q.task_done()
+
+    def run(self, emit):
+        """Walk all roots in the order given, blocking until every directory has been visited.
+
+        Each directory root is finished (its subtree walked by all threads)
+        before the next root is started or a later file root is emitted, so
+        callers can list the roots that matter most first.
+        """
+        threads = [Thread(target=self._worker, args=(emit,), daemon=True) for _ in range(self.threads)]
+        for t in threads:
+            t.start()
+        try:
+            for root in self.paths:
+                if self._stop_event.is_set():
+                    break
+                try:
+                    st = os.stat(root)
+                except OSError:
+                    self.stats.add_error()
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    self._dir_q.put(root)
+                    self._dir_q.join()
+                elif stat.S_ISREG(st.st_mode):
+                    emit((root, st))
+        finally:
+            for _ in threads:
+                self._dir_q.put(None)
+            for t in threads:
+                t.join()
+
+def estimate_scan_totals(paths, stats, stop_event=None, profile=None):
+    """Metadata-only pre-pass that fills ``stats.total_files/total_bytes``.
+
+    Whole filesystems (mount points) are sized instantly from statvfs used
+    inodes and psutil.disk_usage; anything else is counted with a stat-only
+    parallel walk, which runs far ahead of the engines actually reading files.
+    """
+    files = size = 0
+    walk_roots = []
+    for root in paths:
+        # statvfs counts everything on the filesystem, including what a profile prunes.
+        if not profile and os.path.ismount(root) and hasattr(os, "statvfs"):
+            try:
+                vfs = os.statvfs(root)
+                files += vfs.f_files - vfs.f_ffree
+                size += psutil.disk_usage(root).used
+                continue
+            except OSError:
+                pass
+        walk_roots.append(root)
+    if walk_roots:
+        lock = Lock()
+        counts = [0, 0]
+
+        def count(item):
+            with lock:
+                counts[0] += 1
+                counts[1] += item[1].st_size
+
+        ParallelWalker(walk_roots, threads=4, stop_event=stop_event, profile=profile).run(count)
+        files += counts[0]
+        size += counts[1]
+    if not (stop_event and stop_event.is_set()):
+        stats.set_totals(files, size)
+
+class NativeScanEngine:
+    """Built-in scan engine: parallel walker feeding a bounded worker queue.
+
+    ``inspectors`` are callables ``(path, stat_result, digest) -> signature
+    or None``; the first one to return a signature wins. With a
+    ``hash_algorithm`` every file is hashed first and files with content
+    already seen (this run or, through the cache, earlier runs) reuse that
+    verdict instead of being inspected again; inspectors whose verdict also
+    depends on the file name expose ``name_key(path)``, which becomes part
+    of that reuse key. An ``unpacker`` additionally
+    streams the members of clean archives through the inspectors, on the
+    same worker threads.
+    """
+    name = "Native"
+    version = "1"
+
+    def __init__(self, workers=None, walkers=None, queue_size=4096, inspectors=None, hash_algorithm="sha256",
+                 unpacker=None):
+        self.workers = workers or default_worker_count()
+        self.walkers = walkers or min(8, self.workers)
+        self.queue_size = queue_size
+        self.inspectors = list(inspectors) if inspectors is not None else [eicar_inspector]
+        self.hash_algorithm = hash_algorithm
+        self.unpacker = unpacker
+        self.stats = ScanStats()
+        self.cache = None
+        self.profile = None
+        self.router = None
+        self._digest_memo = {}
+        self._stop_event = Event()
+        self._lock = Lock()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def signature_version(self):
+        names = ",".join(getattr(i, "signature_version", None) or getattr(i, "__name__", type(i).__name__)
+                         for i in self.inspectors)
+        unpack = f" {self.unpacker.version}" if self.unpacker else ""
+        return f"Native {self.version} [{names}] {self.hash_algorithm or 'nohash'}{unpack}"
+
+    def inspect_file(self, path, st, digest=None):
+        """Run every inspector against a single file."""
+        for inspector in self.inspectors:
+            sig = inspector(path, st, digest)
+            if sig:
+                return sig
+        return None
+
+    def inspect_archive(self, path):
+        """Return ``("path!member", sig)`` when a member of archive ``path`` is detected, else None."""
+        if not self.unpacker or not self.unpacker.is_archive(path):
+            return None
+        return self.unpacker.scan(path, self.inspectors, self.stats)
+
+    def _hash(self, path):
+        start = time.perf_counter()
+        digest, size = hash_file(path, self.hash_algorithm)
+        self.stats.add_hashed(size, time.perf_counter() - start)
+        return digest
+
+    def _verdict_key(self, digest, path):
+        """Key for reusing a verdict: the digest, plus the name class for name-dependent inspectors."""
+        names = [i.name_key(path) for i in self.inspectors if hasattr(i, "name_key")]
+        return f"{digest}|{','.join(names)}" if names else digest
+
+    def _digest_verdict(self, key):
+        verdict = self._digest_memo.get(key)
+        if verdict is None and self.cache:
+            verdict = self.cache.lookup_digest(key)
+        return verdict
+
+    def _remember_digest(self, key, sig):
+        if len(self._digest_memo) < DIGEST_MEMO_MAX:
+            self._digest_memo[key] = sig or ""
+        if self.cache:
+            self.cache.record_digest(key, sig)
+
+    def _worker(self, file_q, detections, on_detection):
+        while True:
+            item = file_q.get()
+            if item is None:
+                return
+            if self._stop_event.is_set():
+                continue
+            try:
+                self._scan_one(*item, detections, on_detection)
+            except Exception:
+                # Unreadable, truncated-under-mmap or malformed files (and inspector
+                # bugs) cost one file, never the worker: a dead worker would leave the
+                # walker blocked on the bounded queue.
+                self.stats.add_error()
+
+    def _scan_one(self, path, st, detections, on_detection):
+        key = None
+        if self.cache:
+            key = cache_key(path, st)
+            cached = self.cache.lookup(key)
+            if cached is not None:
+                self.stats.add_file(path, st.st_size)
+                sig, digest = cached
+                if sig:
+                    self._report(Detection(path, sig, digest or None), detections, on_detection)
+                return
+        label = path
+        digest = self._hash(path) if self.hash_algorithm else None
+        verdict_key = self._verdict_key(digest, path) if digest else None
+        sig = self._digest_verdict(verdict_key) if verdict_key else None
+        if sig is None:
+            sig = self.inspect_file(path, st, digest)
+            if not sig:
+                hit = self.inspect_archive(path)
+                if hit:
+                    label, sig = hit
+            if verdict_key:
+                self._remember_digest(verdict_key, sig)
+        self.stats.add_file(path, st.st_size)
+        if key:
+            self.cache.record(key, path, sig, digest)
+        if sig:
+            self._report(Detection(label, sig, digest), detections, on_detection)
+
+    def _report(self, det, detections, on_detection):
+        self.stats.add_detection()
+        with self._lock:
+            detections.append(det)
+        if on_detection:
+            on_detection(det)
+
+    def scan(self, paths, on_detection=None):
+        """Scan ``paths`` and return a list of ``(file_path, sig)`` tuples."""
+        self._stop_event.clear()
+        self._digest_memo = {}
+        detections = []
+        file_q = queue.Queue(maxsize=self.queue_size)
+        workers = [Thread(target=self._worker, args=(file_q, detections, on_detection), daemon=True)
+                   for _ in range(self.workers)]
+        for t in workers:
+            t.start()
+        walker = ParallelWalker(paths, threads=self.walkers, stats=self.stats, stop_event=self._stop_event,
+                                profile=self.profile, router=self.router)
+        try:
+            walker.run(file_q.put)
+        finally:
+            for _ in workers:
+                # Never block on a full queue once no worker is left to drain it.
+                while any(t.is_alive() for t in workers):
+                    try:
+                        file_q.put(None, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+            for t in workers:
+                t.join()
+            if self.cache:
+                self.cache.flush()  # Later scans in this process see this run's verdicts
+        return detections
+
+# ---------------------------
+# Hash Blocklist Engine (compact mmap'd SHA-256 index)
+# ---------------------------
+BLOCKLIST_MAGIC = b"CYBLK1\0\0"
+BLOCKLIST_HEADER = struct.Struct("<8sQQQ")  # magic, count, source size, source mtime_ns
+BLOCKLIST_BUCKETS = 65536  # Indexed by the first two digest bytes
+DIGEST_SIZE = 32
+
+def _parse_blocklist_line(line):
+    """Return the raw SHA-256 from a blocklist line (hex first field), or None."""
+    line = line.strip()
+    if not line or line.startswith((b"#", b"//")):
+        return None
+    token = line.replace(b",", b" ").replace(b'"', b" ").split()[0]
+    if len(token) != 2 * DIGEST_SIZE:
+        return None
+    try:
+        return bytes.fromhex(token.decode("ascii"))
+    except ValueError:
+        return None
+
+def build_blocklist_index(source, index_path):
+    """Compile a text SHA-256 list into a sorted fixed-width binary index.
+
+    Layout: header, 65537 uint32 bucket offsets (first two digest bytes),
+    then every digest as 32 raw bytes in sorted order.
+    """
+    with open(source, "rb") as f:
+        digests = sorted({d for d in map(_parse_blocklist_line, f) if d})
+    buckets = array("I", [0] * (BLOCKLIST_BUCKETS + 1))
+    for d in digests:
+        buckets[((d[0] << 8) | d[1]) + 1] += 1
+    for i in range(1, len(buckets)):
+        buckets[i] += buckets[i - 1]
+    if sys.byteorder != "little":
+        buckets.byteswap()
+    st = os.stat(source)
+    tmp = index_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(BLOCKLIST_HEADER.pack(BLOCKLIST_MAGIC, len(digests), st.st_size, st.st_mtime_ns))
+        f.write(buckets.tobytes())
+        f.write(b"".join(digests))
+    os.replace(tmp, index_path)
+    return len(digests)
+
+class HashBlocklist:
+    """Native-engine inspector matching SHA-256 digests against a blocklist.
+
+    The text list is compiled once into a ``.idx`` file next to it (or in
+    ~/.cyber_scanner when that is read-only); later runs just mmap it, so
+    loading millions of entries takes milliseconds and little memory.
+    """
+    def __init__(self, source, sig="Hash.Blocklist"):
+        self.source = source
+        self.sig = sig
+        self.index_path = self._index_path(source)
+        st = os.stat(source)
+        if not self._index_is_fresh(st):
+            build_blocklist_index(source, self.index_path)
+        self._file = open(self.index_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, self.count, _, _ = BLOCKLIST_HEADER.unpack_from(self._mm, 0)
+        bucket_bytes = 4 * (BLOCKLIST_BUCKETS + 1)
+        self._buckets = array("I")
+        self._buckets.frombytes(self._mm[BLOCKLIST_HEADER.size:BLOCKLIST_HEADER.size + bucket_bytes])
+        if sys.byteorder != "little":
+            self._buckets.byteswap()
+        self._base = BLOCKLIST_HEADER.size + bucket_bytes
+        self.signature_version = f"HashBlocklist:{self.count}:{st.st_mtime_ns}"
+
+    @staticmethod
+    def _index_path(source):
+        candidate = source + ".idx"
+        if os.access(os.path.dirname(os.path.abspath(candidate)), os.W_OK):
+            return candidate
+        os.makedirs(STATE_DIR, exist_ok=True)
+        return os.path.join(STATE_DIR, os.path.basename(source) + ".idx")
+
+    def _index_is_fresh(self, st):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, _, size, mtime_ns = BLOCKLIST_HEADER.unpack(f.read(BLOCKLIST_HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == BLOCKLIST_MAGIC and size == st.st_size and mtime_ns == st.st_mtime_ns
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        off = self._base + i * DIGEST_SIZE
+        return self._mm[off:off + DIGEST_SIZE]
+
+    def contains(self, raw_digest):
+        """Binary-search one bucket of the sorted index for a raw digest."""
+        b = (raw_digest[0] << 8) | raw_digest[1]
+        lo, hi = self._buckets[b], self._buckets[b + 1]
+        i = bisect.bisect_left(self, raw_digest, lo, hi)
+        return i < hi and self[i] == raw_digest
+
+    def __call__(self, path, st, digest=None):
+        if not (digest and digest.startswith("sha256:")):
+            digest, _ = hash_file(path, "sha256")
+        return self.sig if self.contains(bytes.fromhex(digest[len("sha256:"):])) else None
+
+    def stream_scanner(self):
+        return _BlocklistStream(self)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+class _BlocklistStream:
+    """Chunk-fed SHA-256 of an archive member, checked against the blocklist at the end."""
+    def __init__(self, blocklist):
+        self.blocklist = blocklist
+        self.hasher = hashlib.sha256()
+
+    def update(self, chunk):
+        self.hasher.update(chunk)
+        return None
+
+    def finish(self):
+        return self.blocklist.sig if self.blocklist.contains(self.hasher.digest()) else None
+
+# ---------------------------
+# Byte-Signature Engine (Aho-Corasick over streamed chunks)
+# ---------------------------
+SIG_CHUNK_SIZE = 64 * 1024
+SIG_MAX_SCAN_SIZE = 100 * 1024 * 1024  # Same default as ClamAV's MaxScanSize
+
+def load_signature_rules(path):
+    """Read ``Name:HexPattern`` rules (ClamAV ``.ndb`` lines also accepted).
+
+    For ``Name:Target:Offset:Hex`` lines only the name and hex pattern are
+    used; patterns with wildcards are skipped. Returns [(name, bytes)].
+    """
+    rules = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(":")
+            if len(fields) < 2:
+                continue
+            try:
+                pattern = bytes.fromhex(fields[3] if len(fields) >= 4 else fields[1])
+            except ValueError:
+                continue
+            if pattern:
+                rules.append((fields[0], pattern))
+    return rules
+
+class AhoCorasick:
+    """Multi-pattern byte matcher whose cost is linear in the input size.
+
+    ``feed`` takes and returns the automaton state, so a file can be pushed
+    through chunk by chunk: a pattern straddling a chunk boundary is still
+    found because the partial match lives in the carried state, with no
+    overlap re-reading needed. While the automaton sits in the root state it
+    jumps ahead with a C-level regex search for the next byte that can start
+    a pattern, which skips most of the input for typical rule sets.
+    """
+    def __init__(self, patterns):
+        self.names = [name for name, _ in patterns]
+        goto = [{}]
+        out = [()]
+        for idx, (_, pattern) in enumerate(patterns):
+            state = 0
+            for b in pattern:
+                nxt = goto[state].get(b)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][b] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (idx,)
+        fail = [0] * len(goto)
+        todo = deque(goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for b, nxt in goto[state].items():
+                todo.append(nxt)
+                f = fail[state]
+                while f and b not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(b, 0)
+                out[nxt] += out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        starts = bytes(sorted(goto[0]))
+        self._root_skip = None
+        if starts and len(starts) < 256:
+            self._root_skip = re.compile(b"[" + b"".join(re.escape(bytes([b])) for b in starts) + b"]").search
+
+    def feed(self, data, state=0):
+        """Advance over ``data``; returns (state, first matching pattern index or None)."""
+        goto, fail, out, skip = self._goto, self._fail, self._out, self._root_skip
+        i, n = 0, len(data)
+        while i < n:
+            if not state and skip:
+                m = skip(data, i)
+                if m is None:
+                    return 0, None
+                i = m.start()
+            b = data[i]
+            i += 1
+            nxt = goto[state].get(b)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(b)
+            state = nxt or 0
+            if out[state]:
+                return state, out[state][0]
+        return state, None
+
+    def scan_stream(self, fileobj, chunk_size=SIG_CHUNK_SIZE, limit=SIG_MAX_SCAN_SIZE):
+        """Return the name of the first pattern found in the stream, or None."""
+        state = 0
+        seen = 0
+        while seen < limit:
+            chunk = fileobj.read(min(chunk_size, limit - seen))
+            if not chunk:
+                break
+            seen += len(chunk)
+            state, idx = self.feed(chunk, state)
+            if idx is not None:
+                return self.names[idx]
+        return None
+
+class SignatureMatcher:
+    """Native-engine inspector streaming each file through an Aho-Corasick automaton."""
+    def __init__(self, rule_file):
+        rules = load_signature_rules(rule_file)
+        self.automaton = AhoCorasick(rules)
+        self.count = len(rules)
+        self.signature_version = f"Signatures:{self.count}:{os.stat(rule_file).st_mtime_ns}"
+
+    def __call__(self, path, st, digest=None):
+        if not self.count:
+            return None
+        with open(path, "rb") as f:
+            return self.automaton.scan_stream(f)
+
+    def stream_scanner(self):
+        return _SignatureStream(self.automaton) if self.count else None
+
+class _SignatureStream:
+    """Chunk-fed automaton run over an archive member; the state carries across chunks."""
+    def __init__(self, automaton):
+        self.automaton = automaton
+        self.state = 0
+        self.seen = 0
+
+    def update(self, chunk):
+        if self.seen >= SIG_MAX_SCAN_SIZE:
+            return None
+        chunk = chunk[:SIG_MAX_SCAN_SIZE - self.seen]
+        self.seen += len(chunk)
+        self.state, idx = self.automaton.feed(chunk, self.state)
+        return self.automaton.names[idx] if idx is not None else None
+
+    def finish(self):
+        return None
+
+# ---------------------------
+# Archive Unpacking Stage (streamed members, zip-bomb limits)
+# ---------------------------
+# Defaults follow ClamAV's MaxFileSize / MaxScanSize / MaxFiles.
+ARCHIVE_MAX_DEPTH = 4
+ARCHIVE_MAX_MEMBER_SIZE = SIG_MAX_SCAN_SIZE
+ARCHIVE_MAX_TOTAL_SIZE = 4 * SIG_MAX_SCAN_SIZE
+ARCHIVE_MAX_FILES = 10000
+ARCHIVE_MAX_RATIO = 100
+ARCHIVE_RATIO_MIN_SIZE = 1024 * 1024  # Smaller members are cheap to scan whatever their ratio
+# Nested zips need random access; only ones this small are buffered in memory.
+ARCHIVE_NESTED_BUFFER = 32 * 1024 * 1024
+ARCHIVE_HEAD_SIZE = 512  # The ustar magic sits at offset 257
+
+def sniff_archive(head):
+    """Return "zip", "tar", "gz", "bz2" or "xz" for a file's leading bytes, or None."""
+    if head.startswith(b"PK\x03\x04"):
+        return "zip"
+    if head.startswith(b"\x1f\x8b"):
+        return "gz"
+    if head.startswith(b"BZh"):
+        return "bz2"
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return "xz"
+    if head[257:262] == b"ustar":
+        return "tar"
+    return None
+
+class ArchiveLimitExceeded(Exception):
+    """The archive ran past its total size or member-count budget."""
+
+class _ArchiveWalk:
+    """Per-archive budget and counters for one ArchiveUnpacker.scan() call."""
+    def __init__(self, scanners, max_total_size, max_files):
+        self.scanners = scanners
+        self.remaining = max_total_size
+        self.files_left = max_files
+        self.members = 0
+        self.limited = 0
+
+class ArchiveUnpacker:
+    """Scan archive members as streams, without extracting them to disk.
+
+    zip (jar, wheel, apk, ...) members are inflated incrementally through
+    ``ZipFile.open``; tar, plain or gz/bz2/xz-compressed, is read in
+    streaming ``r|*`` mode, and a bare gz/bz2/xz file counts as one member.
+    Every member is read once, chunk by chunk, and each chunk goes to all
+    inspectors that offer ``stream_scanner()``. Archives nested inside
+    members are followed up to ``max_depth`` levels.
+
+    Zip-bomb limits: a member is cut off after ``max_member_size`` bytes,
+    zip members whose declared compression ratio exceeds ``max_ratio`` are
+    skipped, and one archive stops after ``max_total_size`` bytes or
+    ``max_files`` members in total.
+    """
+    def __init__(self, max_depth=ARCHIVE_MAX_DEPTH, max_member_size=ARCHIVE_MAX_MEMBER_SIZE,
+                 max_total_size=ARCHIVE_MAX_TOTAL_SIZE, max_files=ARCHIVE_MAX_FILES,
+                 max_ratio=ARCHIVE_MAX_RATIO, chunk_size=SIG_CHUNK_SIZE):
+        self.max_depth = max_depth
+        self.max_member_size = max_member_size
+        self.max_total_size = max_total_size
+        self.max_files = max_files
+        self.max_ratio = max_ratio
+        self.chunk_size = chunk_size
+        self.version = f"Archives:{max_depth}:{max_member_size}:{max_total_size}:{max_files}:{max_ratio}"
+
+    @staticmethod
+    def is_archive(path):
+        with open(path, "rb") as f:
+            return sniff_archive(f.read(ARCHIVE_HEAD_SIZE)) is not None
+
+    def scan(self, path, inspectors, stats=None):
+        """Return ``("path!member", sig)`` for the first detection inside ``path``, or None."""
+        factories = [i.stream_scanner for i in inspectors if hasattr(i, "stream_scanner")]
+        if not factories:
+            return None
+        walk = _ArchiveWalk(factories, self.max_total_size, self.max_files)
+        try:
+            with open(path, "rb") as f:
+                return self._scan_container(f, path, os.fstat(f.fileno()).st_size, 1, walk)
+        except ArchiveLimitExceeded:
+            walk.limited += 1
+            return None
+        except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError, lzma.LZMAError, zlib.error,
+                ValueError, NotImplementedError):
+            return None  # Damaged or not really an archive; the file itself was already inspected
+        finally:
+            if stats:
+                stats.add_members(walk.members, walk.limited)
+
+    def _scan_container(self, fileobj, label, packed_size, depth, walk):
+        head = fileobj.read(ARCHIVE_HEAD_SIZE)
+        fileobj.seek(0)
+        kind = sniff_archive(head)
+        if kind == "zip":
+            return self._scan_zip(fileobj, label, depth, walk)
+        if kind is None:
+            return None
+        yielded = [0]  # Members this tar stream produced before any error
+        try:
+            with tarfile.open(fileobj=fileobj, mode="r|*") as tf:
+                return self._scan_tar(tf, label, packed_size, depth, walk, yielded)
+        except tarfile.ReadError:
+            if kind == "tar" or yielded[0]:
+                return None  # Damaged tar: whatever was readable has been scanned
+        # A compressed stream that is not a tar: scan its payload as a single member.
+        fileobj.seek(0)
+        name = os.path.basename(label.rsplit("!", 1)[-1])
+        inner = name.rsplit(".", 1)[0] if "." in name else name
+        if kind == "gz":
+            member = gzip.GzipFile(fileobj=fileobj)
+        else:
+            member = (bz2.BZ2File if kind == "bz2" else lzma.LZMAFile)(fileobj)
+        with member:
+            return self._scan_member(member, f"{label}!{inner}", packed_size, depth, walk)
+
+    def _scan_zip(self, fileobj, label, depth, walk):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or info.flag_bits & 0x1:  # Encrypted members cannot be read
+                    continue
+                if info.file_size > self.max_ratio * max(info.compress_size, 1) and \
+                        info.file_size > ARCHIVE_RATIO_MIN_SIZE:
+                    walk.limited += 1
+                    continue
+                with zf.open(info) as member:
+                    hit = self._scan_member(member, f"{label}!{info.filename}", info.compress_size, depth, walk)
+                if hit:
+                    return hit
+        return None
+
+    def _scan_tar(self, tf, label, packed_size, depth, walk, yielded):
+        unpacked = 0
+        for info in tf:
+            yielded[0] += 1
+            if not info.isfile():
+                continue
+            unpacked += info.size
+            # Compressed tars only expose the ratio as a whole.
+            if unpacked > self.max_ratio * max(packed_size, 1) and unpacked > ARCHIVE_RATIO_MIN_SIZE:
+                walk.limited += 1
+                raise ArchiveLimitExceeded(label)
+            member = tf.extractfile(info)
+            if member is None:
+                continue
+            hit = self._scan_member(member, f"{label}!{info.name}", info.size, depth, walk)
+            if hit:
+                return hit
+        return None
+
+    def _scan_member(self, member, label, packed_size, depth, walk):
+        """Stream one member through the inspectors, then recurse if it is an archive itself."""
+        if walk.files_left <= 0:
+            raise ArchiveLimitExceeded(label)
+        walk.files_left -= 1
+        walk.members += 1
+        scanners = [s for s in (factory() for factory in walk.scanners) if s]
+        nested = None
+        read = 0
+        while True:
+            chunk = member.read(min(self.chunk_size, self.max_member_size - read))
+            if not chunk:
+                break
+            if not read and depth < self.max_depth and sniff_archive(chunk[:ARCHIVE_HEAD_SIZE]):
+                nested = bytearray()
+            read += len(chunk)
+            walk.remaining -= len(chunk)
+            if walk.remaining < 0:
+                raise ArchiveLimitExceeded(label)
+            for scanner in scanners:
+                sig = scanner.update(chunk)
+                if sig:
+                    return label, sig
+            if nested is not None:
+                if len(nested) + len(chunk) > ARCHIVE_NESTED_BUFFER:
+                    nested = None
+                    walk.limited += 1
+                else:
+                    nested += chunk
+            if read >= self.max_member_size:
+                if member.read(1):
+                    walk.limited += 1
+                break
+        for scanner in scanners:
+            sig = scanner.finish()
+            if sig:
+                return label, sig
+        if nested:
+            try:
+                return self._scan_container(io.BytesIO(nested), label, packed_size, depth + 1, walk)
+            except (zipfile.BadZipFile, tarfile.TarError, EOFError, lzma.LZMAError, zlib.error, OSError,
+                    ValueError, NotImplementedError):
+                return None  # A damaged nested archive must not hide the members after it
+        return None
+
+# ---------------------------
+# Entropy Heuristics (packed executables, encrypted output)
+# ---------------------------
+HEUR_BLOCK_SIZE = 64 * 1024
+HEUR_MIN_SIZE = 4096  # Entropy of smaller files says little
+# Without NumPy only this many bytes per file are counted, as evenly spaced blocks.
+HEUR_SAMPLE_BYTES = 8 * 1024 ** 2
+HEUR_THRESHOLD = 70
+HEUR_HIGH_ENTROPY = 7.2  # bits/byte: compressed or encrypted
+HEUR_CIPHER_ENTROPY = 7.9  # Indistinguishable from random
+# Section names and stub markers of common executable packers/protectors.
+PACKER_MARKERS = [b"UPX!", b"UPX0", b"UPX1", b".aspack", b".adata", b"MPRESS1", b".petite", b"PEC2",
+                  b".nsp0", b".vmp0", b"Themida", b"FSG!"]
+# Formats that always start with a recognizable header; random bytes under one
+# of these names mean the file was encrypted in place.
+HEADERED_EXTENSIONS = {".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".ods", ".pdf", ".rtf",
+                       ".jpg", ".jpeg", ".png", ".gif", ".psd", ".mp3", ".mp4", ".zip", ".7z", ".sqlite",
+                       ".txt", ".csv"}
+RANSOM_EXTENSIONS = {".locked", ".encrypted", ".enc", ".crypt", ".crypted", ".cry", ".locky", ".wncry",
+                     ".wcry", ".cerber", ".zepto", ".odin", ".lockbit", ".ryk", ".conti", ".akira"}
+EXECUTABLE_TYPES = {"pe": "PE", "elf": "ELF", "macho": "MachO"}
+
+def shannon_entropy(hist, total):
+    """Bits per byte of a 256-bin byte histogram."""
+    if not total:
+        return 0.0
+    return -sum(c / total * math.log2(c / total) for c in hist if c)
+
+def _entropy_numpy(buf, size):
+    data = np.frombuffer(buf, dtype=np.uint8)
+    whole = np.zeros(256, dtype=np.int64)
+    blocks = []
+    for start in range(0, size, HEUR_BLOCK_SIZE):
+        hist = np.bincount(data[start:start + HEUR_BLOCK_SIZE], minlength=256)
+        whole += hist
+        blocks.append(shannon_entropy(hist.tolist(), min(HEUR_BLOCK_SIZE, size - start)))
+    return shannon_entropy(whole.tolist(), size), blocks
+
+def _entropy_sampled(buf, size):
+    count = -(-size // HEUR_BLOCK_SIZE)
+    limit = max(1, HEUR_SAMPLE_BYTES // HEUR_BLOCK_SIZE)
+    picks = range(count) if count <= limit else (i * count // limit for i in range(limit))
+    whole = Counter()
+    blocks = []
+    for i in picks:
+        block = buf[i * HEUR_BLOCK_SIZE:(i + 1) * HEUR_BLOCK_SIZE]
+        hist = Counter(block)
+        whole.update(hist)
+        blocks.append(shannon_entropy(hist.values(), len(block)))
+    return shannon_entropy(whole.values(), sum(whole.values())), blocks
+
+def byte_entropy(buf, size):
+    """(whole-file entropy, per-block entropies) of ``buf`` in HEUR_BLOCK_SIZE blocks.
+
+    With NumPy every block is histogrammed with ``bincount`` (disk speed on
+    mmap'd files); without it a bounded, evenly spaced sample of blocks is
+    counted with ``collections.Counter``.
+    """
+    if np is not None:
+        return _entropy_numpy(buf, size)
+    return _entropy_sampled(buf, size)
+
+class EntropyHeuristic:
+    """Native-engine inspector scoring packed executables and encrypted files.
+
+    Executables (PE/ELF/Mach-O) score on whole-file entropy, the share of
+    high-entropy blocks and packer section markers. Headerless data scores
+    on near-random entropy, ransomware extensions and document names whose
+    header is missing. Files at or above ``threshold`` (0-100) are reported
+    as ``Heuristics.<kind> (score N)``. Since the verdict depends on the file
+    name too, ``name_key`` tells the engine which names share one.
+    """
+    def __init__(self, threshold=HEUR_THRESHOLD):
+        self.threshold = threshold
+        self.backend = "numpy" if np is not None else "sampled"
+        self.signature_version = f"EntropyHeuristic:{threshold}:{self.backend}"
+
+    @staticmethod
+    def name_key(path):
+        """The name classes the verdict depends on: same bytes + same key = same verdict."""
+        stem, ext = os.path.splitext(os.path.basename(path).lower())
+        return "".join(cls for cls, hit in (
+            ("R", ext in RANSOM_EXTENSIONS),
+            ("H", ext in HEADERED_EXTENSIONS or os.path.splitext(stem)[1] in HEADERED_EXTENSIONS),
+            ("S", ext in SCRIPT_EXTENSIONS)) if hit)
+
+    def __call__(self, path, st, digest=None):
+        if st.st_size < HEUR_MIN_SIZE:
+            return None
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            kind = sniff_file_type(mm[:SNIFF_SIZE], os.path.basename(path))
+            if kind not in EXECUTABLE_TYPES and kind != "data":
+                return None
+            packer = kind in EXECUTABLE_TYPES and any(mm.find(m, 0, 4096) >= 0 for m in PACKER_MARKERS)
+            whole, blocks = byte_entropy(mm, len(mm))
+        score, label = self.score(kind, path, whole, blocks, packer)
+        if score >= self.threshold:
+            return f"Heuristics.{label} (score {score})"
+        return None
+
+    @staticmethod
+    def score(kind, path, whole, blocks, packer=False):
+        """(score 0-100, label) for a file's sniffed type and entropy profile."""
+        score = 0
+        if kind in EXECUTABLE_TYPES:
+            high = sum(e >= HEUR_HIGH_ENTROPY for e in blocks) / len(blocks)
+            dense = sum(e >= HEUR_CIPHER_ENTROPY for e in blocks) / len(blocks)
+            score += 30 if whole >= HEUR_HIGH_ENTROPY else 15 if whole >= 6.8 else 0
+            score += 25 if high >= 0.5 else 10 if high >= 0.25 else 0
+            # Packed payloads are LZ/LZMA output; code-page and font tables stay below this.
+            score += 15 if dense >= 0.5 else 0
+            score += 40 if packer else 0
+            return min(score, 100), "Packed." + EXECUTABLE_TYPES[kind]
+        stem, ext = os.path.splitext(os.path.basename(path).lower())
+        cipher = sum(e >= HEUR_CIPHER_ENTROPY for e in blocks) / len(blocks)
+        score += 40 if whole >= HEUR_CIPHER_ENTROPY else 0
+        score += 20 if cipher >= 0.9 else 0
+        if ext in RANSOM_EXTENSIONS:
+            score += 40
+        elif ext in HEADERED_EXTENSIONS or os.path.splitext(stem)[1] in HEADERED_EXTENSIONS:
+            score += 30
+        label = "Ransom.Encrypted" if ext in RANSOM_EXTENSIONS else "Encrypted.Data"
+        return min(score, 100) if whole >= HEUR_HIGH_ENTROPY else 0, label
+
+# ---------------------------
+# Sharded Fan-out Engine (N clamscan/clamdscan workers)
+# ---------------------------
+# Every clamscan process loads its own copy of the signature database.
+CLAMSCAN_RAM_PER_JOB = 1024 ** 3
+
+def default_fanout_jobs():
+    """Logical core count, limited by how many clamscan databases fit in RAM."""
+    cores = psutil.cpu_count(logical=True) or 1
+    fit = psutil.virtual_memory().available // CLAMSCAN_RAM_PER_JOB
+    return max(1, min(cores, fit))
+
+def plan_shards(paths, jobs, workdir, balance="files", stats=None, stop_event=None, cache=None, on_cached=None,
+                profile=None, router=None):
+    """Split the tree under ``paths`` into ``jobs`` balanced file-list shards.
+
+    Each file is appended to the currently lightest shard (weight = 1 per
+    file, or its size in bytes), so shards end up balanced without holding
+    the whole file list in memory. Files with a cached verdict are left out
+    (cached detections go to ``on_cached``); for the rest a ``.keys`` file
+    next to each shard records their cache keys line by line. Returns the
+    shard list-file paths.
+    """
+    shard_paths = [os.path.join(workdir, f"shard_{i}.lst") for i in range(jobs)]
+    handles = [open(p, "w", encoding="utf-8", errors="surrogateescape") for p in shard_paths]
+    key_handles = [open(p[:-4] + ".keys", "w") for p in shard_paths] if cache else None
+    heap = [(0, i) for i in range(jobs)]
+    lock = Lock()
+
+    def assign(item):
+        path, st = item
+        if "\n" in path:
+            return
+        if cache:
+            key = cache_key(path, st)
+            cached = cache.lookup(key)
+            if cached is not None:
+                if stats:
+                    stats.add_file(path, st.st_size)
+                if cached[0] and on_cached:
+                    on_cached(path, cached)
+                return
+        weight = st.st_size if balance == "bytes" else 1
+        with lock:
+            load, i = heapq.heappop(heap)
+            handles[i].write(path + "\n")
+            if cache:
+                key_handles[i].write(" ".join(map(str, key)) + "\n")
+            heapq.heappush(heap, (load + weight, i))
+
+    try:
+        ParallelWalker(paths, threads=min(8, jobs), stats=stats, stop_event=stop_event, profile=profile,
+                       router=router).run(assign)
+    finally:
+        for h in handles + (key_handles or []):
+            h.close()
+    return [p for p in shard_paths if os.path.getsize(p)]
+
+def record_list_verdicts(cache, file_list, found):
+    """Record a verdict for every file in a plan_shards() list; ``found`` maps detected paths to signatures."""
+    with open(file_list, encoding="utf-8", errors="surrogateescape") as paths_f, open(file_list[:-4] + ".keys") as keys_f:
+        for line, key_line in zip(paths_f, keys_f):
+            path = line.rstrip("\n")
+            cache.record(tuple(map(int, key_line.split())), path, found.get(path))
+
+class FanoutEngine:
+    """Run N clamscan (or clamdscan --multiscan) workers over balanced shards."""
+    def __init__(self, jobs=None, balance="files", scanner="clamscan"):
+        self.jobs = jobs or default_fanout_jobs()
+        self.balance = balance
+        self.scanner = scanner
+        self.binary = shutil.which(scanner) or shutil.which(scanner + ".exe")
+        self.name = f"ClamAV x{self.jobs}"
+        self.stats = ScanStats()
+        self.cache = None
+        self.profile = None
+        self.router = None
+        self.procs = []
+        self._stop_event = Event()
+        self._lock = Lock()
+
+    def signature_version(self):
+        return clamav_db_version(self.binary) if self.binary else ""
+
+    def stop(self):
+        self._stop_event.set()
+        for proc in self.procs:
+            if proc.poll() is None:
+                proc.terminate()
+
+    def _command(self, shard):
+        if self.scanner == "clamdscan":
+            return [self.binary, "--multiscan", "--fdpass", "--no-summary", f"--file-list={shard}"]
+        # The shard lists are already filtered; only the size limits still apply inside clamscan.
+        limits = self.profile.size_args() if self.profile else []
+        return [self.binary, "--no-summary"] + limits + [f"--file-list={shard}"]
+
+    def _report(self, file_path, sig, infected, on_detection):
+        self.stats.add_detection()
+        det = Detection(file_path, sig)
+        with self._lock:
+            infected.append(det)
+        if on_detection:
+            on_detection(det)
+
+    def _reader(self, proc, shard, infected, on_detection):
+        found = {}
+        on_file = lambda p: self.stats.add_file(p, file_size(p))
+        for file_path, sig in iter_clamscan_detections(proc.stdout, on_file=on_file):
+            found[file_path] = sig
+            self._report(file_path, sig, infected, on_detection)
+        proc.stdout.close()
+        proc.wait()
+        # Exit codes 0/1 mean every listed file was scanned (clean/infected).
+        if self.cache and proc.returncode in (0, 1) and not self._stop_event.is_set():
+            record_list_verdicts(self.cache, shard, found)
+
+    def scan(self, paths, on_detection=None):
+        """Scan ``paths`` and return the merged ``(file_path, sig)`` list."""
+        if not self.binary:
+            return []
+        self._stop_event.clear()
+        workdir = tempfile.mkdtemp(prefix="cyber_shards_")
+        infected = []
+        try:
+            on_cached = lambda p, verdict: self._report(p, verdict[0], infected, on_detection)
+            shards = plan_shards(paths, self.jobs, workdir, balance=self.balance, stats=self.stats,
+                                 stop_event=self._stop_event, cache=self.cache, on_cached=on_cached,
+                                 profile=self.profile, router=self.router)
+            self.procs = []
+            readers = []
+            try:
+                for shard in shards:
+                    if self._stop_event.is_set():
+                        break
+                    proc = subprocess.Popen(self._command(shard), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                            text=True, errors="replace", bufsize=1)
+                    self.procs.append(proc)
+                    t = Thread(target=self._reader, args=(proc, shard, infected, on_detection), daemon=True)
+                    t.start()
+                    readers.append(t)
+            except BaseException:
+                # A failed spawn must not leave the workers already started behind.
+                self.stop()
+                raise
+            finally:
+                for t in readers:
+                    t.join()
+                for proc in self.procs:
+                    if proc.poll() is None:
+                        proc.kill()
+                    proc.wait()
+        except Exception as e:
+            print(Fore.RED + "[ERROR] Fan-out scan failed:", e)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return infected
+
+# ---------------------------
+# Persistent Scan-Result Cache
+# ---------------------------
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".cyber_scanner")
+CACHE_FLUSH_EVERY = 1000
+CACHE_SCHEMA = "3"
+CACHE_KEEP_SCOPES = 4  # Engine/signature versions whose verdicts are kept
+
+def cache_key(path, st):
+    """Cache key for a file: (device, inode, size, mtime_ns)."""
+    if not st.st_ino:
+        # DirEntry.stat() leaves st_dev/st_ino empty on Windows.
+        st = os.stat(path, follow_symlinks=False)
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+class ScanCache:
+    """SQLite verdict cache for unchanged files.
+
+    Verdicts are stored per (device, inode) together with size and mtime,
+    so any modification is a miss, and per content digest, so copies of the
+    same file elsewhere on disk reuse one verdict. Every row is scoped to
+    the engine's signature version string ("ClamAV 1.0.5/27240",
+    "Native ..."), which names both the engine and its signature DB: a
+    signature update starts a new scope, and switching between engines
+    keeps each one's verdicts. Only the CACHE_KEEP_SCOPES most recently
+    used scopes are kept.
+    """
+    def __init__(self, path=None, db_version="", engine=""):
+        self.path = path or os.path.join(STATE_DIR, "scan_cache.db")
+        self.scope = db_version or engine
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = Lock()
+        self._pending = []
+        self._pending_digests = []
+        self.hits = 0
+        self.misses = 0
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != CACHE_SCHEMA:
+                self._db.execute("DROP TABLE IF EXISTS verdicts")
+                self._db.execute("DROP TABLE IF EXISTS digests")
+                self._db.execute("DROP TABLE IF EXISTS scopes")
+                self._db.execute("DELETE FROM meta")
+                self._db.execute("INSERT INTO meta VALUES ('schema', ?)", (CACHE_SCHEMA,))
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (scope TEXT, dev INTEGER, ino INTEGER, size INTEGER, "
+                "mtime_ns INTEGER, verdict TEXT, digest TEXT, path TEXT, scanned_at REAL, "
+                "PRIMARY KEY (scope, dev, ino)) WITHOUT ROWID")
+            self._db.execute("CREATE TABLE IF NOT EXISTS digests (scope TEXT, digest TEXT, verdict TEXT, "
+                             "PRIMARY KEY (scope, digest)) WITHOUT ROWID")
+            self._db.execute("CREATE TABLE IF NOT EXISTS scopes (scope TEXT PRIMARY KEY, last_used REAL)")
+            self._db.execute("INSERT OR REPLACE INTO scopes VALUES (?, ?)", (self.scope, time.time()))
+            stale = [r[0] for r in self._db.execute("SELECT scope FROM scopes ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                                                    (CACHE_KEEP_SCOPES,))]
+            for scope in stale:
+                self._db.execute("DELETE FROM verdicts WHERE scope = ?", (scope,))
+                self._db.execute("DELETE FROM digests WHERE scope = ?", (scope,))
+                self._db.execute("DELETE FROM scopes WHERE scope = ?", (scope,))
+
+    def lookup(self, key):
+        """Return (sig, digest) for an unchanged file, or None on a miss (sig is "" if clean)."""
+        dev, ino, size, mtime_ns = key
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, verdict, digest FROM verdicts "
+                                   "WHERE scope = ? AND dev = ? AND ino = ?", (self.scope, dev, ino)).fetchone()
+            if row is None or row[0] != size or row[1] != mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[2], row[3]
+
+    def lookup_digest(self, digest):
+        """Return the verdict for a content digest ("" if clean), or None."""
+        with self._lock:
+            row = self._db.execute("SELECT verdict FROM digests WHERE scope = ? AND digest = ?",
+                                   (self.scope, digest)).fetchone()
+            return row[0] if row else None
+
+    def record(self, key, path, sig, digest=None):
+        """Queue a verdict; writes are batched into a single transaction."""
+        with self._lock:
+            self._pending.append((self.scope,) + key + (sig or "", digest or "", path, time.time()))
+            if len(self._pending) >= CACHE_FLUSH_EVERY:
+                self._flush_locked()
+
+    def record_digest(self, digest, sig):
+        with self._lock:
+            self._pending_digests.append((self.scope, digest, sig or ""))
+            if len(self._pending_digests) >= CACHE_FLUSH_EVERY:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._db.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?)", self._pending_digests)
+        self._pending = []
+        self._pending_digests = []
+
+    def flush(self):
+        with self._lock:
+            if self._pending or self._pending_digests:
+                self._flush_locked()
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
 # ---------------------------
 # UI: Enhanced Ultimate Hacker-Style Animated Scanner
 # ---------------------------
+ANSI_SGR = re.compile(r"\x1b\[[0-9;]*m")
+
+class TerminalRenderer:
+    """Differential frame writer for the scanner UI.
+
+    Each frame is compared with the previous one line by line; for a changed
+    line only the part after the common prefix is rewritten (after moving
+    the cursor there and replaying the prefix's color codes). The frame
+    interval adapts so that building + writing frames stays within
+    ``cpu_budget`` of one core, and backs off further when the machine is
+    CPU-bound. Without a TTY it just prints a one-line summary now and then.
+    """
+    def __init__(self, stream=None, max_fps=30, cpu_budget=0.01, plain_interval=5.0):
+        self.stream = stream or sys.stdout
+        self.is_tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.max_fps = max_fps
+        self.cpu_budget = cpu_budget
+        self.plain_interval = plain_interval
+        self.frame_cost = 0.0  # Moving average of CPU seconds per frame
+        self.frames = 0
+        self.bytes_written = 0
+        self._prev = None
+        self._last_plain = 0.0
+        self._cpu_busy = False
+        self._cpu_checked = 0.0
+
+    @staticmethod
+    def _diff_line(old, new):
+        """Return (column, text) rewriting only the changed tail of ``new``."""
+        n = len(os.path.commonprefix([old, new]))
+        esc = new.rfind("\x1b", 0, n)
+        if esc != -1 and "m" not in new[esc:n]:
+            n = esc  # Never split an escape sequence
+        prefix = new[:n]
+        return len(ANSI_SGR.sub("", prefix)), "".join(ANSI_SGR.findall(prefix)) + new[n:]
+
+    def render(self, lines, summary=None):
+        if not self.is_tty:
+            now = time.time()
+            if summary and now - self._last_plain >= self.plain_interval:
+                self._last_plain = now
+                self._write(ANSI_SGR.sub("", summary) + "\n")
+            return
+        if self._prev is None:
+            out = ["\x1b[2J\x1b[H", "\n".join(lines), "\n"]
+        else:
+            out = []
+            for row, line in enumerate(lines, start=1):
+                old = self._prev[row - 1] if row <= len(self._prev) else ""
+                if line == old:
+                    continue
+                col, text = self._diff_line(old, line)
+                out.append(f"\x1b[{row};{col + 1}H{text}{Style.RESET_ALL}\x1b[K")
+            if len(lines) < len(self._prev):
+                out.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+            out.append(f"\x1b[{len(lines) + 1};1H")
+        self._prev = list(lines)
+        self._write("".join(out))
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.stream.flush()
+        self.bytes_written += len(data)
+
+    def next_interval(self, cost):
+        """Seconds to wait before the next frame, given this frame's CPU cost."""
+        self.frames += 1
+        self.frame_cost = cost if self.frames == 1 else 0.2 * cost + 0.8 * self.frame_cost
+        if not self.is_tty:
+            return 0.5
+        interval = max(1.0 / self.max_fps, self.frame_cost / self.cpu_budget)
+        now = time.time()
+        if now - self._cpu_checked >= 1.0:
+            self._cpu_checked = now
+            self._cpu_busy = psutil.cpu_percent(interval=None) >= 90
+        return min(1.0, interval * 4) if self._cpu_busy else interval
+
+    def reset(self):
+        self._prev = None
+
 class AnimatedScanner:
     def __init__(self, title="Cyber Malware Scanner", paths=None):
         self.title = title
@@ -290,11 +2506,18 @@ class AnimatedScanner:
         self.progress = 0.0
         self.status_message = "Initializing Cyber Matrix..."
         self.module_status = {"ClamAV": False, "Defender": False, "Mode": "Unknown"}
-        self.system_info = get_system_info()
+        self.system_info = SYSTEM_INFO.refresh()  # Lazy: slow fields fill in while we scan
         self.glitch_counter = 0
         self.border_cycle = cycle(["═", "▒", "█", "░", "■", "═", "▓", "▬"])
         self.threat_level = "LOW"  # Dynamic threat level
         self.matrix_rain_intensity = 10  # For mini matrix rain in UI
+        # Decorative buffers are generated once; frames just slice them.
+        self._rain_buffer = "".join(random.choice("01 ") for _ in range(4096))
+        self._rain_offset = 0
+        self.renderer = TerminalRenderer()
+        self.stats = None  # Real counters (ScanStats) when the engine reports them
+        self.mb_per_sec = 0.0  # Moving average of real throughput
+        self._rate_sample = None
 
     def _human_time(self, seconds):
         """Format time in a human-readable way."""
@@ -327,30 +2550,67 @@ class AnimatedScanner:
             return external_proc.is_alive()
         return False
 
+    def _update_rate(self):
+        """Exponential moving average of MB/s, resampled every half second."""
+        now = time.time()
+        if self._rate_sample is None:
+            self._rate_sample = (now, self.stats.bytes)
+            return
+        last_t, last_bytes = self._rate_sample
+        if now - last_t >= 0.5:
+            inst = (self.stats.bytes - last_bytes) / (1024 ** 2) / (now - last_t)
+            self.mb_per_sec = inst if not self.mb_per_sec else 0.3 * inst + 0.7 * self.mb_per_sec
+            self._rate_sample = (now, self.stats.bytes)
+
+    def _eta(self):
+        """Remaining time from real totals and the moving-average rate."""
+        st = self.stats
+        if st.total_bytes and self.mb_per_sec > 0:
+            return self._human_time(max(0, st.total_bytes - st.bytes) / (1024 ** 2) / self.mb_per_sec)
+        files_rate = st.files_per_sec()
+        if st.total_files and files_rate > 0:
+            return self._human_time(max(0, st.total_files - st.files) / files_rate)
+        return "--"
+
     def _mini_matrix_rain(self, width=80, height=3):
-        """Generate mini matrix rain for UI."""
+        """Mini matrix rain for UI: scrolling windows over a precomputed buffer."""
+        self._rain_offset = (self._rain_offset + 1) % (len(self._rain_buffer) - width * height * 7)
         lines = []
-        for _ in range(height):
-            line = "".join(random.choice("01 ") for _ in range(width))
-            lines.append(Fore.GREEN + line)
+        for row in range(height):
+            start = self._rain_offset + row * width * 7
+            lines.append(Fore.GREEN + self._rain_buffer[start:start + width])
         return lines
 
     def _ui_loop(self, external_proc=None):
         self.start_time = time.time()
+        self.renderer.reset()
         while not self._stop_event.is_set():
+            frame_start = time.thread_time()
             self.elapsed = time.time() - self.start_time
             running = self._is_external_running(external_proc)
-            if running:
-                inc = random.uniform(0.5, 4.0) * (1.0 - (self.progress / 100.0))
-                self.progress = min(self.progress + inc, 95.0)
+            if self.stats is not None:
+                self._update_rate()
+                self.progress = (self.stats.progress() or 0.0) if running else 100.0
+                self.checked = self.stats.files
+                speed = self.stats.files_per_sec()
+                file_name = os.path.basename(self.stats.current) or "..."
+                rate = f"[SPEED] {int(speed):,} files/s | {self.mb_per_sec:,.1f} MB/s"
+                eta = f" | ETA {self._eta()}" if running else ""
             else:
-                inc = random.uniform(15, 35)
-                self.progress = min(self.progress + inc, 100.0)
-
-            self.checked = int(self.progress / 100.0 * (self.fake_speed * max(1, self.elapsed)))
+                # Defender gives no progress feed; keep the animated estimate.
+                if running:
+                    inc = random.uniform(0.5, 4.0) * (1.0 - (self.progress / 100.0))
+                    self.progress = min(self.progress + inc, 95.0)
+                else:
+                    inc = random.uniform(15, 35)
+                    self.progress = min(self.progress + inc, 100.0)
+                self.checked = int(self.progress / 100.0 * (self.fake_speed * max(1, self.elapsed)))
+                speed = self.fake_speed
+                file_name = random.choice(self._file_samples)
+                rate = f"[SPEED] {int(speed)} files/s"
+                eta = ""
             spinner = next(self._spinner_cycle)
             binary = next(self._binary_stream)
-            file_name = random.choice(self._file_samples)
             ascii_line = random.choice(self._ascii_art)
             border_char = next(self.border_cycle)
             
@@ -359,7 +2619,10 @@ class AnimatedScanner:
             glitch = random.choice(["~", "#", "%", "&", "$", "@", "!", "?"]) if self.glitch_counter % 8 == 0 else ""
             
             # Dynamic threat level
-            if self.progress > 70:
+            if self.stats is not None:
+                found = self.stats.detections
+                self.threat_level = "CRITICAL" if found >= 10 else ("HIGH" if found >= 3 else ("MEDIUM" if found else "LOW"))
+            elif self.progress > 70:
                 self.threat_level = random.choice(["MEDIUM", "HIGH", "CRITICAL"]) if random.random() > 0.7 else "LOW"
             
             # Build Enhanced UI
@@ -370,14 +2633,14 @@ class AnimatedScanner:
             lines.append(self._render_line(f"[STATUS] {self.status_message}", f"[MODE] {self.module_status['Mode']}", color=Fore.MAGENTA + Style.BRIGHT))
             lines.append(self._render_line(
                 f"[MODULES] ClamAV={Fore.GREEN + 'ON' if self.module_status['ClamAV'] else Fore.RED + 'OFF'} | Defender={Fore.GREEN + 'ON' if self.module_status['Defender'] else Fore.RED + 'OFF'}",
-                f"[ELAPSED] {self._human_time(self.elapsed)}", color=Fore.YELLOW + Style.BRIGHT))
+                f"[ELAPSED] {self._human_time(self.elapsed)}{eta}", color=Fore.YELLOW + Style.BRIGHT))
             bar_width = 50
             filled = int((self.progress / 100.0) * bar_width)
             bar = Fore.GREEN + "[" + "#" * filled + Fore.RED + ">" + "." * (bar_width - filled - 1) + Fore.GREEN + "]"
             lines.append(self._render_line(f"{spinner}{bar} {self.progress:5.1f}%", f"[SCANNED] {self.checked:,} files", color=Fore.MAGENTA))
-            lines.append(self._render_line(f"[TARGET] {file_name}", f"[SPEED] {int(self.fake_speed)} files/s", color=Fore.YELLOW))
+            lines.append(self._render_line(f"[TARGET] {file_name}", rate, color=Fore.YELLOW))
             lines.append(self._render_line(f"[DATA] {binary * 10}", f"[HEX] {hex(random.randint(0, 0xFFFF))[2:].zfill(4).upper()}", color=Fore.BLUE))
-            lines.append(self._render_line(f"[THREAT LEVEL] {self.threat_level}", f"[BINARY STREAM] {binary * 5}", color=Fore.RED if self.threat_level == "CRITICAL" else Fore.YELLOW))
+            lines.append(self._render_line(f"[THREAT LEVEL] {self.threat_level}", f"[THREATS] {self.stats.detections}" if self.stats is not None else f"[BINARY STREAM] {binary * 5}", color=Fore.RED if self.threat_level == "CRITICAL" else Fore.YELLOW))
             lines.append(Fore.CYAN + f"║ {ascii_line.center(76)} {glitch}║")
             lines.append(Fore.CYAN + f"╠{border_char * 78}╣")
             # Mini Matrix Rain
@@ -386,52 +2649,635 @@ class AnimatedScanner:
             lines.append(self._render_line(f"[TIP] Press Ctrl+C to abort mission (intel retained). {glitch}", "", color=Fore.MAGENTA))
             lines.append(Fore.CYAN + f"╚{border_char * 78}╝")
             
-            sys.stdout.write("\x1b[2J\x1b[H")
-            sys.stdout.write("\n".join(lines) + "\n")
-            sys.stdout.flush()
+            summary = (f"[{self._human_time(self.elapsed)}] {self.progress:5.1f}% | {self.checked:,} files | "
+                       f"{rate} | threats: {self.stats.detections if self.stats is not None else 0}")
+            self.renderer.render(lines, summary)
+
+            if not running and self.progress >= 99.9:
+                self.progress = 100.0
+                self._stop_event.set()
+                break
+            time.sleep(self.renderer.next_interval(time.thread_time() - frame_start))
+
+    def start_ui_for_process(self, external_proc, status_message="Infiltrating System..."):
+        self.status_message = status_message
+        self._stop_event.clear()
+        t = Thread(target=self._ui_loop, args=(external_proc,), daemon=True)
+        t.start()
+        return t
+
+    def start_ui_simulation(self, status_message="Simulating Cyber Intrusion..."):
+        return self.start_ui_for_process(None, status_message=status_message)
+
+# ---------------------------
+# Detection Reports (text / JSONL / CSV / SARIF)
+# ---------------------------
+REPORT_FORMATS = ["text", "jsonl", "csv", "sarif"]
+REPORT_BUFFER = 1024 * 1024
+REPORT_FLUSH_INTERVAL = 1.0  # Seconds; keeps `tail -f` readers close to live
+REPORT_BACKUPS = 5
+REPORT_CSV_FIELDS = ["time", "path", "signature", "digest", "engine"]
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+_REPORT_JSON = json.JSONEncoder(ensure_ascii=False)  # json.dumps() builds a new encoder per call
+
+def report_format_for(path):
+    """Guess a report format from the file extension (text for anything unknown)."""
+    lower = path.lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith((".sarif", ".sarif.json")):
+        return "sarif"
+    return "text"
+
+class ReportWriter:
+    """Buffered, thread-safe detection report that streams rows as they come.
+
+    text, JSONL and CSV files are opened for append, so earlier runs are
+    kept. SARIF is one JSON document: results are streamed into the open
+    ``results`` array and the document is closed by ``close()``, so an
+    existing SARIF file is rotated out first instead of being appended to.
+    With ``max_bytes`` the report rotates to ``.1`` .. ``.N`` when it grows
+    past that size. Only the set of rule IDs is kept in memory.
+    """
+    def __init__(self, path, fmt=None, max_bytes=None, backups=REPORT_BACKUPS, engine=None):
+        self.path = path
+        self.fmt = fmt or report_format_for(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.engine = engine
+        self.rows = 0
+        self._lock = Lock()
+        self._rules = set()
+        self._last_flush = time.monotonic()
+        self._stamp = (0, "")
+        if self.fmt == "sarif" and os.path.exists(path) and os.path.getsize(path):
+            self._rotate_files()
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", newline="", buffering=REPORT_BUFFER)
+        self._size = self._file.tell()
+        self._first = True
+        if self.fmt == "text":
+            self._write(f"[CYBER LOG] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        elif self.fmt == "csv" and not self._size:
+            self._write(",".join(REPORT_CSV_FIELDS) + "\r\n")
+        elif self.fmt == "sarif":
+            self._write('{"$schema": "%s", "version": "2.1.0", "runs": [{"results": [\n' % SARIF_SCHEMA)
+
+    def _close_file(self):
+        if self.fmt == "sarif":
+            driver = {"name": "Ludang's Cyber Matrix Scanner", "informationUri": "https://nugra.online",
+                      "rules": [{"id": rule} for rule in sorted(self._rules)]}
+            if self.engine:
+                driver["fullName"] = f"Cyber Matrix Scanner ({self.engine} engine)"
+            self._write("\n], " + json.dumps({"tool": {"driver": driver}})[1:-1] + "}]}\n")
+        self._file.close()
+
+    def _rotate_files(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write(self, text):
+        self._file.write(text)
+        self._size += len(text.encode("utf-8")) if not text.isascii() else len(text)
+
+    def _format(self, det):
+        path, sig = det[0], det[1]
+        digest = getattr(det, "digest", None)
+        second = int(time.time())
+        if self._stamp[0] != second:
+            self._stamp = (second, datetime.fromtimestamp(second).isoformat())
+        now = self._stamp[1]
+        if self.fmt == "jsonl":
+            return _REPORT_JSON.encode({"time": now, "path": path, "signature": sig, "digest": digest,
+                                        "engine": self.engine}) + "\n"
+        if self.fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf).writerow([now, path, sig, digest or "", self.engine or ""])
+            return buf.getvalue()
+        if self.fmt == "sarif":
+            self._rules.add(sig)
+            location = os.path.abspath(detection_target(path))
+            result = {"ruleId": sig, "level": "error", "message": {"text": f"{sig} detected in {path}"},
+                      "locations": [{"physicalLocation": {"artifactLocation": {
+                          "uri": "file://" + urllib.parse.quote(location)}}}]}
+            if location != os.path.abspath(path):
+                result["locations"][0]["logicalLocations"] = [{"fullyQualifiedName": path, "kind": "member"}]
+            if digest:
+                result["partialFingerprints"] = {"contentDigest": digest}
+            return ("" if self._first else ",\n") + _REPORT_JSON.encode(result)
+        return f"Target: {path} | Signature: {sig}" + (f" | Digest: {digest}" if digest else "") + "\n"
+
+    def write(self, det):
+        """Append one detection ``(path, sig)`` (a Detection's digest is included when present)."""
+        with self._lock:
+            if self.max_bytes and self._size >= self.max_bytes and self.rows:
+                self._close_file()
+                self._rotate_files()
+                self._open()
+            self._write(self._format(det))
+            self._first = False
+            self.rows += 1
+            now = time.monotonic()
+            if now - self._last_flush >= REPORT_FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+
+    def write_many(self, detections):
+        for det in detections:
+            self.write(det)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._close_file()
+
+def open_report(args, engine=None):
+    """ReportWriter for --report (None when not requested or unwritable)."""
+    if not args.report:
+        return None
+    max_bytes = int(args.report_max_mb * 1024 ** 2) if args.report_max_mb else None
+    try:
+        return ReportWriter(args.report, args.report_format, max_bytes=max_bytes, engine=engine)
+    except OSError as e:
+        print(Fore.YELLOW + f"[WARN] Report offline: {e}")
+        return None
+
+# ---------------------------
+# File Action Helpers
+# ---------------------------
+def ensure_quarantine_dir(base_dir=None):
+    """Return the quarantine vault root (one per user, reused across runs)."""
+    qdir = base_dir or QUARANTINE_ROOT
+    os.makedirs(qdir, mode=0o700, exist_ok=True)
+    return qdir
+
+def detection_target(file_path):
+    """On-disk file behind a detection path: archive members ("a.zip!x/y") map to their archive."""
+    while "!" in file_path and not os.path.lexists(file_path):
+        file_path = file_path.rsplit("!", 1)[0]
+    return file_path
+
+QUARANTINE_MANIFEST = "manifest.db"
+# Per-filesystem object stores; scan walkers skip directories with this name.
+QUARANTINE_VAULT_NAME = ".cyber_quarantine"
+QUARANTINE_COPY_CHUNK = 64 * 1024 * 1024
+# Filesystems whose contents do not survive a reboot; their files go to the central vault.
+VOLATILE_FSTYPES = {"tmpfs", "ramfs", "devtmpfs", "zram"}
+# Central vault: holds the manifest, and the objects of its own filesystem.
+QUARANTINE_ROOT = os.path.join(STATE_DIR, QUARANTINE_VAULT_NAME)
+# Optional payload compression: codec -> (object suffix, opener).
+QUARANTINE_CODECS = {"lzma": (".xz", lzma.open)}
+if zstd:
+    QUARANTINE_CODECS["zstd"] = (".zst", zstd.open)
+
+def vault_codec(stored_path):
+    """Opener for a compressed vault object, or None when it is stored raw."""
+    for suffix, opener in QUARANTINE_CODECS.values():
+        if stored_path.endswith(suffix):
+            return opener
+    return None
+
+def parse_age(text):
+    """Parse ages like "30d", "12h", "45m" or "90s" (bare numbers are days) into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+    text = text.strip().lower()
+    unit = units.get(text[-1:])
+    try:
+        return float(text[:-1] if unit else text) * (unit or units["d"])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid age: {text!r} (use e.g. 30d, 12h)")
+
+def mount_point(path):
+    """Mount point of the filesystem holding ``path``."""
+    path = os.path.realpath(path)
+    while not os.path.ismount(path):
+        path = os.path.dirname(path)
+    return path
+
+def filesystem_type(mount):
+    """fstype of the mount point ``mount`` ("" when psutil does not list it)."""
+    for part in psutil.disk_partitions(all=True):
+        if part.mountpoint == mount:
+            return part.fstype
+    return ""
+
+def private_mount(mount):
+    """True when a per-filesystem store may live at ``mount``'s root.
+
+    The root must be owned by us and not world-writable (no /tmp-style
+    sticky roots another user could plant a directory or symlink in), and
+    the filesystem must persist across reboots.
+    """
+    try:
+        st = os.lstat(mount)
+    except OSError:
+        return False
+    euid = os.geteuid() if hasattr(os, "geteuid") else st.st_uid
+    if st.st_uid != euid or st.st_mode & stat.S_IWOTH:
+        return False
+    return filesystem_type(mount) not in VOLATILE_FSTYPES
+
+def _nearest_device(path):
+    """st_dev of ``path`` or of its closest existing ancestor."""
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except FileNotFoundError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                raise
+            path = parent
+
+def copy_file_contents(src_path, dst_fd):
+    """Copy a whole file into ``dst_fd`` inside the kernel; returns bytes copied.
+
+    Tries copy_file_range (reflink/server-side capable), then sendfile, and
+    only falls back to a userspace read/write loop when neither applies.
+    """
+    with open(src_path, "rb") as src:
+        in_fd = src.fileno()
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while True:
+                    n = os.copy_file_range(in_fd, dst_fd, QUARANTINE_COPY_CHUNK)
+                    if not n:
+                        return copied
+                    copied += n
+            except OSError as e:
+                # Kernels before 5.3 refuse cross-filesystem copies with EXDEV.
+                if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        if hasattr(os, "sendfile"):
+            try:
+                while True:
+                    n = os.sendfile(dst_fd, in_fd, copied, QUARANTINE_COPY_CHUNK)
+                    if not n:
+                        return copied
+                    copied += n
+            except OSError as e:
+                if copied or e.errno not in (errno.EINVAL, errno.ENOSYS):
+                    raise
+        while True:
+            chunk = src.read(HASH_READ_SIZE)
+            if not chunk:
+                return copied
+            os.write(dst_fd, chunk)
+            copied += len(chunk)
+
+class QuarantineVault:
+    """Content-addressed quarantine with one object store per filesystem.
+
+    Files are stored as ``objects/<aa>/<sha256>`` in a ``.cyber_quarantine``
+    directory at the root of their own filesystem (or in the per-user
+    state directory when that is on the same device), so isolating a file
+    is an atomic ``os.rename`` with no data copied. Filesystem roots are
+    only used when private_mount() allows it (ours, not world-writable,
+    not tmpfs), and every store is lstat-verified before use. When no
+    such store shares the file's device, the file is copied into ``root`` with
+    copy_file_range/sendfile; those copies are fsynced together at the end
+    of the batch, before any source file is unlinked.
+
+    Each file is moved into ``incoming/`` first and hashed there, so the
+    digest describes exactly the bytes that were isolated, and identical
+    files are stored once without probing for free names. The manifest in
+    ``root`` keeps the original path, mode, owner, size, signature and
+    stored location, indexed by path and digest. With ``compress`` set to
+    a QUARANTINE_CODECS name, payloads are stored compressed (at the cost
+    of the zero-copy rename). restore(), items() and purge() work from the
+    manifest alone and never walk the stores.
+    """
+    def __init__(self, root=None, compress=None):
+        root = root or QUARANTINE_ROOT
+        self.root = root
+        self.compress = compress
+        self._prepare_store(root)
+        self._stores = {}
+        self._lock = Lock()
+        self._db = sqlite3.connect(os.path.join(root, QUARANTINE_MANIFEST))
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, digest TEXT NOT NULL, "
+                "original_path TEXT NOT NULL, mode INTEGER, uid INTEGER, gid INTEGER, size INTEGER, "
+                "mtime_ns INTEGER, stored_path TEXT, signature TEXT, quarantined_at REAL NOT NULL)")
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(items)")]
+            if "stored_path" not in columns:
+                self._db.execute("ALTER TABLE items ADD COLUMN stored_path TEXT")
+            self._db.execute("CREATE INDEX IF NOT EXISTS items_path ON items (original_path)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS items_digest ON items (digest)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS items_stored ON items (stored_path)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS items_age ON items (quarantined_at)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _secure_dir(path):
+        """Create ``path`` (0700) if missing, then lstat-verify it is our own real directory."""
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+        st = os.lstat(path)
+        euid = os.geteuid() if hasattr(os, "geteuid") else st.st_uid
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != euid:
+            raise PermissionError(errno.EPERM, "Refusing quarantine store (symlink, not a directory or "
+                                               "foreign owner)", path)
+        if stat.S_IMODE(st.st_mode) & 0o077:
+            os.chmod(path, 0o700, follow_symlinks=False)
+
+    @classmethod
+    def _prepare_store(cls, store):
+        os.makedirs(os.path.dirname(store), exist_ok=True)
+        for path in (store, os.path.join(store, "objects"), os.path.join(store, "incoming")):
+            cls._secure_dir(path)
+
+    @staticmethod
+    def object_path(store, digest):
+        hexdigest = digest.split(":", 1)[-1]
+        return os.path.join(store, "objects", hexdigest[:2], hexdigest)
 
-            if not running and self.progress >= 99.9:
-                self.progress = 100.0
-                self._stop_event.set()
-                break
-            time.sleep(0.03)  # Smoother animation
+    def _pick_store(self, file_path, dev):
+        mount = mount_point(os.path.dirname(file_path))
+        candidates = [os.path.join(STATE_DIR, QUARANTINE_VAULT_NAME)]
+        if private_mount(mount):
+            candidates.insert(0, os.path.join(mount, QUARANTINE_VAULT_NAME))
+        for store in candidates:
+            try:
+                if _nearest_device(store) != dev:
+                    continue
+                self._prepare_store(store)
+                return store
+            except OSError:
+                continue
+        return self.root
 
-    def start_ui_for_process(self, external_proc, status_message="Infiltrating System..."):
-        self.status_message = status_message
-        self._stop_event.clear()
-        t = Thread(target=self._ui_loop, args=(external_proc,), daemon=True)
-        t.start()
-        return t
+    def store_for(self, file_path, st):
+        """Object store for a file: one on the same device when possible, else the central root."""
+        with self._lock:
+            store = self._stores.get(st.st_dev)
+            if store is None:
+                store = self._stores[st.st_dev] = self._pick_store(file_path, st.st_dev)
+            return store
 
-    def start_ui_simulation(self, status_message="Simulating Cyber Intrusion..."):
-        return self.start_ui_for_process(None, status_message=status_message)
+    def _stash(self, file_path):
+        """Move one file into its store; returns (manifest row, staged copy needing fsync or None)."""
+        st = os.lstat(file_path)
+        if not stat.S_ISREG(st.st_mode):
+            raise IsADirectoryError(errno.EISDIR, "Not a regular file", file_path)
+        store = self.store_for(file_path, st)
+        # A fresh name in a private directory: rename() onto an existing (or open) file fails on Windows.
+        stage_dir = tempfile.mkdtemp(dir=os.path.join(store, "incoming"))
+        staging = os.path.join(stage_dir, "object")
+        copied = os.stat(stage_dir).st_dev != st.st_dev
+        try:
+            try:
+                if not copied:
+                    try:
+                        os.rename(file_path, staging)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:  # Bind mounts share st_dev but not rename()
+                            raise
+                        copied = True
+                if copied:
+                    fd = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+                    try:
+                        copy_file_contents(file_path, fd)
+                    finally:
+                        os.close(fd)
+                digest, _ = hash_file(staging, "sha256")
+                dest = self.object_path(store, digest)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.chmod(staging, 0o400)
+                if self.compress:
+                    dest = self._pack(staging, dest)
+                else:
+                    os.replace(staging, dest)  # Same digest already stored: same bytes
+            except BaseException:
+                if not copied and os.path.exists(staging) and not os.path.lexists(file_path):
+                    os.chmod(staging, stat.S_IMODE(st.st_mode))
+                    os.rename(staging, file_path)  # Put the file back where it was, as it was
+                elif os.path.exists(staging):
+                    os.chmod(staging, 0o600)  # Read-only files cannot be removed on Windows
+                    os.remove(staging)
+                raise
+        finally:
+            with contextlib.suppress(OSError):
+                os.rmdir(stage_dir)
+        row = (digest, os.path.abspath(file_path), stat.S_IMODE(st.st_mode), st.st_uid, st.st_gid,
+               st.st_size, st.st_mtime_ns, dest)
+        return row, (dest if copied else None)
 
-# ---------------------------
-# File Action Helpers
-# ---------------------------
-def ensure_quarantine_dir(base_dir=None):
-    """Create quarantine directory with timestamp."""
-    if base_dir is None:
-        base_dir = os.path.join(os.getcwd(), "cyber_quarantine")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    qdir = os.path.join(base_dir, f"quarantine_{ts}")
-    os.makedirs(qdir, exist_ok=True)
-    return qdir
+    def _pack(self, staging, dest):
+        """Compress a staged file into its object path; returns that path."""
+        suffix, opener = QUARANTINE_CODECS[self.compress]
+        dest += suffix
+        if not os.path.exists(dest):
+            packed = staging + suffix
+            try:
+                with open(staging, "rb") as src, opener(packed, "wb") as out:
+                    shutil.copyfileobj(src, out, HASH_READ_SIZE)
+                os.chmod(packed, 0o400)
+                os.replace(packed, dest)
+            finally:
+                if os.path.exists(packed):
+                    os.remove(packed)
+        os.remove(staging)
+        return dest
+
+    @staticmethod
+    def _fsync(path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def quarantine_many(self, entries, workers=None):
+        """Isolate ``(path, signature)`` entries in parallel; returns ``(ok, message)`` per entry.
+
+        Files are moved (or copied) and hashed on a thread pool. Cross-device
+        copies are then fsynced in one parallel pass, together with their
+        object directories, and only afterwards are their sources removed.
+        The manifest rows are written in a single transaction. Repeated
+        paths are isolated once.
+        """
+        entries = list(entries)
+        unique = list(OrderedDict.fromkeys(path for path, _ in entries))
+        sigs = {path: sig for path, sig in entries}
+        results = {}
+        rows = {}
+        copies = {}
+
+        def stash(path):
+            if not os.path.lexists(path):
+                return path, None, "Target not found in matrix"
+            try:
+                return path, self._stash(path), None
+            except Exception as e:
+                return path, None, str(e)
+
+        def settle(item):
+            path, dest = item
+            try:
+                self._fsync(dest)
+                os.remove(path)
+                return path, None
+            except OSError as e:
+                return path, str(e)
 
-def quarantine_file(file_path, qdir):
+        with ThreadPoolExecutor(max_workers=workers or min(8, default_worker_count())) as pool:
+            for path, stashed, error in pool.map(stash, unique):
+                if stashed is None:
+                    results[path] = (False, error)
+                    continue
+                rows[path], copy = stashed
+                if copy:
+                    copies[path] = copy
+            if copies:
+                for directory in {os.path.dirname(dest) for dest in copies.values()}:
+                    self._fsync(directory)
+                for path, error in pool.map(settle, copies.items()):
+                    if error:
+                        # The source is still in place; the stored copy stays for its digest.
+                        del rows[path]
+                        results[path] = (False, f"Vault copy not durable: {error}")
+        for path, row in rows.items():
+            via = "copied to" if path in copies else "isolated in"
+            results[path] = (True, f"{via.capitalize()} vault: {row[-1]}")
+        with self._db:
+            self._db.executemany("INSERT INTO items (digest, original_path, mode, uid, gid, size, mtime_ns, "
+                                 "stored_path, signature, quarantined_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [row + (sigs[path], time.time()) for path, row in rows.items()])
+        return [results[path] for path, _ in entries]
+
+    def quarantine(self, file_path, sig=None):
+        return self.quarantine_many([(file_path, sig)], workers=1)[0]
+
+    def items(self):
+        """Manifest rows: (id, quarantined_at, size, signature, original_path, stored_path)."""
+        return self._db.execute("SELECT id, quarantined_at, size, signature, original_path, stored_path "
+                                "FROM items ORDER BY id").fetchall()
+
+    def find(self, ref):
+        """Manifest ID for an item ID or an original path (latest quarantine wins), or None."""
+        if str(ref).isdigit():
+            row = self._db.execute("SELECT id FROM items WHERE id = ?", (int(ref),)).fetchone()
+        else:
+            row = self._db.execute("SELECT id FROM items WHERE original_path = ? ORDER BY id DESC LIMIT 1",
+                                   (os.path.abspath(ref),)).fetchone()
+        return row[0] if row else None
+
+    def _shared(self, stored_path, item_id=None):
+        """Whether another manifest item references the same stored object."""
+        return self._db.execute("SELECT 1 FROM items WHERE stored_path = ? AND id != ? LIMIT 1",
+                                (stored_path, item_id or -1)).fetchone() is not None
+
+    def restore(self, item_id, target=None):
+        """Put item ``item_id`` back (at ``target`` if given); returns (ok, message).
+
+        Content is verified against the recorded digest, then mode, owner
+        and mtime are reapplied. An object no other item shares is renamed
+        back when it sits on the destination's filesystem, else copied.
+        """
+        row = self._db.execute("SELECT digest, original_path, mode, uid, gid, mtime_ns, stored_path FROM items "
+                               "WHERE id = ?", (item_id,)).fetchone()
+        if row is None:
+            return False, f"No vault item #{item_id}"
+        digest, original, mode, uid, gid, mtime_ns, stored = row
+        dest = target or original
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(original))
+        if os.path.lexists(dest):
+            return False, f"Refusing to overwrite {dest}"
+        if not os.path.exists(stored):
+            return False, f"Vault object missing: {stored}"
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shared = self._shared(stored, item_id)
+        opener = vault_codec(stored)
+        fd, staging = tempfile.mkstemp(dir=os.path.dirname(dest), prefix=".restore-")
+        moved = False
+        try:
+            try:
+                if opener:
+                    with opener(stored, "rb") as src, os.fdopen(os.dup(fd), "wb") as out:
+                        shutil.copyfileobj(src, out, HASH_READ_SIZE)
+                elif not shared and os.fstat(fd).st_dev == os.stat(stored).st_dev:
+                    os.rename(stored, staging)
+                    moved = True
+                else:
+                    copy_file_contents(stored, fd)
+            finally:
+                os.close(fd)
+            if hash_file(staging, digest.split(":", 1)[0])[0] != digest:
+                raise OSError(errno.EIO, "Vault object does not match its digest", stored)
+            os.chmod(staging, mode)
+            with contextlib.suppress(PermissionError):
+                os.chown(staging, uid, gid)
+            os.utime(staging, ns=(mtime_ns, mtime_ns))
+            os.rename(staging, dest)
+        except BaseException:
+            if moved:
+                os.rename(staging, stored)
+            elif os.path.exists(staging):
+                os.remove(staging)
+            raise
+        if not shared and not moved:
+            os.remove(stored)
+        with self._db:
+            self._db.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        return True, f"Restored to {dest}"
+
+    def purge(self, older_than):
+        """Drop items quarantined more than ``older_than`` seconds ago; returns (items, bytes freed)."""
+        cutoff = time.time() - older_than
+        stored = {row[0] for row in self._db.execute("SELECT stored_path FROM items WHERE quarantined_at < ?",
+                                                     (cutoff,))}
+        with self._db:
+            removed = self._db.execute("DELETE FROM items WHERE quarantined_at < ?", (cutoff,)).rowcount
+        freed = 0
+        for path in stored:
+            if path and not self._shared(path):
+                with contextlib.suppress(FileNotFoundError):
+                    freed += os.stat(path).st_size
+                    os.remove(path)
+        return removed, freed
+
+    def close(self):
+        self._db.close()
+
+def quarantine_file(file_path, qdir, sig=None, compress=None):
     """Move file to quarantine."""
     try:
-        if not os.path.exists(file_path):
-            return False, "Target not found in matrix"
-        dest = os.path.join(qdir, os.path.basename(file_path))
-        base, ext = os.path.splitext(dest)
-        i = 1
-        while os.path.exists(dest):
-            dest = f"{base}_{i}{ext}"
-            i += 1
-        shutil.move(file_path, dest)
-        return True, f"Isolated in vault: {dest}"
-    except Exception as e:
+        with QuarantineVault(qdir, compress=compress) as vault:
+            return vault.quarantine(file_path, sig)
+    except (OSError, sqlite3.Error) as e:
         return False, str(e)
 
 def send_to_recycle_or_fallback(file_path, fallback_dir=None):
@@ -448,12 +3294,9 @@ def send_to_recycle_or_fallback(file_path, fallback_dir=None):
         fallback_dir = os.path.join(os.getcwd(), "cyber_trash")
     os.makedirs(fallback_dir, exist_ok=True)
     try:
-        dest = os.path.join(fallback_dir, os.path.basename(file_path))
-        base, ext = os.path.splitext(dest)
-        i = 1
-        while os.path.exists(dest):
-            dest = f"{base}_{i}{ext}"
-            i += 1
+        # Prefixing a content digest avoids probing for a free "_N" name.
+        digest, _ = hash_file(file_path, "sha256") if os.path.isfile(file_path) else (f":{time.time_ns()}", 0)
+        dest = os.path.join(fallback_dir, f"{digest.split(':', 1)[1][:16]}_{os.path.basename(file_path)}")
         shutil.move(file_path, dest)
         return True, f"Trash module offline — relocated to {dest}"
     except Exception as e:
@@ -472,12 +3315,13 @@ def delete_permanent(file_path):
     except Exception as e:
         return False, str(e)
 
-def export_log(detections, log_file="cyber_log.txt"):
-    """Export detections to log file."""
-    with open(log_file, "w") as f:
-        f.write(f"[CYBER LOG] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        for p, sig in detections:
-            f.write(f"Target: {p} | Signature: {sig}\n")
+def export_log(detections, log_file="cyber_log.txt", fmt=None):
+    """Append detections to a log file (format from the extension: text, .jsonl, .csv, .sarif)."""
+    try:
+        with ReportWriter(log_file, fmt) as report:
+            report.write_many(detections)
+    except OSError as e:
+        return False, str(e)
     return True, f"Log exported to {log_file}"
 
 def view_details(file_path):
@@ -487,8 +3331,46 @@ def view_details(file_path):
     details = f"Size: {os.path.getsize(file_path) / 1024:.2f} KB | Modified: {datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')}"
     return details
 
-def interactive_menu(detections):
-    """Enhanced interactive menu with more options and mission log style."""
+def isolate_all(detections, qdir, compress=None):
+    """Quarantine every detection in one vault batch (one manifest transaction)."""
+    try:
+        with QuarantineVault(qdir, compress=compress) as vault:
+            results = vault.quarantine_many((detection_target(p), sig) for p, sig in detections)
+    except (OSError, sqlite3.Error) as e:
+        print(Fore.RED + f"[LOG] Isolation: {e}")
+        return
+    for (p, _), (ok, msg) in zip(detections, results):
+        print((Fore.GREEN if ok else Fore.RED) + f"[LOG] Isolation: {p} :: {msg}")
+
+def confirm_termination(processes, detected_path):
+    """List the processes running ``detected_path`` and terminate them after a CONFIRM.
+
+    Processes that only load the file as a module (a flagged shared
+    library can be mapped by nearly everything) are listed separately and
+    only included when the operator types ALL.
+    """
+    runners = processes.kill_candidates(detected_path)
+    loaders = [p for p in processes.kill_candidates(detected_path, loaders=True) if p not in runners]
+    for pid, name in runners:
+        print(Fore.RED + f"  [RUNNING] pid {pid} ({name})")
+    for pid, name in loaders:
+        print(Fore.YELLOW + f"  [LOADED BY] pid {pid} ({name})")
+    prompt = f"[CONFIRM] Type 'CONFIRM' to terminate the {len(runners)} running processes"
+    prompt += f", 'ALL' to include the {len(loaders)} loading it" if loaders else ""
+    c = input(Fore.RED + prompt + ": ").strip().upper()
+    pids = [pid for pid, _ in runners] if c == "CONFIRM" else [pid for pid, _ in runners + loaders] if c == "ALL" and loaders else []
+    if not pids:
+        print(Fore.YELLOW + "[LOG] Operation aborted.")
+        return
+    ok, msg = terminate_processes(pids)
+    print((Fore.GREEN if ok else Fore.RED) + f"[LOG] Termination: {msg}")
+
+def interactive_menu(detections, compress=None, processes=None):
+    """Enhanced interactive menu with more options and mission log style.
+
+    ``processes`` (a ProcessInventory) adds the owning processes of each
+    detection and a terminate action.
+    """
     if not detections:
         print(Fore.GREEN + "[MISSION LOG] System secure. No intrusions detected.")
         return
@@ -499,12 +3381,18 @@ def interactive_menu(detections):
         print(Fore.RED + f"[ALERT {i}] Signature: {sig}")
         for line in p_wrapped:
             print(Fore.RED + f"  Target: {line}")
+        if processes and processes.describe(p):
+            print(Fore.RED + f"  Loaded by: {processes.describe(p)}")
     while True:
         choice = input(Fore.CYAN + "[COMMAND] Select target (or 'all', 'exit' to abort): ").strip().lower()
         if choice in ("exit", "q"):
             break
         targets = []
         if choice == "all":
+            act = input(Fore.CYAN + "[OPTIONS] 1) Isolate all (Quarantine)  2) Review each target: ").strip()
+            if act == "1":
+                isolate_all(detections, qdir, compress)
+                continue
             targets = list(range(1, len(detections) + 1))
         else:
             try:
@@ -516,13 +3404,21 @@ def interactive_menu(detections):
             if idx < 1 or idx > len(detections):
                 print(Fore.YELLOW + "[ERROR] Target out of range.")
                 continue
-            file_path, sig = detections[idx - 1]
-            print(Fore.MAGENTA + f"\n[TARGET] File: {file_path}")
+            detected_path, sig = detections[idx - 1]
+            file_path = detection_target(detected_path)
+            print(Fore.MAGENTA + f"\n[TARGET] File: {detected_path}")
+            if file_path != detected_path:
+                print(Fore.MAGENTA + f"[CONTAINER] Actions apply to archive: {file_path}")
             print(Fore.RED + f"[SIGNATURE] {sig}")
-            print(Fore.CYAN + "[OPTIONS] 1) Isolate (Quarantine)  2) Exile (Recycle)  3) Eradicate (Delete)  4) Ignore  5) View Details  6) Scan Again  7) Export Log")
+            owners = processes.owners.get(file_path, []) if processes else []
+            if owners:
+                print(Fore.RED + f"[PROCESSES] {processes.describe(detected_path)}")
+            killable = processes.kill_candidates(detected_path, loaders=True) if owners else []
+            print(Fore.CYAN + "[OPTIONS] 1) Isolate (Quarantine)  2) Exile (Recycle)  3) Eradicate (Delete)  4) Ignore  5) View Details  6) Scan Again  7) Export Log"
+                  + ("  8) Terminate Processes" if killable else ""))
             act = input(Fore.CYAN + "[EXECUTE] Command: ").strip()
             if act == "1":
-                ok, msg = quarantine_file(file_path, qdir)
+                ok, msg = quarantine_file(file_path, qdir, sig, compress)
                 print(Fore.GREEN if ok else Fore.RED + f"[LOG] Isolation: {msg}")
             elif act == "2":
                 ok, msg = send_to_recycle_or_fallback(file_path)
@@ -545,12 +3441,1164 @@ def interactive_menu(detections):
             elif act == "7":
                 ok, msg = export_log(detections)
                 print(Fore.GREEN if ok else Fore.RED + f"[LOG] {msg}")
+            elif act == "8" and killable:
+                confirm_termination(processes, detected_path)
             else:
                 print(Fore.YELLOW + "[LOG] Target ignored.")
         if HAS_PLAYSOUND:
             # Play alert sound for actions
             Thread(target=playsound, args=("alert.mp3",), daemon=True).start()  # Assume alert.mp3 exists or fallback
 
+# ---------------------------
+# Real-time Watch Mode (inotify)
+# ---------------------------
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (name follows)
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+WATCH_DEBOUNCE = 1.0
+WATCH_MAX_WAIT_FACTOR = 10  # A busy file is scanned at most this many debounce periods after its first event
+WATCH_MAX_PENDING = 10000
+WATCH_BATCH_SIZE = 256
+
+class DebounceQueue:
+    """Bounded set of pending paths, each released after ``delay`` quiet seconds.
+
+    Repeated events for a path only push its deadline back, but never past
+    ``max_wait`` after its first event (WATCH_MAX_WAIT_FACTOR x ``delay`` by
+    default), so a file that keeps being written is still scanned with
+    bounded latency. Deadlines live in a heap with one entry per path,
+    rescheduled lazily when it surfaces. Once ``max_pending`` distinct
+    paths are waiting, ``put`` blocks the producer until the scanner drains
+    some (back-pressure); the inotify reader then stops reading and the
+    kernel queues, and eventually drops, events.
+    """
+    def __init__(self, delay=WATCH_DEBOUNCE, max_pending=WATCH_MAX_PENDING, max_wait=None):
+        self.delay = delay
+        self.max_wait = max_wait if max_wait is not None else WATCH_MAX_WAIT_FACTOR * delay
+        self.max_pending = max_pending
+        self._pending = {}  # path -> (due, first seen)
+        self._heap = []  # (due when pushed, seq, path)
+        self._seq = 0
+        self._cond = Condition()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, path, stop_event=None):
+        with self._cond:
+            while path not in self._pending and len(self._pending) >= self.max_pending:
+                if stop_event and stop_event.is_set():
+                    return
+                self._cond.wait(0.5)
+            now = time.monotonic()
+            entry = self._pending.get(path)
+            if entry:
+                self._pending[path] = (min(now + self.delay, entry[1] + self.max_wait), entry[1])
+                return
+            self._pending[path] = (now + self.delay, now)
+            self._seq += 1
+            heapq.heappush(self._heap, (now + self.delay, self._seq, path))
+            self._cond.notify_all()
+
+    def _peek(self):
+        """(due, path) of the earliest pending path, or None; reschedules heap entries pushed back since."""
+        while self._heap:
+            due, _, path = self._heap[0]
+            current = self._pending[path][0]
+            if current == due:
+                return due, path
+            self._seq += 1
+            heapq.heapreplace(self._heap, (current, self._seq, path))
+        return None
+
+    def get_batch(self, max_items=WATCH_BATCH_SIZE, timeout=0.5):
+        """Return up to ``max_items`` paths whose quiet period (or max wait) is over ([] on timeout)."""
+        with self._cond:
+            deadline = time.monotonic() + timeout
+            while True:
+                now = time.monotonic()
+                head = self._peek()
+                if head:
+                    if head[0] <= now:
+                        break
+                    wait = min(head[0], deadline) - now
+                else:
+                    wait = deadline - now
+                if wait <= 0:
+                    return []
+                self._cond.wait(wait)
+            batch = []
+            while len(batch) < max_items:
+                head = self._peek()
+                if not head or head[0] > now:
+                    break
+                heapq.heappop(self._heap)
+                del self._pending[head[1]]
+                batch.append(head[1])
+            self._cond.notify_all()
+            return batch
+
+class InotifyWatcher:
+    """Recursive inotify watcher (Linux, via ctypes) reporting changed paths.
+
+    ``ignore`` lists directories and files to skip. A file entry also covers
+    its siblings named ``<file>.*`` and ``<file>-*`` (rotated reports, SQLite
+    -wal/-journal files), so the scanner's own output never feeds back in.
+    """
+    def __init__(self, roots, on_path, on_overflow=None, ignore=()):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self.on_path = on_path
+        self.on_overflow = on_overflow
+        self.ignore = tuple({v for p in ignore if p for v in (os.path.abspath(p), os.path.realpath(p))})
+        self.overflows = 0
+        self.watch_limit_hit = False
+        self._wd = {}
+        for root in roots:
+            self.add_tree(root)
+
+    def __len__(self):
+        return len(self._wd)
+
+    def _ignored(self, path):
+        return any(path == p or path.startswith((p + os.sep, p + ".", p + "-")) for p in self.ignore)
+
+    def add_tree(self, root):
+        """Watch ``root`` and every directory below it."""
+        for dirpath, dirnames, _ in os.walk(root):
+            if self._ignored(os.path.abspath(dirpath)):
+                dirnames[:] = []
+                continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self._wd[wd] = dirpath
+            elif ctypes.get_errno() == errno.ENOSPC:
+                if not self.watch_limit_hit:
+                    print(Fore.YELLOW + "[WARN] inotify watch limit reached (fs.inotify.max_user_watches); "
+                                        "some directories are not monitored.")
+                self.watch_limit_hit = True
+                return
+
+    def _dispatch(self, data):
+        off = 0
+        while off + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, off)
+            off += INOTIFY_EVENT.size
+            name = data[off:off + length].rstrip(b"\0")
+            off += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflows += 1
+                if self.on_overflow:
+                    self.on_overflow()
+                continue
+            if mask & IN_IGNORED:
+                self._wd.pop(wd, None)
+                continue
+            parent = self._wd.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+            if self._ignored(os.path.abspath(path)):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land in a new directory before its watch exists.
+                    self.add_tree(path)
+                    self.on_path(path)
+            else:
+                self.on_path(path)
+
+    def run(self, stop_event):
+        """Read and dispatch events until ``stop_event`` is set."""
+        while not stop_event.is_set():
+            ready, _, _ = select.select([self.fd], [], [], 0.5)
+            if ready:
+                self._dispatch(os.read(self.fd, 64 * 1024))
+
+    def close(self):
+        os.close(self.fd)
+
+def run_watch_mode(args, paths):
+    """Watch ``paths`` and scan new/modified files through the active engine."""
+    if not sys.platform.startswith("linux"):
+        print(Fore.RED + "[ERROR] Watch mode needs inotify (Linux only).")
+        return 1
+    clamd = find_clamd_address(args.clamd)
+    # Batches are small and frequent: clamscan would reload its whole signature
+    # DB for every one, so only the persistent clamd or the in-process engine fit.
+    engine, status = select_engine(args, clamd, None, None)
+    if not clamd and is_clamscan_available():
+        print(Fore.YELLOW + "[WARN] clamd is not running; watch mode uses the native engine "
+                            "(clamscan would reload its signature DB for every batch).")
+    cache = attach_cache(engine, args)
+    engine.profile = resolve_profile(args)
+    engine.router = build_router(args, engine.profile)
+    stop_event = Event()
+    pending = DebounceQueue(delay=args.watch_debounce, max_pending=args.watch_max_pending)
+
+    def enqueue(path):
+        pending.put(path, stop_event)
+
+    def rescan_roots():
+        # The kernel dropped events; fall back to a (cache-assisted) rescan.
+        print(Fore.YELLOW + "[WARN] inotify queue overflow; rescanning watched roots.")
+        for root in paths:
+            enqueue(root)
+
+    report_file = open_report(args, engine.name)
+
+    def report(det):
+        print(Fore.RED + f"[ALERT {datetime.now().strftime('%H:%M:%S')}] {det[1]} :: {det[0]}")
+        if report_file:
+            report_file.write(det)
+
+    def scan_loop():
+        while not stop_event.is_set():
+            batch = [p for p in pending.get_batch() if os.path.exists(p)]
+            if batch:
+                engine.scan(batch, report)
+                if cache:
+                    cache.flush()
+
+    try:
+        # Everything this process writes, or a --cache/--report inside the tree would re-trigger itself.
+        own_output = [STATE_DIR, args.cache or (cache and cache.path), args.report,
+                      args.output if args.output != "-" else None]
+        watcher = InotifyWatcher(paths, enqueue, on_overflow=rescan_roots, ignore=own_output)
+    except OSError as e:
+        print(Fore.RED + f"[ERROR] Watch mode unavailable: {e}")
+        return 1
+    print(Fore.CYAN + f"[LOG] {status} Watching {len(watcher):,} directories under {', '.join(paths)} "
+                      f"(engine: {engine.name}). Ctrl+C to stop.")
+    scanner = Thread(target=scan_loop, daemon=True)
+    scanner.start()
+    try:
+        watcher.run(stop_event)
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "\n[MISSION LOG] Watch mode stopped.")
+    finally:
+        stop_event.set()
+        engine.stop()
+        scanner.join()
+        watcher.close()
+        if cache:
+            cache.close()
+        if report_file:
+            report_file.close()
+    return 0
+
+# ---------------------------
+# Persistence Hot Spots (priority quick-check)
+# ---------------------------
+HOTSPOT_DOWNLOADS_MAX = 500  # Newest files taken from ~/Downloads
+HOTSPOT_DOWNLOADS_SCAN = 20000  # Files looked at to find them, so huge folders do not delay the scan
+SHELL_RC_FILES = [".bashrc", ".bash_profile", ".bash_login", ".bash_logout", ".profile", ".zshrc", ".zprofile",
+                  ".zshenv", ".zlogin", os.path.join(".config", "fish", "config.fish")]
+HOTSPOT_FOLLOW = {"quick": "home tree", "full": "full tree"}
+
+def recent_downloads(folder, limit=HOTSPOT_DOWNLOADS_MAX):
+    """The ``limit`` most recently modified files under ``folder``, newest first."""
+    def candidates():
+        seen = 0
+        for dirpath, _, filenames in os.walk(folder):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield st.st_mtime, path
+                seen += 1
+                if seen >= HOTSPOT_DOWNLOADS_SCAN:
+                    return
+    return [path for _, path in heapq.nlargest(limit, candidates())]
+
+def hotspot_tiers(home=None):
+    """[(category, [paths])] of the persistence locations present here, highest priority first."""
+    home = home or os.path.expanduser("~")
+    startup = os.path.join("Microsoft", "Windows", "Start Menu", "Programs", "Startup")
+    tiers = [
+        ("crontabs", ["/etc/crontab", "/etc/anacrontab", "/etc/cron.d", "/etc/cron.hourly", "/etc/cron.daily",
+                      "/etc/cron.weekly", "/etc/cron.monthly", "/var/spool/cron"]),
+        ("services", ["/etc/systemd/system", "/run/systemd/system", os.path.join(home, ".config", "systemd", "user"),
+                      "/etc/init.d", "/etc/rc.local", "/Library/LaunchDaemons", "/Library/LaunchAgents",
+                      os.path.join(home, "Library", "LaunchAgents"),
+                      os.path.join(os.environ.get("SystemRoot", r"C:\Windows"), "System32", "Tasks")]),
+        ("autostart", [os.path.join(home, ".config", "autostart"), "/etc/xdg/autostart"]
+                      + [os.path.join(base, startup) for base in (os.environ.get("APPDATA"),
+                                                                  os.environ.get("PROGRAMDATA")) if base]),
+        ("shell rc", [os.path.join(home, name) for name in SHELL_RC_FILES]
+                     + ["/etc/profile", "/etc/profile.d", "/etc/bash.bashrc", "/etc/zsh/zshrc", "/etc/environment",
+                        "/etc/ld.so.preload"]),
+        ("temp", ["/tmp", "/var/tmp", "/dev/shm", tempfile.gettempdir()]),
+        ("downloads", recent_downloads(os.path.join(home, "Downloads"))),
+    ]
+    seen = set()
+    present = []
+    for category, paths in tiers:
+        paths = [p for p in paths if p not in seen and not seen.add(p) and os.path.lexists(p)]
+        if paths:
+            present.append((category, paths))
+    return present
+
+class HotspotScan:
+    """Scan the hot-spot tiers riskiest first, then optionally a wider tree.
+
+    All tiers go to the engine as one priority-ordered path list in a
+    single ``engine.scan`` call, so clamscan and the fan-out engine load
+    their signature database once, not once per tier. ParallelWalker (and
+    clamscan itself) work through the roots in that order, so crontab and
+    autostart verdicts arrive before the recent downloads are even opened.
+    ``follow`` is an extra ``(category, paths)`` stage scanned afterwards
+    with ``follow_profile``; with the verdict cache on, files already seen
+    in the hot spots are not scanned twice.
+    """
+    def __init__(self, engine, tiers, follow=None, follow_profile=None):
+        self.engine = engine
+        self.tiers = list(tiers)
+        self.follow = follow
+        self.follow_profile = follow_profile
+        self.timings = []  # (stage, path count, seconds, detections)
+        self.found_by_tier = {}  # Hot-spot category -> detections
+        self.first_verdict = None  # Seconds from start to the first detection
+        self._stop_event = Event()
+
+    def tier_of(self, detected_path):
+        """Hot-spot category a detection belongs to (None for the follow stage)."""
+        path = detection_target(detected_path)
+        for category, paths in self.tiers:
+            if any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in paths):
+                return category
+        return None
+
+    @property
+    def paths(self):
+        tiers = self.tiers + ([self.follow] if self.follow else [])
+        return [p for _, paths in tiers for p in paths]
+
+    def stop(self):
+        self._stop_event.set()
+        self.engine.stop()
+
+    def run(self, on_detection=None, on_tier=None):
+        """Scan every tier in order; returns all detections."""
+        started = time.time()
+
+        def record(det):
+            if self.first_verdict is None:
+                self.first_verdict = time.time() - started
+            category = self.tier_of(det[0])
+            if category:
+                self.found_by_tier[category] = self.found_by_tier.get(category, 0) + 1
+            if on_detection:
+                on_detection(det)
+
+        stages = [("hot spots", [p for _, paths in self.tiers for p in paths])]
+        if self.follow:
+            stages.append(self.follow)
+        detections = []
+        for stage, paths in stages:
+            if self._stop_event.is_set() or not paths:
+                continue
+            if stage != "hot spots":
+                self.engine.profile = self.follow_profile
+            if on_tier:
+                on_tier(stage, paths)
+            stage_started = time.time()
+            found = self.engine.scan(paths, record)
+            detections.extend(found)
+            self.timings.append((stage, len(paths), time.time() - stage_started, len(found)))
+        return detections
+
+def build_hotspot_scan(engine, args, follow_mode="none"):
+    """HotspotScan over this host's hot spots; ``follow_mode`` "quick"/"full" adds that tree as a last tier."""
+    follow = follow_profile = None
+    if follow_mode in HOTSPOT_FOLLOW:
+        follow = (HOTSPOT_FOLLOW[follow_mode], default_scan_paths(follow_mode))
+        follow_profile = resolve_profile(args, follow_mode)
+    return HotspotScan(engine, hotspot_tiers(), follow, follow_profile)
+
+def print_hotspot_summary(hotspots, stream=None):
+    """Per-stage timings, detections per hot-spot category and how soon the first verdict arrived."""
+    for stage, count, seconds, found in hotspots.timings:
+        print(Fore.CYAN + f"[LOG] {stage.capitalize():<10} {count:>4} paths  {seconds:7.2f}s  {found} detections",
+              file=stream)
+    if hotspots.found_by_tier:
+        print(Fore.CYAN + "[LOG] Hot-spot detections: "
+              + ", ".join(f"{c} {n}" for c, n in hotspots.found_by_tier.items()), file=stream)
+    if hotspots.first_verdict is not None:
+        print(Fore.CYAN + f"[LOG] First verdict after {hotspots.first_verdict:.2f}s.", file=stream)
+
+# ---------------------------
+# Process Scan (running executables and loaded modules)
+# ---------------------------
+DELETED_SUFFIX = " (deleted)"
+
+def _linux_mapped_paths(pid):
+    """File-backed mappings from /proc/PID/maps (an order of magnitude cheaper than parsing smaps)."""
+    paths = set()
+    with open(f"/proc/{pid}/maps", encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            fields = line.split(None, 5)
+            if len(fields) == 6 and fields[5].startswith("/"):
+                paths.add(fields[5].rstrip("\n"))
+    return paths
+
+def process_mapped_paths(proc):
+    """Executable plus file-backed modules of a psutil.Process (from process_iter with "exe")."""
+    if sys.platform.startswith("linux"):
+        paths = _linux_mapped_paths(proc.pid)
+    else:
+        paths = {m.path for m in proc.memory_maps(grouped=True) if os.path.isabs(m.path)}
+    if proc.info.get("exe"):
+        paths.add(proc.info["exe"])
+    return paths
+
+class ProcessInventory:
+    """The unique on-disk files behind every running process.
+
+    Each mapped path is stat'ed once and files are keyed by (device,
+    inode), so a shared library loaded by thousands of processes becomes a
+    single scan target; ``owners`` maps every target back to the
+    ``(pid, name)`` pairs using it, and ``runs`` to the subset whose main
+    executable it is. Mappings of deleted files are listed in ``deleted``;
+    a deleted main executable is still scanned through /proc/PID/exe.
+    """
+    def __init__(self):
+        self.owners = {}  # target path -> [(pid, name), ...]
+        self.runs = {}  # target path -> [(pid, name), ...] running it as their executable
+        self.deleted = []  # (pid, name, path)
+        self.processes = 0
+        self.denied = 0
+        self.mappings = 0  # (process, file) pairs before dedup
+
+    @property
+    def targets(self):
+        return list(self.owners)
+
+    def collect(self):
+        keys = {}  # path -> (st_dev, st_ino) or None
+        first = {}  # (st_dev, st_ino) -> target path
+        for proc in psutil.process_iter(["pid", "name", "exe"]):
+            owner = (proc.pid, proc.info.get("name") or "?")
+            try:
+                paths = process_mapped_paths(proc)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, FileNotFoundError, ProcessLookupError):
+                continue
+            except (psutil.AccessDenied, PermissionError):
+                self.denied += 1
+                paths = {proc.info["exe"]} if proc.info.get("exe") else set()
+            self.processes += 1
+            exe = (proc.info.get("exe") or "").removesuffix(DELETED_SUFFIX)
+            for path in paths:
+                self.mappings += 1
+                if path.endswith(DELETED_SUFFIX):
+                    path = path[:-len(DELETED_SUFFIX)]
+                    self.deleted.append((owner[0], owner[1], path))
+                    if path != exe or not sys.platform.startswith("linux"):
+                        continue
+                    path = f"/proc/{proc.pid}/exe"
+                if path not in keys:
+                    try:
+                        st = os.stat(path)
+                        keys[path] = (st.st_dev, st.st_ino) if stat.S_ISREG(st.st_mode) else None
+                    except OSError:
+                        keys[path] = None
+                key = keys[path]
+                if key is None:
+                    continue
+                target = first.setdefault(key, path)
+                users = self.owners.setdefault(target, [])
+                if not users or users[-1] != owner:
+                    users.append(owner)
+                if path in (exe, f"/proc/{proc.pid}/exe"):
+                    runners = self.runs.setdefault(target, [])
+                    if not runners or runners[-1] != owner:
+                        runners.append(owner)
+        return self
+
+    def describe(self, detected_path, limit=5):
+        """"pid 1 (init), pid 42 (sshd), ..." for the processes using a detected file."""
+        users = self.owners.get(detection_target(detected_path), [])
+        text = ", ".join(f"pid {pid} ({name})" for pid, name in users[:limit])
+        return text + (f" and {len(users) - limit} more" if len(users) > limit else "")
+
+    def kill_candidates(self, detected_path, loaders=False):
+        """``(pid, name)`` of processes running a detected file (``loaders``: also those loading it as a module).
+
+        Protected processes (see is_protected_process) are never included.
+        """
+        target = detection_target(detected_path)
+        users = self.owners.get(target, []) if loaders else self.runs.get(target, [])
+        candidates = []
+        for pid, name in users:
+            try:
+                if not is_protected_process(psutil.Process(pid)):
+                    candidates.append((pid, name))
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                candidates.append((pid, name))
+        return candidates
+
+def is_protected_process(proc):
+    """True for processes never to be signalled: pid 0/1, this scanner, its parent and kernel threads."""
+    if proc.pid in (0, 1, os.getpid(), os.getppid()):
+        return True
+    if sys.platform.startswith("linux"):
+        # Kernel threads are kthreadd (pid 2) and its children.
+        return proc.pid == 2 or proc.ppid() == 2
+    return False
+
+def terminate_processes(pids, timeout=3.0):
+    """SIGTERM the given processes, SIGKILL whatever is left after ``timeout``; returns (ok, message).
+
+    Protected processes are always skipped. A pid that cannot be signalled
+    is noted and the rest are still handled; ``ok`` is False if any
+    process could not be signalled or survived.
+    """
+    procs = []
+    denied = []
+    skipped = 0
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            if is_protected_process(proc):
+                skipped += 1
+                continue
+            proc.terminate()
+            procs.append(proc)
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.AccessDenied:
+            denied.append(pid)
+    _, alive = psutil.wait_procs(procs, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.AccessDenied:
+            denied.append(proc.pid)
+    _, survivors = psutil.wait_procs(alive, timeout=timeout)
+    msg = f"Terminated {len(procs) - len(survivors)} processes" + (f" ({len(alive)} killed)" if alive else "")
+    if skipped:
+        msg += f"; {skipped} protected skipped"
+    if denied:
+        msg += f"; access denied for pid {', '.join(map(str, sorted(set(denied))))}"
+    survivors = [proc.pid for proc in survivors if proc.pid not in denied]
+    if survivors:
+        msg += f"; still running: pid {', '.join(map(str, survivors))}"
+    return not denied and not survivors, msg
+
+def collect_process_targets():
+    """ProcessInventory for mode 6 / --mode processes, with a one-line log of the dedup."""
+    inventory = ProcessInventory().collect()
+    print(Fore.CYAN + f"[LOG] Process Scan: {inventory.processes:,} processes map {inventory.mappings:,} "
+                      f"executables/modules -> {len(inventory.owners):,} unique files"
+                      + (f" ({inventory.denied:,} processes only partly readable)" if inventory.denied else "") + ".")
+    for pid, name, path in inventory.deleted[:10]:
+        print(Fore.YELLOW + f"[WARN] pid {pid} ({name}) runs from deleted file {path}")
+    return inventory
+
+# ---------------------------
+# Network Sweep (asyncio TCP connect scan)
+# ---------------------------
+NET_DEFAULT_PORTS = "21-23,25,53,80,110,135,139,143,443,445,1433,3306,3389,5432,5900,6379,8080,8443,9200,27017"
+NET_CONCURRENCY = 2048
+NET_CONNECT_TIMEOUT = 1.0
+NET_HOST_TIMEOUT = 8.0
+# Larger local networks are narrowed to the /24 around our own address.
+NET_MIN_PREFIX = 22
+
+def parse_ports(spec):
+    """Sorted unique ports from "22,80,8000-8100"."""
+    ports = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        low, high = int(low), int(high or low)
+        if not 0 < low <= high <= 65535:
+            raise ValueError(f"bad port range: {part}")
+        ports.update(range(low, high + 1))
+    return sorted(ports)
+
+def local_subnets(info=None):
+    """IPv4 networks of the up, non-loopback interfaces (from the system-info probe)."""
+    value = (info or SYSTEM_INFO)["Local Subnets"]
+    nets = []
+    for item in value.split(", ") if value and value != "N/A" else ():
+        iface_addr = ipaddress.ip_interface(item)
+        net = iface_addr.network
+        if net.prefixlen < NET_MIN_PREFIX:
+            print(Fore.YELLOW + f"[WARN] {net} is too large to sweep; limiting to the /24 around {iface_addr.ip}.")
+            net = ipaddress.ip_interface(f"{iface_addr.ip}/24").network
+        if net not in nets:
+            nets.append(net)
+    return nets
+
+def resolve_sweep_targets(targets):
+    """Networks for CIDRs, addresses and host names; raises ValueError naming the first bad target."""
+    nets = []
+    for target in targets:
+        try:
+            nets.append(ipaddress.ip_network(target, strict=False))
+            continue
+        except ValueError:
+            pass
+        try:
+            nets.append(ipaddress.ip_network(socket.gethostbyname(target)))
+        except (OSError, UnicodeError) as e:
+            raise ValueError(f"cannot resolve target {target!r}: {e}") from None
+    return nets
+
+def iter_sweep_hosts(targets):
+    """Host addresses (as strings) of resolved target networks, without duplicates."""
+    seen = set()
+    for net in targets:
+        hosts = net.hosts() if net.num_addresses > 2 else iter(net)
+        for host in hosts:
+            host = str(host)
+            if host not in seen:
+                seen.add(host)
+                yield host
+
+class NetworkSweep:
+    """Concurrent TCP connect sweep of hosts x ports on one asyncio loop.
+
+    At most ``concurrency`` connects are in flight (an asyncio.Semaphore,
+    capped below the open-file limit); each connect has ``timeout`` seconds
+    and each host ``host_timeout`` for all of its ports. Hosts are started
+    lazily, so sweeping a /16 keeps only a few hundred hosts' tasks alive.
+    ``on_open(host, port)`` is called the moment a port accepts. Sockets
+    close with an RST (SO_LINGER 0) so thousands of probes leave no
+    TIME_WAIT entries behind.
+    """
+    def __init__(self, ports, concurrency=NET_CONCURRENCY, timeout=NET_CONNECT_TIMEOUT,
+                 host_timeout=NET_HOST_TIMEOUT):
+        self.ports = list(ports)
+        self.concurrency = max(1, min(concurrency, self._fd_budget()))
+        self.timeout = timeout
+        self.host_timeout = host_timeout
+        self.hosts = 0
+        self.alive = 0
+        self.probes = 0
+        self.open_ports = 0
+        self.host_timeouts = 0
+        self.errors = 0  # Probes that failed locally (socket setup, callbacks)
+        self._stop_event = Event()
+
+    @staticmethod
+    def _fd_budget():
+        try:
+            import resource
+            soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        except (ImportError, ValueError, OSError):
+            return NET_CONCURRENCY
+        return max(16, soft - 64) if soft != resource.RLIM_INFINITY else NET_CONCURRENCY
+
+    def stop(self):
+        self._stop_event.set()
+
+    async def _connect(self, host, port):
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = None
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        except OSError:
+            if sock:
+                sock.close()
+            return "error"  # Out of descriptors and the like: our failure, not the host's
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), self.timeout)
+            return "open"
+        except ConnectionRefusedError:
+            return "closed"
+        except (asyncio.TimeoutError, OSError):
+            return "filtered"
+        finally:
+            sock.close()
+
+    async def _probe(self, host, port, slots, on_open):
+        async with slots:
+            if self._stop_event.is_set():
+                return "filtered"
+            state = await self._connect(host, port)
+        self.probes += 1
+        if state == "open":
+            self.open_ports += 1
+            if on_open:
+                on_open(host, port)
+        return state
+
+    async def _sweep_host(self, host, slots, on_open):
+        tasks = [asyncio.create_task(self._probe(host, port, slots, on_open)) for port in self.ports]
+        done, late = await asyncio.wait(tasks, timeout=self.host_timeout)
+        for task in late:
+            task.cancel()
+        if late:
+            self.host_timeouts += 1
+            await asyncio.gather(*late, return_exceptions=True)
+        self.hosts += 1
+        states = []
+        for task in done:
+            if task.exception() is not None:
+                self.errors += 1
+            else:
+                states.append(task.result())
+        self.errors += states.count("error")
+        if "open" in states or "closed" in states:
+            self.alive += 1
+
+    async def run(self, hosts, on_open=None):
+        slots = asyncio.Semaphore(self.concurrency)
+        # Enough hosts in flight to keep every connect slot busy.
+        in_flight = asyncio.Semaphore(max(4, 2 * self.concurrency // max(1, len(self.ports))))
+        running = set()
+        for host in hosts:
+            if self._stop_event.is_set():
+                break
+            await in_flight.acquire()
+            task = asyncio.create_task(self._sweep_host(host, slots, on_open))
+            task.add_done_callback(lambda t: in_flight.release())
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.gather(*running)
+
+    def scan(self, hosts, on_open=None):
+        """Blocking sweep; returns the number of open ports found."""
+        self._stop_event.clear()
+        asyncio.run(self.run(hosts, on_open))
+        return self.open_ports
+
+def build_network_sweep(args):
+    """NetworkSweep from the --net-* flags, with its host iterator and target list."""
+    ports = parse_ports(args.net_ports)
+    targets = resolve_sweep_targets(args.net_targets) if args.net_targets else local_subnets()
+    sweep = NetworkSweep(ports, concurrency=args.net_concurrency, timeout=args.net_timeout,
+                         host_timeout=args.net_host_timeout)
+    return sweep, targets
+
+def run_network_scan(args):
+    """Interactive mode 4: sweep local subnets (or --net-targets) and print open ports as they appear."""
+    try:
+        sweep, targets = build_network_sweep(args)
+    except (ValueError, OSError) as e:
+        print(Fore.RED + f"[ERROR] Network scan: {e}")
+        return []
+    if not targets:
+        print(Fore.YELLOW + "[WARN] No local IPv4 subnets found; pass --net-targets.")
+        return []
+    print(Fore.CYAN + f"[LOG] Sweeping {', '.join(map(str, targets))} on {len(sweep.ports)} ports "
+                      f"({sweep.concurrency} concurrent connects, {sweep.timeout:g}s timeout).")
+    found = []
+    started = time.time()
+
+    def on_open(host, port):
+        found.append((host, port))
+        print(Fore.GREEN + f"[OPEN] {host}:{port}")
+
+    try:
+        sweep.scan(iter_sweep_hosts(targets), on_open)
+    except KeyboardInterrupt:
+        sweep.stop()
+        print(Fore.YELLOW + "\n[MISSION LOG] Sweep aborted. Partial results below.")
+    elapsed = time.time() - started
+    print(Fore.CYAN + f"[LOG] {sweep.hosts:,} hosts swept ({sweep.alive:,} up, {sweep.host_timeouts:,} timed out), "
+                      f"{sweep.probes:,} probes in {elapsed:,.1f}s ({sweep.probes / max(elapsed, 1e-6):,.0f}/s), "
+                      f"{sweep.open_ports:,} open ports.")
+    return found
+
+# ---------------------------
+# Headless Batch Mode (JSON Lines)
+# ---------------------------
+BATCH_MODES = ["quick", "full", "custom", "deep", "network", "processes", "hotspots"]
+
+def default_scan_paths(mode):
+    """Default targets for a scan mode (Quick/Deep = home, Full = every drive or /)."""
+    if mode == "full":
+        if platform.system() == "Windows":
+            return [f"{d}:\\" for d in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" if os.path.exists(f"{d}:\\")]
+        return ["/"]
+    return [os.path.expanduser("~")]
+
+class JsonlEmitter:
+    """Thread-safe JSON Lines writer, flushed per record so consumers see results live."""
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = Lock()
+
+    def emit(self, event, **fields):
+        record = {"event": event, "time": datetime.now().isoformat(timespec="seconds")}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+def apply_action(action, file_path, qdir=None):
+    """Apply a non-interactive --action policy to one detected file."""
+    file_path = detection_target(file_path)
+    if action == "quarantine":
+        return quarantine_file(file_path, qdir)
+    if action == "recycle":
+        return send_to_recycle_or_fallback(file_path)
+    if action == "delete":
+        return delete_permanent(file_path)
+    return True, "Reported only"
+
+def run_network_batch(args, emitter, started):
+    """``--batch --mode network``: one "open" event per open port as it is found."""
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            sweep, targets = build_network_sweep(args)
+        except (ValueError, OSError) as e:
+            print(Fore.RED + f"[ERROR] Network scan: {e}")
+            return 2
+    if not targets:
+        print(Fore.RED + "[ERROR] No local IPv4 subnets found; pass --net-targets.", file=sys.stderr)
+        return 2
+    emitter.emit("start", engine="NetworkSweep", mode="network", targets=[str(t) for t in targets], ports=len(sweep.ports),
+                 concurrency=sweep.concurrency)
+    try:
+        sweep.scan(iter_sweep_hosts(targets), lambda host, port: emitter.emit("open", host=host, port=port))
+    except KeyboardInterrupt:
+        sweep.stop()
+        emitter.emit("aborted")
+        return 2
+    emitter.emit("summary", engine="NetworkSweep", hosts=sweep.hosts, alive=sweep.alive, probes=sweep.probes,
+                 open=sweep.open_ports, host_timeouts=sweep.host_timeouts, errors=sweep.errors, elapsed=round(time.time() - started, 3))
+    return 0
+
+def run_batch_mode(args):
+    """Scan without animation or prompts; returns 0 clean, 1 threats found, 2 error.
+
+    Detections stream as JSON Lines to stdout (or --output, appended) while
+    the scan runs; human-readable warnings go to stderr. ``--mode network``
+    streams open ports instead.
+    """
+    started = time.time()
+    if args.mode == "custom" and not args.paths:
+        print(Fore.RED + "[ERROR] --mode custom needs --paths.", file=sys.stderr)
+        return 2
+    paths = args.paths or default_scan_paths(args.mode)
+    out = sys.stdout if args.output in (None, "-") else open(args.output, "a", encoding="utf-8")
+    emitter = JsonlEmitter(out)
+    try:
+        if args.mode == "network":
+            return run_network_batch(args, emitter, started)
+        with contextlib.redirect_stdout(sys.stderr):
+            processes = None
+            if args.mode == "processes" and not args.paths:
+                processes = collect_process_targets()
+                paths = processes.targets
+            engine, _ = select_engine(args, find_clamd_address(args.clamd), is_clamscan_available(), find_mp_cmd(),
+                                      heuristics=args.mode == "deep")
+            cache = attach_cache(engine, args)
+            name = engine.name if engine else "Defender"
+            report = open_report(args, name)
+            if engine:
+                engine.profile = resolve_profile(args, args.mode)
+                engine.router = build_router(args, engine.profile)
+            hotspots = None
+            if args.mode == "hotspots" and not args.paths:
+                hotspots = build_hotspot_scan(engine, args, args.hotspots_continue)
+                paths = hotspots.paths
+                if not engine:
+                    hotspots = None  # Defender takes the whole list in one go
+            emitter.emit("start", engine=name, mode=args.mode, paths=paths, action=args.action)
+
+            def on_detection(det):
+                extra = {}
+                if processes:
+                    extra["processes"] = [{"pid": pid, "name": pname}
+                                          for pid, pname in processes.owners.get(detection_target(det[0]), [])]
+                emitter.emit("detection", path=det[0], signature=det[1],
+                             digest=getattr(det, "digest", None), engine=name, **extra)
+                if report:
+                    report.write(det)
+
+            try:
+                if hotspots:
+                    detections = hotspots.run(on_detection, lambda category, tier_paths: emitter.emit(
+                        "tier", category=category, paths=len(tier_paths)))
+                elif engine:
+                    detections = engine.scan(paths, on_detection)
+                else:
+                    detections = []
+                    run_mp_tasks_and_collect(paths, detections)
+                    for det in detections:
+                        on_detection(det)
+            except KeyboardInterrupt:
+                if engine:
+                    (hotspots or engine).stop()
+                emitter.emit("aborted")
+                return 2
+            finally:
+                if cache:
+                    cache.close()
+                if report:
+                    report.close()
+
+            if args.action == "quarantine" and detections:
+                # One parallel batch and one manifest transaction for the whole run.
+                with QuarantineVault(ensure_quarantine_dir(), compress=args.quarantine_compress) as vault:
+                    results = vault.quarantine_many((detection_target(det[0]), det[1]) for det in detections)
+            elif args.action != "none":
+                results = [apply_action(args.action, det[0]) for det in detections]
+            else:
+                results = []
+            for det, (ok, msg) in zip(detections, results):
+                emitter.emit("action", path=det[0], action=args.action, ok=ok, message=msg)
+
+            stats = engine.stats if engine else ScanStats()
+            extra = {}
+            if engine and engine.router:
+                extra = {"skipped": stats.skipped, "skipped_bytes": stats.skipped_bytes,
+                         "types": engine.router.summary(), "time_saved": round(engine.router.time_saved(stats), 3)}
+            if hotspots:
+                extra["tiers"] = [{"category": c, "paths": n, "seconds": round(sec, 3), "detections": found}
+                                  for c, n, sec, found in hotspots.timings]
+                extra["by_tier"] = hotspots.found_by_tier
+                extra["first_verdict"] = hotspots.first_verdict and round(hotspots.first_verdict, 3)
+            emitter.emit("summary", engine=name, files=stats.files, bytes=stats.bytes, errors=stats.errors,
+                         detections=len(detections), elapsed=round(time.time() - started, 3), **extra)
+        return 1 if detections else 0
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+# ---------------------------
+# Quarantine Vault Commands
+# ---------------------------
+def run_vault_command(args):
+    """``quarantine list|restore|purge``: manage the vault from its manifest."""
+    try:
+        vault = QuarantineVault(args.vault)
+    except (OSError, sqlite3.Error) as e:
+        print(Fore.RED + f"[ERROR] Vault offline: {e}")
+        return 2
+    with vault:
+        if args.vault_command == "list":
+            items = vault.items()
+            if not items:
+                print(Fore.GREEN + "[VAULT] Empty.")
+            for item_id, at, size, sig, original, stored in items:
+                when = datetime.fromtimestamp(at).strftime("%Y-%m-%d %H:%M")
+                print(Fore.CYAN + f"#{item_id:<5} {when}  {size / 1024:>10,.1f} KB  " + Fore.RED + f"{sig or '-':<28} "
+                      + Fore.WHITE + original)
+            return 0
+        if args.vault_command == "restore":
+            status = 0
+            for ref in args.items:
+                item_id = vault.find(ref)
+                try:
+                    ok, msg = vault.restore(item_id, args.to) if item_id else (False, f"Not in vault: {ref}")
+                except OSError as e:
+                    ok, msg = False, str(e)
+                print((Fore.GREEN if ok else Fore.RED) + f"[VAULT] {ref}: {msg}")
+                status = status or (0 if ok else 1)
+            return status
+        removed, freed = vault.purge(args.older_than)
+        print(Fore.GREEN + f"[VAULT] Purged {removed:,} items, freed {freed / (1024 ** 2):,.1f} MB.")
+        return 0
+
+# ---------------------------
+# Benchmark Suite (synthetic corpus)
+# ---------------------------
+BENCH_CORPUS_VERSION = 1
+BENCH_SEED = 1337
+BENCH_CONFIGS = ["walk-1", "walk-8", "native", "native-nohash", "native-1worker", "native-noarchives",
+                 "clamscan", "fanout", "clamd"]
+
+def build_bench_corpus(root, scale=1.0, seed=BENCH_SEED):
+    """Write the reproducible benchmark tree under ``root``; returns its manifest.
+
+    Same seed and scale give byte-identical trees: many tiny files, a few
+    huge ones, a deep directory chain, zip/tar.gz archives and EICAR test
+    files (loose and inside archives). An existing tree with a matching
+    manifest is reused as is.
+    """
+    manifest_path = os.path.join(root, "corpus.json")
+    wanted = {"version": BENCH_CORPUS_VERSION, "seed": seed, "scale": scale}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if all(manifest.get(k) == v for k, v in wanted.items()):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    tree = os.path.join(root, "tree")
+    shutil.rmtree(tree, ignore_errors=True)
+    rng = random.Random(seed)
+    counts = {"files": 0, "bytes": 0, "eicar": 0}
+
+    def put(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        counts["files"] += 1
+        counts["bytes"] += len(data)
+
+    for i in range(max(1, int(20000 * scale))):
+        put(os.path.join(tree, "tiny", f"d{i % 100:02d}", f"f{i:06d}.dat"), rng.randbytes(rng.randrange(0, 4096)))
+    block = rng.randbytes(1024 * 1024)
+    for i in range(3):
+        path = os.path.join(tree, "huge", f"blob{i}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mib = max(1, int(64 * scale))
+        with open(path, "wb") as f:
+            for n in range(mib):
+                f.write(struct.pack("<QQ", i, n) + block[16:])
+        counts["files"] += 1
+        counts["bytes"] += mib * len(block)
+    deep = os.path.join(tree, "deep")
+    for level in range(64):
+        deep = os.path.join(deep, f"l{level}")
+        put(os.path.join(deep, "leaf.txt"), rng.randbytes(256))
+    for i in range(max(1, int(10 * scale))):
+        put(os.path.join(tree, "eicar", f"sample{i}.com"), EICAR_SIGNATURE)
+        counts["eicar"] += 1
+    members = [(f"pkg/m{i}.py", rng.randbytes(rng.randrange(100, 20000))) for i in range(200)]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members + [("pkg/eicar.com", EICAR_SIGNATURE)]:
+            zf.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data)
+    put(os.path.join(tree, "archives", "bundle.zip"), buf.getvalue())
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        for name, data in members[:50] + [("nested/eicar.com", EICAR_SIGNATURE)]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    # gzip.compress(mtime=0) keeps the header, and so the file, byte-identical.
+    put(os.path.join(tree, "archives", "bundle.tar.gz"), gzip.compress(buf.getvalue(), mtime=0))
+    counts["eicar_in_archives"] = 2
+    manifest = dict(wanted, **counts)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def peak_rss_bytes():
+    """Peak resident set size of this process."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+
+def bench_available(config):
+    """None when ``config`` can run here, else the reason it is skipped."""
+    if config in ("clamscan", "fanout") and not is_clamscan_available():
+        return "clamscan not installed"
+    if config == "clamd" and not find_clamd_address(None):
+        return "no clamd daemon"
+    return None
+
+def run_bench_config(config, tree):
+    """Run one configuration over ``tree`` in this process; returns its measurements."""
+    stats = ScanStats()
+    detections = 0
+    start = time.perf_counter()
+    if config.startswith("walk-"):
+        ParallelWalker([tree], threads=int(config[5:]), stats=stats).run(lambda item: stats.add_file(item[0], item[1].st_size))
+    else:
+        if config.startswith("native"):
+            engine = NativeScanEngine(workers=1 if config == "native-1worker" else None,
+                                      walkers=1 if config == "native-1worker" else None,
+                                      hash_algorithm=None if config == "native-nohash" else "sha256",
+                                      unpacker=None if config == "native-noarchives" else ArchiveUnpacker())
+        elif config == "clamscan":
+            engine = ClamscanEngine()
+        elif config == "fanout":
+            engine = FanoutEngine()
+        else:
+            engine = ClamdEngine(find_clamd_address(None))
+        stats = engine.stats
+        detections = len(engine.scan([tree]))
+    wall = time.perf_counter() - start
+    return {"config": config, "files": stats.files, "bytes": stats.bytes, "detections": detections,
+            "wall_s": round(wall, 3), "files_per_s": round(stats.files / wall, 1) if wall else None,
+            "mb_per_s": round(stats.bytes / (1024 ** 2) / wall, 1) if wall else None,
+            "peak_rss_mb": round(peak_rss_bytes() / (1024 ** 2), 1)}
+
+def run_bench(args):
+    """``bench``: build the corpus, run every configuration in a fresh process, append results."""
+    if args.run_one:
+        print(json.dumps(run_bench_config(args.run_one, os.path.join(args.corpus, "tree"))))
+        return 0
+    configs = args.configs or BENCH_CONFIGS
+    print(Fore.CYAN + f"[BENCH] Building corpus in {args.corpus} (scale {args.scale}, seed {args.seed})...")
+    manifest = build_bench_corpus(args.corpus, args.scale, args.seed)
+    print(Fore.CYAN + f"[BENCH] Corpus: {manifest['files']:,} files, {manifest['bytes'] / (1024 ** 2):,.1f} MB")
+    try:
+        with open(args.output, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = {"runs": []}
+    previous = {}
+    for run in history["runs"]:
+        if run.get("corpus", {}).get("scale") == args.scale and run.get("corpus", {}).get("seed") == args.seed:
+            previous = {r["config"]: r for r in run["results"] if "wall_s" in r}
+    results = []
+    for config in configs:
+        reason = bench_available(config)
+        if reason:
+            print(Fore.YELLOW + f"[BENCH] {config:<18} skipped: {reason}")
+            results.append({"config": config, "skipped": reason})
+            continue
+        samples = []
+        for _ in range(args.repeat):
+            # A fresh interpreter per sample keeps peak RSS per configuration honest.
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "bench", "--run-one", config,
+                                  "--corpus", args.corpus], capture_output=True, text=True)
+            if out.returncode:
+                print(Fore.RED + f"[BENCH] {config} failed: {out.stderr.strip()[-300:]}")
+                break
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        if not samples:
+            results.append({"config": config, "skipped": "failed"})
+            continue
+        best = dict(min(samples, key=lambda r: r["wall_s"]), samples=len(samples),
+                    peak_rss_mb=max(r["peak_rss_mb"] for r in samples))
+        results.append(best)
+        delta = ""
+        if config in previous and previous[config]["wall_s"]:
+            change = (best["wall_s"] / previous[config]["wall_s"] - 1) * 100
+            delta = (Fore.RED if change > 10 else Fore.GREEN) + f"  {change:+.1f}% wall vs last run"
+        print(Fore.GREEN + f"[BENCH] {config:<18} {best['wall_s']:>8.3f} s  {best['files_per_s']:>10,.0f} files/s  "
+                           f"{best['mb_per_s']:>8,.1f} MB/s  {best['peak_rss_mb']:>7,.1f} MB RSS  "
+                           f"{best['detections']} hits" + delta)
+    history["runs"].append({"time": datetime.now().isoformat(timespec="seconds"),
+                            "scanner": hash_file(os.path.abspath(__file__))[0][:19],
+                            "python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count(), "corpus": manifest, "results": results})
+    tmp = args.output + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp, args.output)
+    print(Fore.CYAN + f"[BENCH] Results appended to {args.output}")
+    return 0
+
 # ---------------------------
 # Cyber Intro & Welcome
 # ---------------------------
@@ -622,14 +4670,222 @@ def cyber_intro(system_info):
 # ---------------------------
 # Main Orchestration
 # ---------------------------
+def build_native_inspectors(args, heuristics=False):
+    """EICAR check plus the optional blocklist, byte-signature and entropy inspectors."""
+    inspectors = [eicar_inspector]
+    blocklist = args.blocklist or os.path.join(STATE_DIR, "blocklist.txt")
+    if os.path.exists(blocklist):
+        try:
+            inspectors.append(HashBlocklist(blocklist))
+        except (OSError, ValueError) as e:
+            print(Fore.YELLOW + f"[WARN] Blocklist offline: {e}")
+    elif args.blocklist:
+        print(Fore.YELLOW + f"[WARN] Blocklist not found: {blocklist}")
+    rules = args.signatures or os.path.join(STATE_DIR, "signatures.txt")
+    if os.path.exists(rules):
+        try:
+            inspectors.append(SignatureMatcher(rules))
+        except OSError as e:
+            print(Fore.YELLOW + f"[WARN] Signature rules offline: {e}")
+    elif args.signatures:
+        print(Fore.YELLOW + f"[WARN] Signature rules not found: {rules}")
+    if heuristics:
+        inspectors.append(EntropyHeuristic(args.heuristic_threshold))
+    return inspectors
+
+def build_archive_unpacker(args):
+    """Archive stage for the native engine, sized from the --archive-* flags."""
+    if args.no_archives:
+        return None
+    return ArchiveUnpacker(max_depth=args.archive_depth, max_member_size=args.archive_max_size * 1024 ** 2,
+                           max_ratio=args.archive_max_ratio)
+
+def select_engine(args, clamd, clam, mp, heuristics=False):
+    """Pick the best available engine: clamd > clamscan > (Defender) > native.
+
+    Returns (engine, status message); engine is None when Windows Defender
+    should be driven through run_mp_tasks_and_collect() instead. The entropy
+    heuristics are a native inspector, so ``heuristics`` (or --heuristics)
+    always selects the native engine.
+    """
+    hash_algorithm = None if args.hash == "none" else args.hash
+    if heuristics or args.heuristics:
+        engine = NativeScanEngine(workers=args.workers, inspectors=build_native_inspectors(args, heuristics=True),
+                                  hash_algorithm=hash_algorithm, unpacker=build_archive_unpacker(args))
+        backend = "NumPy" if np is not None else "sampled"
+        return engine, f"Engaging Heuristic Analyzer ({backend} entropy)..."
+    if clamd:
+        engine = ClamdEngine(clamd, mode=args.clamd_mode, workers=args.workers, hash_algorithm=hash_algorithm)
+        if engine.mode == "multiscan":
+            return engine, "Linking clamd Daemon (MULTISCAN: detections only, no per-file progress)..."
+        return engine, "Linking clamd Daemon..."
+    if clam:
+        jobs = args.jobs or default_fanout_jobs()
+        if jobs > 1:
+            return FanoutEngine(jobs=jobs, balance=args.shard_by, scanner=args.fanout_scanner), \
+                f"Deploying {jobs} ClamAV Payloads..."
+        return ClamscanEngine(clam), "Deploying ClamAV Payload..."
+    if mp:
+        return None, "Activating Defender Shield..."
+    engine = NativeScanEngine(workers=args.workers, inspectors=build_native_inspectors(args),
+                              hash_algorithm=hash_algorithm, unpacker=build_archive_unpacker(args))
+    return engine, "Deploying Native Scan Engine..."
+
+def resolve_profile(args, mode=None):
+    """Scan profile from --profile, else the built-in "full" one for Full scans ("none" disables it)."""
+    ref = args.profile or ("full" if mode == "full" else None)
+    if not ref or ref == "none":
+        return None
+    try:
+        return ScanProfile.load(ref)
+    except (OSError, ValueError, TypeError) as e:
+        print(Fore.YELLOW + f"[WARN] Scan profile offline: {e}")
+        return None
+
+def build_router(args, profile=None):
+    """File-type router when --sniff is given or the profile defines routes."""
+    routes = profile.routes if profile else {}
+    if not (args.sniff or routes):
+        return None
+    try:
+        return FileTypeRouter(routes)
+    except ValueError as e:
+        print(Fore.YELLOW + f"[WARN] File-type routing offline: {e}")
+        return None
+
+def print_router_summary(router, stats, stream=None):
+    """Per-type counts and the engine time the router saved."""
+    print(Fore.CYAN + "[LOG] File types (files / skipped):  " + "  ".join(
+        f"{kind} {c['files']:,}/{c['skipped']:,}" for kind, c in router.summary().items()), file=stream)
+    print(Fore.CYAN + f"[LOG] Type routing skipped {stats.skipped:,} files ({stats.skipped_bytes / (1024 ** 2):,.1f} MB), "
+                      f"~{router.time_saved(stats):,.1f} s engine time saved after {router.sniff_seconds:,.2f} s sniffing.",
+          file=stream)
+
+def attach_cache(engine, args):
+    """Open the verdict cache for ``engine`` unless --no-cache was given (or clamd walks the tree itself)."""
+    if not engine or args.no_cache or getattr(engine, "mode", None) == "multiscan":
+        return None
+    try:
+        cache = ScanCache(args.cache, engine.signature_version(), engine.name)
+    except sqlite3.Error as e:
+        print(Fore.YELLOW + f"[WARN] Verdict cache offline: {e}")
+        return None
+    engine.cache = cache
+    return cache
+
 def main():
     parser = argparse.ArgumentParser(description="Ultimate Cyber Malware Scanner")
     parser.add_argument("--paths", nargs="+", help="Paths to scan (override mode)")
+    parser.add_argument("--clamd", default=None,
+                        help="clamd socket (unix:/path or host:port); autodetected when omitted")
+    parser.add_argument("--clamd-mode", choices=["instream", "multiscan"], default="instream",
+                        help="instream: stream file contents with per-file progress and the verdict cache; "
+                             "multiscan: clamd reads the files itself and only reports detections")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Parallel clamscan workers over balanced shards (default: logical cores, RAM permitting)")
+    parser.add_argument("--shard-by", choices=["files", "bytes"], default="files",
+                        help="Balance fan-out shards by file count or by bytes")
+    parser.add_argument("--fanout-scanner", choices=["clamscan", "clamdscan"], default="clamscan",
+                        help="Worker binary for fan-out mode (clamdscan runs with --multiscan)")
+    parser.add_argument("--cache", default=None,
+                        help="Verdict cache database (default: ~/.cyber_scanner/scan_cache.db)")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every file, ignoring the verdict cache")
+    parser.add_argument("--hash", choices=["sha256", "blake2b", "none"], default="sha256",
+                        help="Content digest used to dedup identical files (native/clamd instream engines)")
+    parser.add_argument("--blocklist", default=None,
+                        help="SHA-256 blocklist (one hex digest per line) for the native engine "
+                             "(default: ~/.cyber_scanner/blocklist.txt if present)")
+    parser.add_argument("--signatures", default=None,
+                        help="Byte-signature rules (Name:HexPattern per line) for the native engine "
+                             "(default: ~/.cyber_scanner/signatures.txt if present)")
+    parser.add_argument("--no-archives", action="store_true",
+                        help="Do not look inside zip/jar/wheel/tar(.gz/.bz2/.xz) files (native engine)")
+    parser.add_argument("--archive-depth", type=int, default=ARCHIVE_MAX_DEPTH,
+                        help="Max nesting level followed inside archives")
+    parser.add_argument("--archive-max-size", type=int, default=ARCHIVE_MAX_MEMBER_SIZE // 1024 ** 2,
+                        help="MB read from each archive member before it is cut off")
+    parser.add_argument("--archive-max-ratio", type=int, default=ARCHIVE_MAX_RATIO,
+                        help="Skip archive members whose compression ratio exceeds this (zip-bomb guard)")
+    parser.add_argument("--quarantine-compress", choices=sorted(QUARANTINE_CODECS), default=None,
+                        help="Compress quarantined payloads (saves vault space, costs the zero-copy move)")
+    parser.add_argument("--report", default=None,
+                        help="Stream detections to this report file while scanning (appended; rotated by size)")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, default=None,
+                        help="Report format (default: from the extension: .jsonl, .csv, .sarif, else text)")
+    parser.add_argument("--report-max-mb", type=float, default=None,
+                        help=f"Rotate the report past this size, keeping {REPORT_BACKUPS} old files")
+    parser.add_argument("--profile", default=None,
+                        help="Scan profile: JSON file, name in ~/.cyber_scanner/profiles, built-in "
+                             f"({', '.join(BUILTIN_PROFILES)}) or 'none' (Full scans default to 'full')")
+    parser.add_argument("--sniff", action="store_true",
+                        help="Sniff magic bytes and keep inert types (large media/text, empty files) away from the "
+                             "engines; a profile's \"routes\" overrides the routing table")
+    parser.add_argument("--heuristics", action="store_true",
+                        help="Add entropy heuristics for packed executables and encrypted files (native engine)")
+    parser.add_argument("--heuristic-threshold", type=int, default=HEUR_THRESHOLD,
+                        help=f"Heuristic score (0-100) at which a file is reported (default {HEUR_THRESHOLD})")
+    parser.add_argument("--net-targets", nargs="+", default=None,
+                        help="Hosts/CIDRs for the network scan (default: the local IPv4 subnets)")
+    parser.add_argument("--net-ports", default=NET_DEFAULT_PORTS,
+                        help="Ports for the network scan, e.g. 22,80,8000-8100")
+    parser.add_argument("--net-concurrency", type=int, default=NET_CONCURRENCY,
+                        help=f"Concurrent connects for the network scan (default {NET_CONCURRENCY})")
+    parser.add_argument("--net-timeout", type=float, default=NET_CONNECT_TIMEOUT,
+                        help=f"Seconds per connect attempt (default {NET_CONNECT_TIMEOUT:g})")
+    parser.add_argument("--net-host-timeout", type=float, default=NET_HOST_TIMEOUT,
+                        help=f"Seconds for all ports of one host (default {NET_HOST_TIMEOUT:g})")
+    parser.add_argument("--hotspots-continue", choices=["none", "quick", "full"], default="none",
+                        help="After the hot-spot tiers, continue into the home tree (quick) or every drive (full)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Headless run: no intro/animation/prompts, detections streamed as JSON Lines")
+    parser.add_argument("--mode", choices=BATCH_MODES, default="quick", help="Scan mode for --batch")
+    parser.add_argument("--action", choices=["none", "quarantine", "recycle", "delete"], default="none",
+                        help="What --batch does with detected files")
+    parser.add_argument("--output", default=None,
+                        help="JSON Lines destination for --batch ('-' = stdout, files are appended)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay resident and scan files as they are created/modified (Linux inotify)")
+    parser.add_argument("--watch-debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="Seconds a file must stay quiet before it is scanned in watch mode")
+    parser.add_argument("--watch-max-pending", type=int, default=WATCH_MAX_PENDING,
+                        help="Max queued paths in watch mode before event reading is throttled")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Native engine worker threads (default: {default_worker_count()})")
+    commands = parser.add_subparsers(dest="command")
+    vault_parser = commands.add_parser("quarantine", help="List, restore or purge quarantined files")
+    vault_parser.add_argument("--vault", default=None, help=f"Vault root (default: {QUARANTINE_ROOT})")
+    vault_commands = vault_parser.add_subparsers(dest="vault_command", required=True)
+    vault_commands.add_parser("list", help="Show every quarantined item")
+    restore_parser = vault_commands.add_parser("restore", help="Put items back where they came from")
+    restore_parser.add_argument("items", nargs="+", help="Item IDs (see list) or original paths")
+    restore_parser.add_argument("--to", default=None, help="Restore into this directory/path instead")
+    purge_parser = vault_commands.add_parser("purge", help="Permanently drop old items")
+    purge_parser.add_argument("--older-than", type=parse_age, required=True, help="Age such as 30d, 12h, 90m")
+    bench_parser = commands.add_parser("bench", help="Benchmark engines on a reproducible synthetic corpus")
+    bench_parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "cyber_bench_corpus"),
+                              help="Where the corpus is built (reused while seed/scale match)")
+    bench_parser.add_argument("--scale", type=float, default=1.0, help="Corpus size factor (1.0 is about 250 MB)")
+    bench_parser.add_argument("--seed", type=int, default=BENCH_SEED, help="Corpus random seed")
+    bench_parser.add_argument("--configs", nargs="+", choices=BENCH_CONFIGS, default=None,
+                              help="Configurations to run (default: all available)")
+    bench_parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best wall time kept)")
+    bench_parser.add_argument("--output", default="bench_results.json", help="JSON results file (appended)")
+    bench_parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
     args = parser.parse_args()
     
+    if args.command == "quarantine":
+        sys.exit(run_vault_command(args))
+    if args.command == "bench":
+        sys.exit(run_bench(args))
+    if args.batch:
+        sys.exit(run_batch_mode(args))
+    if args.watch:
+        sys.exit(run_watch_mode(args, args.paths or [os.path.expanduser("~")]))
+    
     try:
-        system_info = get_system_info()
-        cyber_intro(system_info)
+        # Probes run in parallel behind the boot animation; the intel table
+        # at the end of the intro only waits for whatever is still pending.
+        cyber_intro(SYSTEM_INFO.refresh())
     except Exception as e:
         print(Fore.RED + f"[CRITICAL] Failed to initialize: {e}")
         sys.exit(1)
@@ -639,14 +4895,17 @@ def main():
     print(Fore.CYAN + "[1] Quick Scan (User Folders)")
     print(Fore.CYAN + "[2] Full Scan (All Devices/Drives)")
     print(Fore.CYAN + "[3] Custom Scan (Specify Path)")
-    print(Fore.CYAN + "[4] Network Scan (Connected Devices - Simulated)")
-    print(Fore.CYAN + "[5] Deep AI Scan (Advanced Simulation)")
+    print(Fore.CYAN + "[4] Network Scan (Local Subnet Port Sweep)")
+    print(Fore.CYAN + "[5] Deep AI Scan (Entropy Heuristics)")
+    print(Fore.CYAN + "[6] Process Scan (Running Programs & Loaded Modules)")
+    print(Fore.CYAN + "[7] Hot Spots (Autostart, Cron, Temp, Downloads First)")
     try:
-        choice = input(Fore.YELLOW + "[COMMAND] Execute Mode [1-5]: ").strip()
+        choice = input(Fore.YELLOW + "[COMMAND] Execute Mode [1-7]: ").strip()
     except KeyboardInterrupt:
         print(Fore.YELLOW + "\n[MISSION LOG] Initialization aborted.")
         sys.exit(0)
     
+    processes = None
     if choice == "3":
         try:
             path = input(Fore.CYAN + "[INPUT] Enter Target Path: ").strip()
@@ -658,17 +4917,27 @@ def main():
             print(Fore.YELLOW + "\n[MISSION LOG] Path input aborted.")
             sys.exit(0)
     elif choice == "2":
-        if platform.system() == "Windows":
-            paths = [f"{d}:\\" for d in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" if os.path.exists(f"{d}:\\")]
-        else:
-            paths = ["/"]
+        paths = default_scan_paths("full")
         print(Fore.CYAN + f"[LOG] Full Matrix Scan: Targeting {', '.join(paths)}")
     elif choice == "4":
-        paths = [os.path.expanduser("~")]  # Simulated network scan
-        print(Fore.CYAN + "[LOG] Network Scan: Scanning connected nodes (simulated).")
+        run_network_scan(args)
+        print(Fore.CYAN + f"\n[MISSION LOG] Session Terminated at {datetime.now().strftime('%H:%M:%S')}. Stay Vigilant! 🔒")
+        return
     elif choice == "5":
-        paths = [os.path.expanduser("~")]  # Deep AI simulation
-        print(Fore.CYAN + "[LOG] Deep AI Scan: Engaging neural networks for threat prediction.")
+        paths = [os.path.expanduser("~")]
+        print(Fore.CYAN + "[LOG] Deep AI Scan: scoring packed executables and encrypted files by byte entropy.")
+    elif choice == "6":
+        processes = collect_process_targets()
+        paths = processes.targets
+    elif choice == "7":
+        follow_mode = args.hotspots_continue
+        try:
+            answer = input(Fore.CYAN + "[INPUT] Then continue into the home tree (h), the full tree (f), or stop (Enter)? ")
+        except KeyboardInterrupt:
+            print(Fore.YELLOW + "\n[MISSION LOG] Initialization aborted.")
+            sys.exit(0)
+        follow_mode = {"h": "quick", "f": "full"}.get(answer.strip()[:1].lower(), follow_mode)
+        paths = [os.path.expanduser("~")]  # Replaced by the hot-spot tiers once an engine is chosen
     else:
         paths = [os.path.expanduser("~")]
     
@@ -677,60 +4946,93 @@ def main():
     
     # Initialize UI & Detect Engines
     ui = AnimatedScanner(title="Ludang's Cyber Matrix Scanner v4.0", paths=paths)
+    clamd = find_clamd_address(args.clamd)
     clam = is_clamscan_available()
     mp = find_mp_cmd()
-    ui.module_status["ClamAV"] = bool(clam)
+    ui.module_status["ClamAV"] = bool(clamd or clam)
     ui.module_status["Defender"] = bool(mp)
-    ui.module_status["Mode"] = "ClamAV" if clam else ("Defender" if mp else "Simulation")
     
     infected = []
+    engine, status = select_engine(args, clamd, clam, mp, heuristics=choice == "5")
+    ui.module_status["Mode"] = engine.name if engine else "Defender"
+    cache = attach_cache(engine, args)
+    report = open_report(args, ui.module_status["Mode"])
+    profile = resolve_profile(args, "full" if choice == "2" else None)
+    if engine:
+        engine.profile = profile
+        engine.router = build_router(args, profile)
+    hotspots = None
+    if choice == "7" and not args.paths:
+        hotspots = build_hotspot_scan(engine, args, follow_mode)
+        paths = ui.paths = hotspots.paths
+        print(Fore.CYAN + "[LOG] Hot Spots: " + ", ".join(f"{c} ({len(p)})" for c, p in hotspots.tiers)
+              + (f", then the {hotspots.follow[0]}" if hotspots.follow else ""))
+        if not engine:
+            hotspots = None  # Defender takes the whole list in one go
+    if profile:
+        print(Fore.CYAN + f"[LOG] Scan profile '{profile.name}': pruning {len(profile.exclude)} globs"
+                          + (f", files over {profile.max_size // 1024 ** 2} MB" if profile.max_size else ""))
+
+    def record(det):
+        # Engines stream detections here as they are found, so an aborted
+        # scan still hands its partial intel to the interactive menu.
+        infected.append(det)
+        if report:
+            report.write(det)
     
+    estimate_stop = Event()
     try:
-        if clam:
-            cmd = [clam, "-r", "--infected", "--no-summary"] + paths
-            try:
-                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            except Exception as e:
-                print(Fore.RED + "[ERROR] ClamAV activation failed:", e)
-                proc = None
-            ui.status_message = "Deploying ClamAV Payload..."
-            ui_thread = ui.start_ui_for_process(proc)
-            if proc:
-                out, err = proc.communicate()
-                for line in out.splitlines():
-                    line = line.strip()
-                    if line.endswith(" FOUND"):
-                        try:
-                            left, right = line.rsplit(":", 1)
-                            file_path = left.strip()
-                            sig = right.replace(" FOUND", "").strip()
-                            infected.append((file_path, sig))
-                        except:
-                            pass
-        elif mp:
+        if engine:
+            ui.stats = engine.stats
+            Thread(target=estimate_scan_totals, args=(paths, engine.stats, estimate_stop, profile), daemon=True).start()
+            if hotspots:
+                def on_tier(category, tier_paths):
+                    ui.status_message = f"Scanning {category} ({len(tier_paths)} paths)..."
+                t_proc = Thread(target=hotspots.run, args=(record, on_tier), daemon=True)
+            else:
+                t_proc = Thread(target=engine.scan, args=(paths, record), daemon=True)
+            t_proc.start()
+            ui.status_message = status
+            ui_thread = ui.start_ui_for_process(t_proc)
+            t_proc.join()
+        else:
             threats = []
             t_proc = Thread(target=run_mp_tasks_and_collect, args=(paths, threats), daemon=True)
             t_proc.start()
-            ui.status_message = "Activating Defender Shield..."
+            ui.status_message = status
             ui_thread = ui.start_ui_for_process(t_proc)
             t_proc.join()
             infected = threats
-        else:
-            ui.status_message = "Running Simulated Cyber Attack..."
-            ui_thread = ui.start_ui_simulation()
-            while not ui._stop_event.is_set():
-                time.sleep(0.1)
-            if random.random() > 0.5:
-                infected = [(random.choice(paths) + "\\" + random.choice(ui._file_samples), random.choice(["Trojan", "Worm", "Ransomware", "Spyware", "Botnet", "Keylogger", "Exploit"])) for _ in range(random.randint(1, 8))]
+            if report:
+                report.write_many(infected)
         
+        estimate_stop.set()
         ui._stop_event.set()
         time.sleep(0.1)
     except KeyboardInterrupt:
+        estimate_stop.set()
         ui._stop_event.set()
+        if engine:
+            (hotspots or engine).stop()
         print(Fore.YELLOW + "\n[MISSION LOG] Mission aborted. Declassifying partial intel.")
     except Exception as e:
         ui._stop_event.set()
         print(Fore.RED + "[ERROR] Critical failure in matrix:", e)
+    if report:
+        report.close()
+        print(Fore.CYAN + f"[LOG] {report.rows:,} detections reported to {report.path} ({report.fmt}).")
+    if cache:
+        cache.close()
+        print(Fore.CYAN + f"[LOG] Verdict cache: {cache.hits:,} unchanged files skipped, {cache.misses:,} scanned.")
+    if engine and engine.stats.hashed_bytes:
+        print(Fore.CYAN + f"[LOG] Hashed {engine.stats.hashed_bytes / (1024 ** 2):,.1f} MB at {engine.stats.hash_mb_per_sec():,.1f} MB/s.")
+    if hotspots:
+        print_hotspot_summary(hotspots)
+    if engine and engine.router:
+        print_router_summary(engine.router, engine.stats)
+    if engine and engine.stats.archive_members:
+        print(Fore.CYAN + f"[LOG] Archives: {engine.stats.archive_members:,} members scanned, "
+                          f"{engine.stats.archive_limited:,} cut off by size/ratio limits.")
     
     # Final Summary with Enhanced Display
     border_char = random.choice(["═", "▒", "█"])
@@ -741,15 +5043,21 @@ def main():
         print(Fore.GREEN + "║ System Fortified: No Threats Infiltrated. ".center(78) + " ║")
     else:
         print(Fore.RED + f"║ Alert: {len(infected)} Intrusions Detected! Threat Level: {ui.threat_level} ".center(78) + " ║")
-        for i, (p, sig) in enumerate(infected, start=1):
+        for i, det in enumerate(infected, start=1):
+            p, sig = det
             p_wrapped = textwrap.wrap(p, width=62)
             print(Fore.RED + f"║ [ALERT {i}] Sig: {sig} ".ljust(78) + " ║")
             for line in p_wrapped:
                 print(Fore.RED + f"║   Target: {line:<62} ║")
+            if getattr(det, "digest", None):
+                print(Fore.RED + f"║   Digest: {det.digest[:62]:<62} ║")
+            owners = processes.describe(p) if processes else ""
+            for line in textwrap.wrap(owners, width=59):
+                print(Fore.RED + f"║   Loaded by: {line:<59} ║")
     print(Fore.CYAN + f"╚{border_char * 80}╝\n")
     
     # Interactive Actions
-    interactive_menu(infected)
+    interactive_menu(infected, args.quarantine_compress, processes)
     print(Fore.CYAN + f"\n[MISSION LOG] Session Terminated at {datetime.now().strftime('%H:%M:%S')}. Stay Vigilant! 🔒")
 
 if __name__ == "__main__":
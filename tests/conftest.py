@@ -0,0 +1,15 @@
+import importlib.util
+import os
+
+import pytest
+
+SCANNER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scan_malware_v3.2.py")
+
+
+@pytest.fixture(scope="session")
+def scanner():
+    """The scanner script, imported as a module (its file name is not importable)."""
+    spec = importlib.util.spec_from_file_location("scan_malware", SCANNER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,114 @@
+import os
+import socketserver
+import struct
+import sys
+import threading
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(socketserver, "UnixStreamServer"), reason="needs AF_UNIX")
+
+EICAR = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+
+class FakeClamdHandler(socketserver.StreamRequestHandler):
+    """Just enough of the clamd protocol: PING, VERSION, IDSESSION/INSTREAM/END and MULTISCAN."""
+
+    def read_command(self):
+        buf = b""
+        while not buf.endswith(b"\0"):
+            byte = self.rfile.read(1)
+            if not byte:
+                return None
+            buf += byte
+        return buf[1:-1].decode()
+
+    def verdict(self, data):
+        return "Eicar-Test-Signature FOUND" if EICAR in data else "OK"
+
+    def handle(self):
+        session = 0
+        while True:
+            command = self.read_command()
+            if command is None or command == "END":
+                return
+            if command == "PING":
+                self.wfile.write(b"PONG\0")
+                return
+            if command == "VERSION":
+                self.wfile.write(b"ClamAV 1.0.0/27000/Fake\0")
+                return
+            if command == "IDSESSION":
+                continue
+            if command == "INSTREAM":
+                self.server.instreams += 1
+                data = b""
+                while True:
+                    (size,) = struct.unpack("!L", self.rfile.read(4))
+                    if not size:
+                        break
+                    data += self.rfile.read(size)
+                session += 1
+                self.wfile.write(f"{session}: stream: {self.verdict(data)}\0".encode())
+                continue
+            if command.startswith("MULTISCAN "):
+                for dirpath, _, names in os.walk(command[len("MULTISCAN "):]):
+                    for name in names:
+                        path = os.path.join(dirpath, name)
+                        with open(path, "rb") as f:
+                            verdict = self.verdict(f.read())
+                        if verdict != "OK":  # clamd only reports detections here
+                            self.wfile.write(f"{path}: {verdict}\0".encode())
+                return
+
+
+@pytest.fixture
+def fake_clamd(tmp_path):
+    server = socketserver.ThreadingUnixStreamServer(str(tmp_path / "clamd.sock"), FakeClamdHandler)
+    server.daemon_threads = True
+    server.instreams = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tree(tmp_path, scanner):
+    root = tmp_path / "tree"
+    (root / "sub").mkdir(parents=True)
+    (root / "clean.txt").write_bytes(b"hello")
+    (root / "sub" / "eicar.com").write_bytes(EICAR)
+    vault = root / scanner.QUARANTINE_VAULT_NAME
+    vault.mkdir()
+    (vault / "isolated.com").write_bytes(EICAR)
+    return root
+
+
+def test_find_clamd_address_pings(scanner, fake_clamd):
+    address = fake_clamd.server_address
+    assert scanner.find_clamd_address(address) == address
+    assert scanner.ClamdEngine(address).signature_version() == "ClamAV 1.0.0/27000"
+
+
+def test_instream_default_counts_every_file_and_uses_cache(scanner, fake_clamd, tree, tmp_path):
+    engine = scanner.ClamdEngine(fake_clamd.server_address, workers=2)
+    assert engine.mode == "instream"
+    engine.cache = scanner.ScanCache(str(tmp_path / "cache.db"), engine.signature_version())
+    detections = engine.scan([str(tree)])
+    assert [d[0] for d in detections] == [str(tree / "sub" / "eicar.com")]
+    assert engine.stats.files == 2  # The vault is skipped by the walker
+    streamed = fake_clamd.instreams
+
+    engine.stats = scanner.ScanStats()
+    again = engine.scan([str(tree)])
+    engine.cache.close()
+    assert [d[0] for d in again] == [str(tree / "sub" / "eicar.com")]
+    assert fake_clamd.instreams == streamed  # Served from the verdict cache
+
+
+def test_multiscan_drops_quarantined_hits(scanner, fake_clamd, tree):
+    engine = scanner.ClamdEngine(fake_clamd.server_address, mode="multiscan")
+    detections = engine.scan([str(tree)])
+    assert [d[0] for d in detections] == [str(tree / "sub" / "eicar.com")]
@@ -0,0 +1,109 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="fake clamscan is a shebang script")
+
+EICAR = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+FAKE_CLAMSCAN = """\
+#!{python}
+import os, sys
+args = sys.argv[1:]
+if args == ["--version"]:
+    print("ClamAV 1.0.5/27240/Fri Apr 12 2024")
+    sys.exit(0)
+with open({log!r}, "a") as log:
+    log.write(" ".join(args) + "\\n")
+lists = [a.split("=", 1)[1] for a in args if a.startswith("--file-list=")]
+if lists:
+    with open(lists[0]) as f:
+        files = [line.rstrip("\\n") for line in f]
+else:
+    files = [os.path.join(d, n) for root in args if not root.startswith("-") for d, _, ns in os.walk(root) for n in ns]
+infected = False
+for path in files:
+    with open(path, "rb") as f:
+        if b"EICAR-STANDARD-ANTIVIRUS-TEST-FILE" in f.read():
+            print(path + ": Eicar-Test-Signature FOUND", flush=True)
+            infected = True
+        else:
+            print(path + ": OK", flush=True)
+sys.exit(1 if infected else 0)
+"""
+
+
+@pytest.fixture
+def fake_clamscan(tmp_path):
+    log = tmp_path / "calls.log"
+    script = tmp_path / "clamscan"
+    script.write_text(FAKE_CLAMSCAN.format(python=sys.executable, log=str(log)))
+    script.chmod(0o755)
+    return str(script), log
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "sub").mkdir(parents=True)
+    (root / "clean.txt").write_text("hello")
+    (root / "sub" / "eicar.com").write_bytes(EICAR)
+    return str(root)
+
+
+def test_streams_without_cache(scanner, fake_clamscan, tree):
+    binary, log = fake_clamscan
+    engine = scanner.ClamscanEngine(binary)
+    seen = []
+    found = engine.scan([tree], seen.append)
+    assert [d[1] for d in found] == ["Eicar-Test-Signature"] == [d[1] for d in seen]
+    assert engine.stats.files == 2
+    assert "-r" in log.read_text().split()
+
+
+def test_cache_skips_unchanged_files(scanner, fake_clamscan, tree, tmp_path):
+    binary, log = fake_clamscan
+    engine = scanner.ClamscanEngine(binary)
+    engine.cache = scanner.ScanCache(str(tmp_path / "cache.db"), engine.signature_version(), engine.name)
+    assert len(engine.scan([tree])) == 1
+    engine.cache.flush()
+    assert len(log.read_text().splitlines()) == 1
+
+    engine.stats = scanner.ScanStats()
+    found = engine.scan([tree])
+    assert [d[0] for d in found] == [os.path.join(tree, "sub", "eicar.com")]
+    assert engine.stats.files == 2
+    # Everything was cached, so clamscan was not started again.
+    assert len(log.read_text().splitlines()) == 1
+    engine.cache.close()
+
+
+def test_single_job_uses_streaming_engine(scanner, fake_clamscan):
+    args = scanner.argparse.Namespace(hash="none", heuristics=False, jobs=1, no_cache=False,
+                                      shard_by="files", fanout_scanner="clamscan")
+    engine, _ = scanner.select_engine(args, None, fake_clamscan[0], None)
+    assert isinstance(engine, scanner.ClamscanEngine)
+    args.jobs = 2
+    engine, _ = scanner.select_engine(args, None, fake_clamscan[0], None)
+    assert isinstance(engine, scanner.FanoutEngine)
+
+
+def test_fanout_cleans_up_after_failed_spawn(scanner, tmp_path, tree, monkeypatch):
+    slow = tmp_path / "clamscan"
+    slow.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(60)\n")
+    slow.chmod(0o755)
+    engine = scanner.FanoutEngine(jobs=2)
+    engine.binary = str(slow)
+    real_popen = scanner.subprocess.Popen
+
+    def popen(*args, **kwargs):
+        if engine.procs:
+            raise OSError("fork failed")
+        return real_popen(*args, **kwargs)
+
+    monkeypatch.setattr(scanner.subprocess, "Popen", popen)
+    assert engine.scan([tree]) == []
+    assert len(engine.procs) == 1
+    assert engine.procs[0].returncode is not None
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize("first", ["invoice.locked", "backup.bin"])
+def test_digest_reuse_respects_name_class(scanner, tmp_path, first):
+    payload = os.urandom(256 * 1024)
+    names = [first] + [n for n in ("invoice.locked", "backup.bin") if n != first]
+    for name in names:
+        (tmp_path / name).write_bytes(payload)
+    engine = scanner.NativeScanEngine(workers=1, inspectors=[scanner.EntropyHeuristic()])
+    found = engine.scan([str(tmp_path / n) for n in names])
+    assert [os.path.basename(d[0]) for d in found] == ["invoice.locked"]
+    assert found[0][1].startswith("Heuristics.Ransom.Encrypted")
+
+
+def test_name_key_classes(scanner):
+    key = scanner.EntropyHeuristic.name_key
+    assert key("/x/a.locked") == "R"
+    assert key("/x/report.pdf.enc") == "RH"
+    assert key("/x/a.bin") == key("/x/b.dat") == ""
@@ -0,0 +1,32 @@
+EICAR = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+
+def test_directory_tier_is_scanned_before_later_file_tier(scanner, tmp_path):
+    cron = tmp_path / "cron.d" / "deep" / "deeper"
+    cron.mkdir(parents=True)
+    (cron / "job").write_bytes(EICAR)
+    downloads = []
+    for i in range(20):
+        download = tmp_path / f"download_{i}.exe"
+        download.write_bytes(EICAR)
+        downloads.append(str(download))
+    tiers = [("persistence", [str(tmp_path / "cron.d")]), ("recent_downloads", downloads)]
+    engine = scanner.NativeScanEngine(workers=1, walkers=4, hash_algorithm=None)
+    order = []
+    scanner.HotspotScan(engine, tiers).run(lambda det: order.append(det[0]))
+    assert len(order) == 21
+    assert order[0] == str(cron / "job")
+
+
+def test_walker_emits_roots_in_order(scanner, tmp_path):
+    roots = []
+    for name in ("b", "a", "c"):
+        (tmp_path / name / "sub").mkdir(parents=True)
+        (tmp_path / name / "sub" / "f").write_text(name)
+        roots.append(str(tmp_path / name))
+    (tmp_path / "file_root").write_text("x")
+    roots.insert(1, str(tmp_path / "file_root"))
+    seen = []
+    scanner.ParallelWalker(roots, threads=4).run(lambda item: seen.append(item[0]))
+    assert seen == [str(tmp_path / "b" / "sub" / "f"), str(tmp_path / "file_root"),
+                    str(tmp_path / "a" / "sub" / "f"), str(tmp_path / "c" / "sub" / "f")]
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def fake_vault(scanner, monkeypatch, tmp_path):
+    batches = []
+
+    class FakeVault:
+        def __init__(self, root, compress=None):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def quarantine_many(self, entries, workers=None):
+            entries = list(entries)
+            batches.append(entries)
+            return [(True, "Isolated in vault") for _ in entries]
+
+    monkeypatch.setattr(scanner, "QuarantineVault", FakeVault)
+    monkeypatch.setattr(scanner, "QUARANTINE_ROOT", str(tmp_path / "vault"))
+    monkeypatch.setattr(scanner, "HAS_PLAYSOUND", False)
+    return batches
+
+
+def test_isolate_all_is_one_vault_batch(scanner, fake_vault, monkeypatch, capsys):
+    detections = [("/srv/a.exe", "Trojan.A"), ("/srv/b.zip!x.exe", "Trojan.B"), ("/srv/c.sh", "Trojan.C")]
+    answers = iter(["all", "1", "exit"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    scanner.interactive_menu(detections)
+    assert fake_vault == [[("/srv/a.exe", "Trojan.A"), ("/srv/b.zip", "Trojan.B"), ("/srv/c.sh", "Trojan.C")]]
+    assert capsys.readouterr().out.count("Isolated in vault") == 3
@@ -0,0 +1,59 @@
+import socket
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def listener_farm():
+    """Listening sockets on a few loopback addresses; yields the set of (host, port) that are open."""
+    socks, open_ports = [], set()
+    hosts = ["127.0.0.1"] + (["127.0.0.2", "127.0.0.3"] if sys.platform.startswith("linux") else [])
+    try:
+        for host in hosts:
+            for _ in range(20):
+                sock = socket.socket()
+                sock.bind((host, 0))
+                sock.listen(16)
+                socks.append(sock)
+                open_ports.add((host, sock.getsockname()[1]))
+        yield open_ports
+    finally:
+        for sock in socks:
+            sock.close()
+
+
+def test_sweep_finds_every_loopback_listener(scanner, listener_farm):
+    ports = sorted({port for _, port in listener_farm})
+    hosts = sorted({host for host, _ in listener_farm})
+    sweep = scanner.NetworkSweep(ports, concurrency=256, timeout=1.0, host_timeout=10.0)
+    found = set()
+    sweep.scan(scanner.iter_sweep_hosts(scanner.resolve_sweep_targets(hosts)),
+               lambda host, port: found.add((host, port)))
+    assert found >= listener_farm
+    assert sweep.hosts == len(hosts)
+    assert sweep.alive == len(hosts)
+    assert sweep.probes == len(hosts) * len(ports)
+    assert sweep.errors == 0
+
+
+def test_host_timeout_cuts_off_slow_ports(scanner):
+    class SlowSweep(scanner.NetworkSweep):
+        async def _connect(self, host, port):
+            await scanner.asyncio.sleep(5 if port % 2 else 0)
+            return "closed"
+
+    sweep = SlowSweep(range(1, 11), host_timeout=0.3)
+    sweep.scan(scanner.iter_sweep_hosts(scanner.resolve_sweep_targets(["10.0.0.0/30"])))
+    assert (sweep.hosts, sweep.alive, sweep.host_timeouts) == (2, 2, 2)
+
+
+def test_unresolvable_target_is_a_clean_error(scanner):
+    with pytest.raises(ValueError, match="no-such-host.invalid"):
+        scanner.resolve_sweep_targets(["127.0.0.1", "no-such-host.invalid"])
+
+
+def test_parse_ports(scanner):
+    assert scanner.parse_ports("22, 80,8000-8002") == [22, 80, 8000, 8001, 8002]
+    with pytest.raises(ValueError):
+        scanner.parse_ports("0-10")
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="needs SIGTERM/SIGKILL")
+
+STUBBORN = "import signal, sys, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('ready', flush=True); time.sleep(60)"
+
+
+def test_terminate_continues_past_denied_pids(scanner, monkeypatch):
+    stubborn = subprocess.Popen([sys.executable, "-c", STUBBORN], stdout=subprocess.PIPE, text=True)
+    polite = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    guarded = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    assert stubborn.stdout.readline().strip() == "ready"
+    denied_pid = guarded.pid
+    real_process = scanner.psutil.Process
+
+    class Process(real_process):
+        def terminate(self):
+            if self.pid == denied_pid:
+                raise scanner.psutil.AccessDenied(self.pid)
+            super().terminate()
+
+    monkeypatch.setattr(scanner.psutil, "Process", Process)
+    try:
+        ok, msg = scanner.terminate_processes([denied_pid, stubborn.pid, polite.pid], timeout=1.0)
+        # psutil reaps the children, so only check that both are gone.
+        assert not scanner.psutil.pid_exists(stubborn.pid)
+        assert not scanner.psutil.pid_exists(polite.pid)
+    finally:
+        for child in (stubborn, polite, guarded):
+            if child.poll() is None:
+                child.kill()
+        stubborn.stdout.close()
+    assert not ok
+    assert msg == f"Terminated 2 processes (1 killed); access denied for pid {denied_pid}"
+
+
+def test_terminate_never_signals_protected_processes(scanner, monkeypatch):
+    signalled = []
+
+    class Process(scanner.psutil.Process):
+        def terminate(self):
+            signalled.append(self.pid)
+
+    monkeypatch.setattr(scanner.psutil, "Process", Process)
+    ok, msg = scanner.terminate_processes([1, os.getpid(), os.getppid()], timeout=0.1)
+    assert signalled == []
+    assert msg == "Terminated 0 processes; 3 protected skipped"
+
+
+def test_kill_candidates_default_to_processes_running_the_file(scanner):
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        inventory = scanner.ProcessInventory()
+        lib = "/usr/lib/libshared.so"
+        inventory.owners = {lib: [(1, "init"), (os.getpid(), "pytest"), (child.pid, "python")],
+                            "/tmp/dropper": [(child.pid, "python")]}
+        inventory.runs = {"/tmp/dropper": [(child.pid, "python")]}
+        assert inventory.kill_candidates(lib) == []
+        assert inventory.kill_candidates(lib, loaders=True) == [(child.pid, "python")]
+        assert inventory.kill_candidates("/tmp/dropper") == [(child.pid, "python")]
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,56 @@
+import os
+import stat
+
+import pytest
+
+EICAR = b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+
+@pytest.fixture
+def vault(scanner, tmp_path, monkeypatch):
+    vault = scanner.QuarantineVault(str(tmp_path / "vault"))
+    # Keep every object in the test's own store, never a filesystem-root one.
+    monkeypatch.setattr(vault, "store_for", lambda file_path, st: vault.root)
+    yield vault
+    vault.close()
+
+
+@pytest.fixture
+def windows_rename(scanner, monkeypatch):
+    """os.rename with Windows semantics: it never replaces an existing file."""
+    real_rename = os.rename
+
+    def rename(src, dst):
+        if os.path.lexists(dst):
+            raise FileExistsError(17, "Cannot create a file when that file already exists", dst)
+        real_rename(src, dst)
+
+    monkeypatch.setattr(scanner.os, "rename", rename)
+
+
+def test_stash_moves_into_a_fresh_staging_name(vault, tmp_path, windows_rename):
+    target = tmp_path / "dropper.exe"
+    target.write_bytes(EICAR)
+    ok, msg = vault.quarantine(str(target), "Eicar-Test-Signature")
+    assert ok, msg
+    assert not target.exists()
+    (stored,) = [row[5] for row in vault.items()]
+    assert stat.S_IMODE(os.stat(stored).st_mode) == 0o400
+    assert os.listdir(os.path.join(vault.root, "incoming")) == []
+
+
+def test_failed_commit_restores_file_and_mode(vault, tmp_path, monkeypatch):
+    target = tmp_path / "dropper.sh"
+    target.write_bytes(EICAR)
+    target.chmod(0o750)
+    vault.compress = "lzma"
+
+    def broken_pack(staging, dest):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(vault, "_pack", broken_pack)
+    ok, msg = vault.quarantine(str(target), "Eicar-Test-Signature")
+    assert not ok and "No space left" in msg
+    assert target.read_bytes() == EICAR
+    assert stat.S_IMODE(target.stat().st_mode) == 0o750
+    assert os.listdir(os.path.join(vault.root, "incoming")) == []
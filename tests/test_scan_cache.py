@@ -0,0 +1,44 @@
+import sqlite3
+
+
+KEY = (1, 42, 100, 123456789)
+
+
+def test_verdicts_are_scoped_per_engine_version(scanner, tmp_path):
+    path = str(tmp_path / "cache.db")
+    native = scanner.ScanCache(path, "Native 3.2 [eicar] sha256")
+    native.record(KEY, "/tmp/a", "Eicar", "d1")
+    native.record_digest("d1", "Eicar")
+    native.close()
+
+    clamav = scanner.ScanCache(path, "ClamAV 1.0.5/27240")
+    assert clamav.lookup(KEY) is None
+    assert clamav.lookup_digest("d1") is None
+    clamav.record(KEY, "/tmp/a", "", "d1")
+    clamav.close()
+
+    # Alternating engines keeps both sets of verdicts.
+    native = scanner.ScanCache(path, "Native 3.2 [eicar] sha256")
+    assert native.lookup(KEY) == ("Eicar", "d1")
+    assert native.lookup_digest("d1") == "Eicar"
+    native.close()
+    clamav = scanner.ScanCache(path, "ClamAV 1.0.5/27240")
+    assert clamav.lookup(KEY) == ("", "d1")
+    clamav.close()
+
+
+def test_old_scopes_are_pruned(scanner, tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    monkeypatch.setattr(scanner, "CACHE_KEEP_SCOPES", 2)
+    for daily in ("27238", "27239", "27240"):
+        cache = scanner.ScanCache(path, f"ClamAV 1.0.5/{daily}")
+        cache.record(KEY, "/tmp/a", "", daily)
+        cache.close()
+    scopes = [r[0] for r in sqlite3.connect(path).execute("SELECT scope FROM verdicts ORDER BY scope")]
+    assert scopes == ["ClamAV 1.0.5/27239", "ClamAV 1.0.5/27240"]
+
+
+def test_unversioned_engine_falls_back_to_its_name(scanner, tmp_path):
+    cache = scanner.ScanCache(str(tmp_path / "cache.db"), "", "ClamAV")
+    assert cache.scope == "ClamAV"
+    cache.close()
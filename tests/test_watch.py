@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+def test_watcher_ignores_its_own_output(scanner, tmp_path):
+    state = tmp_path / "state"
+    state.mkdir()
+    seen = []
+    watcher = scanner.InotifyWatcher([str(tmp_path)], seen.append,
+                                     ignore=[str(state), str(tmp_path / "cache.db"), str(tmp_path / "report.jsonl"), None])
+    stop = threading.Event()
+    reader = threading.Thread(target=watcher.run, args=(stop,))
+    reader.start()
+    try:
+        for name in ("cache.db", "cache.db-wal", "report.jsonl", "report.jsonl.1", "dropper.sh"):
+            (tmp_path / name).write_bytes(b"x")
+        (state / "scan_cache.db").write_bytes(b"x")
+        deadline = time.time() + 5
+        while not seen and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.2)
+    finally:
+        stop.set()
+        reader.join()
+        watcher.close()
+    assert set(seen) == {str(tmp_path / "dropper.sh")}
+
+
+
+def test_debounce_releases_a_path_once_it_goes_quiet(scanner):
+    pending = scanner.DebounceQueue(delay=0.1)
+    pending.put("/a")
+    pending.put("/b")
+    pending.put("/a")
+    assert pending.get_batch(timeout=0.01) == []
+    assert pending.get_batch(timeout=1.0) == ["/b", "/a"]
+    assert len(pending) == 0
+
+
+def test_debounce_caps_the_wait_for_a_file_that_never_goes_quiet(scanner):
+    pending = scanner.DebounceQueue(delay=0.2, max_wait=0.6)
+    released = []
+    stop = threading.Event()
+
+    def consume():
+        while not stop.is_set():
+            released.extend((p, time.monotonic()) for p in pending.get_batch(timeout=0.05))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    started = time.monotonic()
+    try:
+        # An appending dropper: an event every 50 ms, never 200 ms of quiet.
+        while time.monotonic() - started < 1.5 and not released:
+            pending.put("/tmp/busy.log")
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        consumer.join()
+    assert released and released[0][0] == "/tmp/busy.log"
+    assert released[0][1] - started < 0.6 + 0.3